@@ -1,13 +1,17 @@
 # agents/air_quality_agent.py
-import requests
 import os
+from agents.base_agent import BaseAgent
+from utils.http import Request
 
-class AirQualityAgent:
-    def run(self, context):
+class AirQualityAgent(BaseAgent):
+    consumes = ["location", "city"]
+    produces = ["air_quality"]
+
+    def fetch(self, context):
         token = os.getenv("AQICN_TOKEN", "")
         city = context.get("location") or context.get("city") or "Kolkata"
         url = f"https://api.waqi.info/feed/{city}/?token={token}"
-        resp = requests.get(url)
+        resp = yield Request(url, timeout=10)
         if resp.ok and resp.json().get("status") == "ok":
             data = resp.json()["data"]
             return {"air_quality": f"AQI: {data['aqi']}, Dominant Pollutant: {data.get('dominentpol', 'N/A')}"}
@@ -1,30 +1,45 @@
 import os
-import requests
 from dotenv import load_dotenv
+from agents.base_agent import BaseAgent
+from utils.geocoder import get_geocoder, location_params
+from utils.http import Request
 load_dotenv()
 
-class APIFetchAgent:
+class APIFetchAgent(BaseAgent):
     def __init__(self, config):
+        super().__init__(name=config.get("name"))
         self.config = config
+        # Config-driven agents declare their context keys in configs/agents.json
+        self.consumes = config.get("consumes", [])
+        self.produces = config.get("produces", [])
 
-    def run(self, context):
+    def fetch(self, context):
         if self.config.get("name") == "weather":
-            # Try to extract a valid city name from entities
-            city = None
-            # Example: pick the first entity that looks like a city (improve this as needed)
-            if "entities" in context and context["entities"]:
-                # Try to extract just the city name (first two words)
-                city_candidate = context["entities"][0]
-                city = " ".join(city_candidate.split()[:2])
-            elif "city" in context:
-                city = context["city"]
-            else:
-                city = "New York"  # fallback
+            # The goal's first city, as typed by the entity extractor
+            city = context.get("city") or "New York"  # fallback
 
-            api_key = os.getenv(self.config.get("api_key_env", "OPENWEATHER_KEY"))
+            api_key = os.getenv(self.config.get("api_key_env", "OPENWEATHER_API_KEY"))
             url = self.config.get("endpoint")
-            params = {"q": city, "appid": api_key}
-            resp = requests.get(url, params=params)
+            params = {**location_params(city), "appid": api_key}
+            resp = yield Request(url, params=params, timeout=10)
             resp.raise_for_status()
-            return resp.json()
-        # ... handle other agents as before ...
\ No newline at end of file
+            weather = resp.json()
+            get_geocoder().learn_from_weather(city, weather)
+            # Keep the raw payload under a single key so downstream agents
+            # (temperature, holidays) find it at context["weather"]
+            return {"weather": weather}
+        # Generic config-driven fetch (e.g. spacex_next)
+        resp = yield Request(self.config["endpoint"], method=self.config.get("method", "GET"), timeout=10)
+        resp.raise_for_status()
+        result = resp.json()
+        if self.config.get("name") == "spacex_next" and result.get("launchpad"):
+            # Resolve the launch site so location-aware agents can use it
+            pad_resp = yield Request(f"https://api.spacexdata.com/v4/launchpads/{result['launchpad']}", timeout=10)
+            if pad_resp.ok:
+                pad = pad_resp.json()
+                if pad.get("locality"):
+                    result["launch_location"] = pad["locality"]
+                if pad.get("latitude") and pad.get("longitude"):
+                    result["lat"] = pad["latitude"]
+                    result["lon"] = pad["longitude"]
+        return result
@@ -1,5 +1,7 @@
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Generator, Optional, List
+import asyncio
 import logging
+from utils import http
 
 class BaseAgent:
     """
@@ -10,6 +12,18 @@ class BaseAgent:
     # Subclasses can specify required context keys for validation
     required_context_keys: List[str] = []
 
+    # Context keys this agent reads and writes. The scheduler uses them to order
+    # a chain: an agent only starts once every agent producing a key it consumes
+    # has finished. "*" means "everything the rest of the chain produces".
+    consumes: List[str] = []
+    produces: List[str] = []
+
+    # Most requests fetch() may have in flight at once when it yields a list of them
+    max_concurrency: int = 4
+
+    # Pooled HTTP client used by fetch(); the registry injects the shared one
+    http_client: Optional[http.HttpClient] = None
+
     def __init__(self, name: Optional[str] = None, logger: Optional[logging.Logger] = None):
         self.name = name or self.__class__.__name__
         self.logger = logger or logging.getLogger(self.name)
@@ -19,9 +33,42 @@ class BaseAgent:
         """
         Main method to be implemented by all agents.
         Should process the context and return a dictionary of results to be merged into the context.
+        Agents that implement fetch() get a blocking run() for free.
         """
+        if type(self).fetch is not BaseAgent.fetch:
+            return self.http.drive(self.fetch(context), self.max_concurrency)
         raise NotImplementedError("Each agent must implement the run(context) method.")
 
+    async def arun(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async counterpart of run().
+        Agents that implement fetch() run natively on the event loop; plain run() agents
+        are executed in the loop's default thread pool.
+        """
+        if type(self).fetch is not BaseAgent.fetch:
+            return await self.http.adrive(self.fetch(context), self.max_concurrency)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.run, context)
+
+    def fetch(self, context: Dict[str, Any]) -> Generator[http.Request, http.Response, Dict[str, Any]]:
+        """
+        Generator protocol for agents that call HTTP APIs.
+        Yield an http.Request and receive the http.Response (failures are raised at the yield),
+        then return the result dict. One implementation serves both run() and arun().
+        Yield a list of requests to issue them concurrently (at most max_concurrency at a time);
+        you receive a list of Responses, with exceptions in place of failed requests.
+        """
+        raise NotImplementedError
+        yield
+
+    @property
+    def http(self) -> http.HttpClient:
+        """The injected client, or the process-wide one for agents built outside the registry."""
+        return self.http_client or http.get_http_client()
+
+    def warm_up(self):
+        """Load expensive resources (models, clients) ahead of the first run. No-op by default."""
+
     def validate_context(self, context: Dict[str, Any]) -> bool:
         """
         Validate if the context contains all required keys for this agent.
@@ -1,22 +1,30 @@
-import requests
+from agents.base_agent import BaseAgent
+from utils.http import Request
 
-class BooksAgent:
-    def run(self, context):
+class BooksAgent(BaseAgent):
+    consumes = ["entities", "topic"]
+    produces = ["books"]
+
+    def fetch(self, context):
         # Support batch topics
         topics = context.get("entities") or [context.get("topic") or "artificial intelligence"]
         all_books = []
-        for topic in topics:
-            url = f"https://www.googleapis.com/books/v1/volumes"
-            params = {"q": topic, "maxResults": 3}
-            resp = requests.get(url, params=params)
-            books = []
-            if resp.ok:
-                items = resp.json().get("items", [])
-                for item in items:
-                    info = item.get("volumeInfo", {})
-                    title = info.get("title", "Unknown")
-                    authors = ", ".join(info.get("authors", []))
-                    desc = info.get("description", "")[:200]
-                    books.append({"title": title, "authors": authors, "desc": desc})
-            all_books.append({"topic": topic, "books": books})
+        url = f"https://www.googleapis.com/books/v1/volumes"
+        responses = yield [Request(url, params={"q": topic, "maxResults": 3}, timeout=10) for topic in topics]
+        for topic, resp in zip(topics, responses):
+            try:
+                if isinstance(resp, Exception):
+                    raise resp
+                books = []
+                if resp.ok:
+                    items = resp.json().get("items", [])
+                    for item in items:
+                        info = item.get("volumeInfo", {})
+                        title = info.get("title", "Unknown")
+                        authors = ", ".join(info.get("authors", []))
+                        desc = info.get("description", "")[:200]
+                        books.append({"title": title, "authors": authors, "desc": desc})
+                all_books.append({"topic": topic, "books": books})
+            except Exception as e:
+                all_books.append({"topic": topic, "books": [], "error": f"Exception: {e}"})
         return {"books": all_books}
\ No newline at end of file
@@ -1,12 +1,16 @@
-import requests
+from agents.base_agent import BaseAgent
+from utils.http import Request
 
-class COVIDAgent:
-    def run(self, context):
+class COVIDAgent(BaseAgent):
+    consumes = ["country"]
+    produces = ["covid"]
+
+    def fetch(self, context):
         # Example: Use disease.sh API for COVID stats
         country = context.get("country", "India")
         url = f"https://disease.sh/v3/covid-19/countries/{country}"
         try:
-            resp = requests.get(url, timeout=10)
+            resp = yield Request(url, timeout=10)
             if resp.ok:
                 data = resp.json()
                 return {
@@ -1,16 +1,18 @@
-import requests, os
-from utils.api_limiter import rate_limited
+import os
+from agents.base_agent import BaseAgent
+from utils.http import Request
 
-class DataFetcherAgent:
+class DataFetcherAgent(BaseAgent):
+    # Rate limiting is applied per provider host by utils.http (see utils/rate_limiter.py)
     def __init__(self, config):
+        super().__init__(name=config.get("name"))
         self.endpoint = config["endpoint"]
         self.method = config["method"]
-        self.api_key = os.getenv(config.get("key_env_var"), "")
+        self.api_key = os.getenv(config.get("key_env_var") or "", "")
         self.rate_limit = config["rate_limit"]
 
-    @rate_limited(calls_per_period=60, period_seconds=60)
-    def run(self, params=None):
+    def fetch(self, params=None):
         headers = {"Authorization": self.api_key} if self.api_key else {}
-        resp = requests.request(self.method, self.endpoint, headers=headers, params=params)
+        resp = yield Request(self.endpoint, params=params, method=self.method, headers=headers)
         resp.raise_for_status()
-        return resp.json()
\ No newline at end of file
+        return resp.json()
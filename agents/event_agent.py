@@ -1,13 +1,17 @@
-import requests
 from datetime import datetime
+from agents.base_agent import BaseAgent
+from utils.http import Request
 
-class EventAgent:
-    def run(self, context):
+class EventAgent(BaseAgent):
+    consumes = ["country"]
+    produces = ["events", "validated"]
+
+    def fetch(self, context):
         country = context.get("country", "IN")
         year = str(datetime.now().year)
         url = f"https://date.nager.at/api/v3/PublicHolidays/{year}/{country}"
         try:
-            resp = requests.get(url, timeout=10)
+            resp = yield Request(url, timeout=10)
             if resp.ok:
                 holidays = [h["localName"] for h in resp.json()][:3]
                 return {"events": holidays, "validated": True}
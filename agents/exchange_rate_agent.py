@@ -1,12 +1,16 @@
-import requests
+from agents.base_agent import BaseAgent
+from utils.http import Request
 
-class ExchangeRateAgent:
-    def run(self, context):
+class ExchangeRateAgent(BaseAgent):
+    consumes = ["base_currency", "target_currency"]
+    produces = ["exchange_rate"]
+
+    def fetch(self, context):
         base = context.get("base_currency", "USD")
         target = context.get("target_currency", "INR")
         url = f"https://api.exchangerate-api.com/v4/latest/{base}"
         try:
-            resp = requests.get(url, timeout=10)
+            resp = yield Request(url, timeout=10)
             if resp.ok:
                 data = resp.json()
                 rate = data["rates"].get(target)
@@ -1,19 +1,31 @@
-import requests
 import os
+from agents.base_agent import BaseAgent
+from utils.http import Request
 
-class FactCheckAgent:
-    def run(self, context):
+class FactCheckAgent(BaseAgent):
+    consumes = ["news"]
+    produces = ["fact_checks", "validated"]
+
+    max_concurrency = 8
+
+    def fetch(self, context):
         claims = []
-        if "news" in context:
-            claims.extend(context["news"])
+        for item in context.get("news") or []:
+            # NewsAgent reports {"entity", "news": [headlines], ...} per entity; check each headline
+            if isinstance(item, dict):
+                if item.get("validated", True):
+                    claims.extend(item.get("news") or [])
+            else:
+                claims.append(item)
         checked = []
         api_key = os.getenv("GOOGLE_API_KEY")
-        for claim in claims:
-            # Google Fact Check API
+        # Google Fact Check API, one request per claim, issued concurrently
+        url = "https://factchecktools.googleapis.com/v1alpha1/claims:search"
+        responses = yield [Request(url, params={"query": claim, "key": api_key}, timeout=10) for claim in claims]
+        for claim, resp in zip(claims, responses):
             try:
-                url = "https://factchecktools.googleapis.com/v1alpha1/claims:search"
-                params = {"query": claim, "key": api_key}
-                resp = requests.get(url, params=params, timeout=10)
+                if isinstance(resp, Exception):
+                    raise resp
                 if resp.ok and resp.json().get("claims"):
                     verdict = resp.json()["claims"][0].get("text", "Verified")
                     checked.append({"claim": claim, "fact_check": verdict})
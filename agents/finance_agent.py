@@ -1,15 +1,25 @@
-import requests, os
+import os
+from agents.base_agent import BaseAgent
+from utils.http import Request
 
-class FinanceAgent:
-    def run(self, context):
-        symbols = context.get("entities") or [context.get("symbol") or "AAPL"]
+class FinanceAgent(BaseAgent):
+    consumes = ["symbols", "symbol"]
+    produces = ["finance"]
+    # Alpha Vantage's free tier allows 5 calls a minute
+    max_concurrency = 2
+
+    def fetch(self, context):
+        # Ticker symbols typed by the entity extractor, never city or topic names
+        symbols = context.get("symbols") or [context.get("symbol") or "AAPL"]
         api_key = os.getenv("ALPHA_VANTAGE_KEY")
         url = f"https://www.alphavantage.co/query"
         results = []
-        for symbol in symbols:
-            params = {"function": "GLOBAL_QUOTE", "symbol": symbol, "apikey": api_key}
+        responses = yield [Request(url, params={"function": "GLOBAL_QUOTE", "symbol": symbol, "apikey": api_key}, timeout=10)
+                           for symbol in symbols]
+        for symbol, resp in zip(symbols, responses):
             try:
-                resp = requests.get(url, params=params, timeout=10)
+                if isinstance(resp, Exception):
+                    raise resp
                 if resp.ok and "Global Quote" in resp.json():
                     quote = resp.json()["Global Quote"]
                     price = quote.get('05. price', 'N/A')
@@ -1,8 +1,12 @@
-import requests
 import os
+from agents.base_agent import BaseAgent
+from utils.http import Request
 
-class HealthAgent:
-    def run(self, context):
+class HealthAgent(BaseAgent):
+    consumes = ["topic", "city"]
+    produces = ["health", "validated"]
+
+    def fetch(self, context):
         # Example: Use news API for health news, or WHO API for stats if available
         topic = context.get("topic", "public health")
         city = context.get("city")
@@ -11,7 +15,7 @@ class HealthAgent:
         url = "https://newsdata.io/api/1/news"
         params = {"apikey": api_key, "q": query, "language": "en", "category": "health"}
         try:
-            resp = requests.get(url, params=params, timeout=10)
+            resp = yield Request(url, params=params, timeout=10)
             if resp.ok:
                 articles = resp.json().get("results", [])
                 news = [a["title"] for a in articles[:3]] if articles else ["No health news found."]
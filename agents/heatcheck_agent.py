@@ -1,19 +1,28 @@
-import requests
 import os
+from agents.base_agent import BaseAgent
+from utils.geocoder import get_geocoder, location_params
+from utils.http import Request
 
-class HeatCheckAgent:
-    def run(self, context):
+class HeatCheckAgent(BaseAgent):
+    consumes = ["city"]
+    produces = ["heatcheck", "validated"]
+
+    def fetch(self, context):
         city = context.get("city", "Delhi")
-        api_key = os.getenv("OPENWEATHERMAP_API_KEY")
+        api_key = os.getenv("OPENWEATHER_API_KEY")
         url = f"https://api.openweathermap.org/data/2.5/weather"
-        params = {"q": city, "appid": api_key, "units": "metric"}
+        # Same request as the weather and weather_alerts agents (Kelvin) so the run fetches it once
+        params = {**location_params(city), "appid": api_key}
         try:
-            resp = requests.get(url, params=params, timeout=10)
+            resp = yield Request(url, params=params, timeout=10)
             if resp.ok:
                 data = resp.json()
+                get_geocoder().learn_from_weather(city, data)
                 temp = data.get("main", {}).get("temp")
+                if temp is not None:
+                    temp = round(temp - 273.15, 1)
                 alerts = []
-                if temp and temp > 40:
+                if temp is not None and temp > 40:
                     alerts.append(f"Heatwave alert: Current temperature in {city} is {temp}°C.")
                 else:
                     alerts.append(f"Current temperature in {city} is {temp}°C.")
@@ -1,8 +1,12 @@
-import requests
 from datetime import datetime
+from agents.base_agent import BaseAgent
+from utils.http import Request
 
-class HolidaysAgent:
-    def run(self, context):
+class HolidaysAgent(BaseAgent):
+    consumes = ["weather", "country"]
+    produces = ["holidays"]
+
+    def fetch(self, context):
         # Try to get country code from weather/sys or context
         country = None
         if "weather" in context and isinstance(context["weather"], dict):
@@ -13,7 +17,7 @@ class HolidaysAgent:
         year = str(datetime.now().year)
         url = f"https://date.nager.at/api/v3/PublicHolidays/{year}/{country}"
         try:
-            resp = requests.get(url, timeout=10)
+            resp = yield Request(url, timeout=10)
             if resp.ok and resp.headers.get("Content-Type", "").startswith("application/json"):
                 holidays = [h["localName"] for h in resp.json()]
                 return {"holidays": holidays[:3] if holidays else ["No holidays found."]}
@@ -1,6 +1,10 @@
 import random
+from agents.base_agent import BaseAgent
+
+class JobMarketAgent(BaseAgent):
+    consumes = ["sector", "city"]
+    produces = ["job_market", "validated"]
 
-class JobMarketAgent:
     def run(self, context):
         sector = context.get("sector", "technology")
         city = context.get("city", "Bangalore")
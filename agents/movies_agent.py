@@ -1,13 +1,17 @@
-import requests
+from agents.base_agent import BaseAgent
+from utils.http import Request
 
-class MoviesAgent:
-    def run(self, context):
+class MoviesAgent(BaseAgent):
+    consumes = ["movie"]
+    produces = ["movies"]
+
+    def fetch(self, context):
         # Example: Use OMDb API for movie info (free API key required, or demo fallback)
         movie = context.get("movie", "Inception")
         api_key = "demo"  # Replace with your OMDb API key if you have one
         url = f"http://www.omdbapi.com/?t={movie}&apikey={api_key}"
         try:
-            resp = requests.get(url, timeout=10)
+            resp = yield Request(url, timeout=10)
             if resp.ok:
                 data = resp.json()
                 if data.get("Response") == "True":
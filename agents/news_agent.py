@@ -1,11 +1,17 @@
-import requests, os
+import os
+from agents.base_agent import BaseAgent
+from utils.http import Request
+
+class NewsAgent(BaseAgent):
+    consumes = ["entities", "location", "city", "topic", "goal"]
+    produces = ["news"]
 
-class NewsAgent:
     def __init__(self):
+        super().__init__()
         self.endpoint = "https://newsdata.io/api/1/news"
         self.api_key = os.getenv("NEWSDATA_API_KEY", "")
 
-    def run(self, context):
+    def fetch(self, context):
         entities = context.get("entities")
         results = []
         queries = entities if entities else [context.get("location") or context.get("city") or context.get("topic")]
@@ -17,16 +23,14 @@ class NewsAgent:
                     queries = [match.group(1).strip().split(",")[0]]
                 else:
                     queries = [" ".join(context["goal"].split()[:2])]
-        for query in queries:
-            if not query:
-                continue
-            params = {
-                "apikey": self.api_key,
-                "q": query,
-                "language": "en"
-            }
+        queries = [query for query in queries if query]
+        # One request per entity, issued concurrently
+        responses = yield [Request(self.endpoint, params={"apikey": self.api_key, "q": query, "language": "en"}, timeout=10)
+                           for query in queries]
+        for query, resp in zip(queries, responses):
             try:
-                resp = requests.get(self.endpoint, params=params, timeout=10)
+                if isinstance(resp, Exception):
+                    raise resp
                 resp.raise_for_status()
                 articles = resp.json().get("results", [])
                 if articles:
@@ -1,12 +1,143 @@
-import google.generativeai as genai
 import os
 import ast
+import contextvars
+import logging
 import re
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
 
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+from utils.cache import LRUCache
+from utils.config import get_section
+
+_genai = None
+_genai_lock = threading.Lock()
+
+def get_genai():
+    """Import and configure google.generativeai on first use (it is slow to import)."""
+    global _genai
+    with _genai_lock:
+        if _genai is None:
+            import google.generativeai as genai
+            genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+            _genai = genai
+    return _genai
+
+# Domain rules: goal keywords -> (agent, position) inserts into the base chain, applied in order
+DOMAIN_RULES = [
+    (("finance", "stock", "market", "investment"), [("finance", 0), ("fact_check", 3)]),
+    (("weather", "temperature", "forecast", "climate"),
+     [("weather", 0), ("temperature", 1), ("air_quality", 2), ("weather_alerts", 3)]),
+    (("health", "medical", "disease", "hospital"), [("health", 0)]),
+    (("spacex", "launch"), [("spacex_next", 0), ("weather", 1), ("air_quality", 2)]),
+]
+BASE_CHAIN = ["news", "wikipedia_summary", "sentiment", "summarizer"]
+DEPTH_KEYWORDS = ("analyze", "impact", "effect", "trend")
+
+def rule_based_plan(goal):
+    """
+    Keyword-driven chain for ``goal`` and the number of domain keywords found in it.
+    With no domain match the chain is only the generic news/wikipedia base.
+    """
+    goal_lower = goal.lower()
+    chain = list(BASE_CHAIN)
+    hits = 0
+    for keywords, inserts in DOMAIN_RULES:
+        found = sum(word in goal_lower for word in keywords)
+        if found:
+            hits += found
+            for agent, position in inserts:
+                chain.insert(position, agent)
+            if keywords[0] == "health" and "covid" in goal_lower:
+                chain.insert(0, "covid")
+
+    # Analysis depth agents
+    if any(word in goal_lower for word in DEPTH_KEYWORDS):
+        if "fact_check" not in chain:
+            chain.insert(2, "fact_check")
+        chain.insert(3, "sentiment")
+
+    # Ensure summarizer is last
+    chain.remove("summarizer")
+    chain.append("summarizer")
+    return chain, hits
+
+def parse_chain(text):
+    """The agent list in a model response (bare, fenced in Markdown, or assigned to a name)."""
+    text = text.strip()
+    # Remove Markdown code block if present
+    if text.startswith("```"):
+        text = re.sub(r"^```[a-zA-Z]*\n?", "", text)
+        text = text.split("```")[0].strip()
+    # Try to find a Python list in the response
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("[") and line.endswith("]"):
+            try:
+                return ast.literal_eval(line)
+            except Exception:
+                continue
+        match = re.match(r"^\w+\s*=\s*(\[.*\])$", line)
+        if match:
+            try:
+                return ast.literal_eval(match.group(1))
+            except Exception:
+                continue
+    match = re.search(r"(\[.*\])", text, re.DOTALL)
+    if match:
+        try:
+            return ast.literal_eval(match.group(1))
+        except Exception:
+            pass
+    try:
+        return ast.literal_eval(text)
+    except Exception as e:
+        raise ValueError(f"Could not parse agent chain from model response: {text}") from e
+
+def normalize_goal(goal):
+    return " ".join(re.findall(r"[a-z0-9]+", goal.lower()))
 
 class PlannerAgent:
-    def plan(self, goal, available_agents):
+    """
+    Plans agent chains for a goal. Goals the keyword rules cover confidently are planned
+    locally; the rest go to Gemini, falling back to the rules when the model is slow,
+    fails, or answers with something that is not a usable chain. A refinement is only
+    planned locally if the rules suggest something other than the chain being refined.
+    Model plans are cached per normalized goal and agent set (LRU with TTL), so
+    refinements rarely leave the process.
+    """
+
+    def __init__(self):
+        settings = get_section("planner")
+        self.model_name = settings.get("model", "models/gemini-2.0-flash-lite")
+        # Seconds to wait for the model before using the rule-based chain
+        self.timeout = settings.get("timeout", 8)
+        # Plan confidently matched goals without asking the model
+        self.local_first = settings.get("local_first", True)
+        # Domain keywords a goal needs before its rule-based chain counts as confident
+        self.local_min_hits = settings.get("local_min_hits", 2)
+        self.cache_ttl = settings.get("cache_ttl", 3600)
+        # Rule-based fallbacks are cached briefly so the model is retried soon
+        self.fallback_ttl = settings.get("fallback_ttl", 60)
+        self.cache = LRUCache(settings.get("cache_entries", 256))
+        # Model calls still running past their timeout; beyond this many, skip the model
+        self.max_stuck_calls = settings.get("max_stuck_calls", 4)
+        self.stats = {"cache_hits": 0, "local": 0, "llm": 0, "fallback": 0, "timeouts": 0, "stuck": 0}
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+    @property
+    def model(self):
+        with self._model_lock:
+            if self._model is None:
+                self._model = get_genai().GenerativeModel(self.model_name)
+        return self._model
+
+    def warm_up(self):
+        self.model
+
+    def llm_plan(self, goal, available_agents):
         prompt = f"""
         You are an AI planner for a multi-agent system.
         User goal: '{goal}'.
@@ -15,34 +146,95 @@ class PlannerAgent:
         Only output the list, nothing else.
         Always place 'summarizer' as the last agent in the chain, so it can summarize all enriched context.
         """
-        model = genai.GenerativeModel("models/gemini-2.0-flash-lite")
-        response = model.generate_content(prompt)
-        text = response.text.strip()
-        # Remove Markdown code block if present
-        if text.startswith("```"):
-            text = re.sub(r"^```[a-zA-Z]*\n?", "", text)
-            text = text.split("```")[0].strip()
-        # Try to find a Python list in the response
-        for line in text.splitlines():
-            line = line.strip()
-            if line.startswith("[") and line.endswith("]"):
-                try:
-                    return ast.literal_eval(line)
-                except Exception:
-                    continue
-            match = re.match(r"^\w+\s*=\s*(\[.*\])$", line)
-            if match:
-                try:
-                    return ast.literal_eval(match.group(1))
-                except Exception:
-                    continue
-        match = re.search(r"(\[.*\])", text, re.DOTALL)
-        if match:
+        response = self.model.generate_content(prompt)
+        return parse_chain(response.text)
+
+    def _count(self, name, delta=1):
+        with self._stats_lock:
+            self.stats[name] += delta
+
+    def call_model(self, goal, available_agents):
+        """
+        llm_plan() on its own daemon thread, waiting at most ``timeout``. A call that overruns
+        keeps running in the background and counts as "stuck" until it returns, so a hung
+        request never holds up the calls after it.
+        """
+        if self.stats["stuck"] >= self.max_stuck_calls:
+            raise RuntimeError(f"{self.stats['stuck']} model calls are still stuck")
+        future = Future()
+        lock = threading.Lock()
+        overran = False
+
+        def call():
+            nonlocal overran
             try:
-                return ast.literal_eval(match.group(1))
-            except Exception:
-                pass
+                future.set_result(self.llm_plan(goal, available_agents))
+            except BaseException as e:
+                future.set_exception(e)
+            with lock:
+                if overran:
+                    self._count("stuck", -1)
+                    logging.info("[Planner] Model call that overran its timeout has returned")
+
+        threading.Thread(target=contextvars.copy_context().run, args=(call,), daemon=True, name="planner").start()
         try:
-            return ast.literal_eval(text)
+            return future.result(self.timeout)
+        except FutureTimeout:
+            with lock:
+                if not future.done():
+                    overran = True
+                    self._count("stuck")
+            self._count("timeouts")
+            raise
+
+    @staticmethod
+    def usable(chain, available_agents):
+        """``chain`` restricted to known agents with the summarizer last, or None if nothing is left."""
+        if not isinstance(chain, (list, tuple)):
+            return None
+        known = []
+        for agent in chain:
+            if isinstance(agent, str) and agent in available_agents and agent not in known:
+                known.append(agent)
+        if "summarizer" in known:
+            known.remove("summarizer")
+            known.append("summarizer")
+        return known if any(agent != "summarizer" for agent in known) else None
+
+    def plan(self, goal, available_agents, current_chain=None):
+        """
+        Chain for ``goal`` from ``available_agents``. Pass the chain that already ran as
+        ``current_chain`` when refining, so the rules are not asked for the same plan again.
+        """
+        available = set(available_agents)
+        key = f"{normalize_goal(goal)}|{','.join(sorted(available))}"
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._count("cache_hits")
+            return list(cached)
+
+        rule_chain, hits = rule_based_plan(goal)
+        rule_chain = self.usable(rule_chain, available) or [a for a in BASE_CHAIN if a in available]
+        refines_itself = current_chain is not None and rule_chain == self.usable(current_chain, available)
+        if self.local_first and hits >= self.local_min_hits and not refines_itself:
+            # Cheap to recompute, so not cached: a later refinement gets to ask the model
+            self._count("local")
+            return list(rule_chain)
+
+        try:
+            chain = self.usable(self.call_model(goal, available_agents), available)
+            if chain is None:
+                raise ValueError("model returned no known agents")
+            source = "llm"
+        except FutureTimeout:
+            logging.warning(f"[Planner] Model did not answer within {self.timeout}s "
+                            f"({self.stats['stuck']} calls still running), using rule-based chain")
+            source, chain = "fallback", rule_chain
         except Exception as e:
-            raise ValueError(f"Could not parse agent chain from model response: {text}") from e
\ No newline at end of file
+            logging.warning(f"[Planner] {e}; using rule-based chain")
+            source, chain = "fallback", rule_chain
+
+        self._count(source)
+        ttl = self.fallback_ttl if source == "fallback" else self.cache_ttl
+        self.cache.set(key, tuple(chain), time.time() + ttl)
+        return list(chain)
@@ -1,22 +1,33 @@
-import requests
 import os
+from agents.base_agent import BaseAgent
+from utils.geocoder import get_geocoder
+from utils.http import Request
 
-class PollutionAgent:
-    def run(self, context):
+class PollutionAgent(BaseAgent):
+    consumes = ["city", "lat", "lon"]
+    produces = ["pollution", "validated", "reasoning"]
+
+    def fetch(self, context):
         city = context.get("city", "Delhi")
-        api_key = os.getenv("OPENWEATHERMAP_API_KEY")
+        api_key = os.getenv("OPENWEATHER_API_KEY")
         lat = context.get("lat")
         lon = context.get("lon")
         reasoning = []
 
-        # Try to use lat/lon from context, else geocode
+        # Try to use lat/lon from context, then the local index, else geocode
+        if not (lat and lon):
+            place = get_geocoder().lookup(city)
+            if place:
+                lat, lon = place.lat, place.lon
+                reasoning.append("Used the local geocoding index for lat/lon.")
         if not (lat and lon):
-            geo_url = f"http://api.openweathermap.org/geo/1.0/direct"
+            geo_url = f"https://api.openweathermap.org/geo/1.0/direct"
             geo_params = {"q": city, "limit": 1, "appid": api_key}
-            geo_resp = requests.get(geo_url, params=geo_params)
+            geo_resp = yield Request(geo_url, params=geo_params, timeout=10)
             if geo_resp.ok and geo_resp.json():
-                lat = geo_resp.json()[0]["lat"]
-                lon = geo_resp.json()[0]["lon"]
+                match = geo_resp.json()[0]
+                lat, lon = match["lat"], match["lon"]
+                get_geocoder().learn(city, lat, lon, match.get("country", ""))
                 reasoning.append("Used OpenWeatherMap geocoding for lat/lon.")
             else:
                 reasoning.append("Failed to geocode city.")
@@ -25,7 +36,7 @@ class PollutionAgent:
 
         params = {"lat": lat, "lon": lon, "appid": api_key}
         try:
-            resp = requests.get("http://api.openweathermap.org/data/2.5/air_pollution", params=params, timeout=10)
+            resp = yield Request("https://api.openweathermap.org/data/2.5/air_pollution", params=params, timeout=10)
             if resp.ok:
                 data = resp.json()
                 aqi = data.get("list", [{}])[0].get("main", {}).get("aqi")
@@ -0,0 +1,92 @@
+"""Lazy agent registry.
+
+``AgentRegistry`` behaves like the ``{name: agent}`` dict ``main.load_agents`` used to
+build, but an agent's module is only imported, and the agent only constructed, the
+first time a chain looks it up. A finance-only chain therefore never pays for the
+summarizer's model or the sentiment library. Every agent it builds shares one
+pooled ``HttpClient``.
+"""
+import importlib
+import threading
+from collections.abc import Mapping
+
+from utils.config import load_config
+
+# agent name -> (module, class, configs/agents.json entry passed to the constructor)
+AGENT_SPECS = {
+    "weather": ("agents.api_fetch_agent", "APIFetchAgent", "weather"),
+    "spacex_next": ("agents.api_fetch_agent", "APIFetchAgent", "spacex_next"),
+    "news": ("agents.news_agent", "NewsAgent", None),
+    "summarizer": ("agents.summarizer_agent", "SummarizerAgent", None),
+    "wikipedia": ("agents.wikipedia_agent", "WikipediaAgent", None),
+    "holidays": ("agents.holidays_agent", "HolidaysAgent", None),
+    "air_quality": ("agents.air_quality_agent", "AirQualityAgent", None),
+    "finance": ("agents.finance_agent", "FinanceAgent", None),
+    "books": ("agents.books_agent", "BooksAgent", None),
+    "covid": ("agents.covid_agent", "COVIDAgent", None),
+    "sports": ("agents.sports_agent", "SportsAgent", None),
+    "movies": ("agents.movies_agent", "MoviesAgent", None),
+    "sentiment": ("agents.sentiment_agent", "SentimentAgent", None),
+    "fact_check": ("agents.factcheck_agent", "FactCheckAgent", None),
+    "exchange_rate": ("agents.exchange_rate_agent", "ExchangeRateAgent", None),
+    "weather_alerts": ("agents.weather_alerts_agent", "WeatherAlertsAgent", None),
+    "wikipedia_summary": ("agents.wikipedia_summary_agent", "WikipediaSummaryAgent", None),
+    "health": ("agents.health_agent", "HealthAgent", None),
+    "heat_check": ("agents.heatcheck_agent", "HeatCheckAgent", None),
+    "pollution": ("agents.pollution_agent", "PollutionAgent", None),
+    "traffic": ("agents.traffic_agent", "TrafficAgent", None),
+    "currency": ("agents.currency_agent", "CurrencyAgent", None),
+    "events": ("agents.event_agent", "EventAgent", None),
+    "job_market": ("agents.job_market_agent", "JobMarketAgent", None),
+    "temperature": ("agents.temperature_agent", "TemperatureAgent", None),
+}
+
+
+class AgentRegistry(Mapping):
+    """Read-only mapping of agent name to agent instance, constructed on first lookup."""
+
+    def __init__(self, configs=None, specs=None, http_client=None):
+        self._configs = configs
+        self._http_client = http_client
+        self._specs = dict(specs or AGENT_SPECS)
+        self._agents = {}
+        self._locks = {name: threading.Lock() for name in self._specs}
+
+    def __getitem__(self, name):
+        agent = self._agents.get(name)
+        if agent is not None:
+            return agent
+        if name not in self._specs:
+            raise KeyError(name)
+        # Per-agent lock: a slow constructor (the summarizer) does not block the others
+        with self._locks[name]:
+            agent = self._agents.get(name)
+            if agent is None:
+                agent = self._agents[name] = self._build(name)
+        return agent
+
+    def __iter__(self):
+        return iter(self._specs)
+
+    def __len__(self):
+        return len(self._specs)
+
+    def __contains__(self, name):
+        return name in self._specs
+
+    def loaded(self):
+        """Names of the agents constructed so far."""
+        return list(self._agents)
+
+    def _build(self, name):
+        from utils.http import get_http_client
+
+        module_name, class_name, config_key = self._specs[name]
+        cls = getattr(importlib.import_module(module_name), class_name)
+        if config_key is None:
+            agent = cls()
+        else:
+            configs = self._configs if self._configs is not None else load_config()
+            agent = cls(configs[config_key])
+        agent.http_client = self._http_client or get_http_client()
+        return agent
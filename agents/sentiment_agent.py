@@ -1,21 +1,34 @@
-from textblob import TextBlob
+from agents.base_agent import BaseAgent
+
+class SentimentAgent(BaseAgent):
+    consumes = ["news"]
+    produces = ["sentiment", "sentiment_score", "sentiment_reasoning", "entity_sentiment", "headline_sentiment"]
+
+    def warm_up(self):
+        from utils.sentiment import get_sentiment_engine
+        get_sentiment_engine()
 
-class SentimentAgent:
     def run(self, context):
-        news_batches = context.get("news", [])
-        sentiments = []
-        for batch in news_batches:
-            text = " ".join(batch.get("news", []))
-            if not text:
-                sentiments.append({"entity": batch.get("entity"), "sentiment": "No text"})
-                continue
-            blob = TextBlob(text)
-            polarity = blob.sentiment.polarity
-            if polarity > 0.1:
-                sentiment = "Positive"
-            elif polarity < -0.1:
-                sentiment = "Negative"
-            else:
-                sentiment = "Neutral"
-            sentiments.append({"entity": batch.get("entity"), "sentiment": sentiment})
-        return {"sentiment": sentiments}
\ No newline at end of file
+        from utils.sentiment import get_sentiment_engine  # deferred: numpy is slow to import
+
+        # Placeholder and error batches carry no headlines worth scoring
+        news_batches = [batch for batch in context.get("news", []) if batch.get("validated") is not False]
+        scores = get_sentiment_engine().score_batches(news_batches)
+        headlines = scores["headlines"]
+        if not headlines:
+            reasoning = "No headlines were available to assess."
+        else:
+            ranked = sorted(headlines, key=lambda h: h["score"])
+            reasoning = f"Lexicon polarity of {len(headlines)} headlines across {len(news_batches)} entities"
+            if ranked[-1]["score"] > 0:
+                reasoning += f"; most positive: \"{ranked[-1]['headline']}\" ({ranked[-1]['score']:+.2f})"
+            if ranked[0]["score"] < 0:
+                reasoning += f"; most negative: \"{ranked[0]['headline']}\" ({ranked[0]['score']:+.2f})"
+            reasoning += "."
+        return {
+            "score": scores["score"],
+            "label": scores["label"],
+            "reasoning": reasoning,
+            "entities": scores["entities"],
+            "headlines": headlines,
+        }
@@ -1,12 +1,16 @@
-import requests
+from agents.base_agent import BaseAgent
+from utils.http import Request
 
-class SportsAgent:
-    def run(self, context):
+class SportsAgent(BaseAgent):
+    consumes = ["sport"]
+    produces = ["sports"]
+
+    def fetch(self, context):
         # Example: Use TheSportsDB API for sports news (free API key required)
         sport = context.get("sport", "Soccer")
         url = f"https://www.thesportsdb.com/api/v1/json/1/search_all_leagues.php?s={sport}"
         try:
-            resp = requests.get(url, timeout=10)
+            resp = yield Request(url, timeout=10)
             if resp.ok:
                 data = resp.json()
                 leagues = data.get("countrys", [])
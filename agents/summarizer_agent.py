@@ -1,124 +1,272 @@
 #summarizer_agent.py
 
 import os
-import requests
+import contextvars
+import hashlib
+import json
 import logging
-import textwrap
-from transformers import pipeline
+import queue
+import random
+import threading
+from agents.base_agent import BaseAgent
+from utils.cache import open_cache
+from utils.chunking import chunk_text, tokenizer_counter
+from utils.context_budget import budget_context
+from utils.config import get_section
+from utils.http import Request
+from utils import streaming
+
+class SummarizerAgent(BaseAgent):
+    consumes = ["*"]
+    produces = ["summary"]
+
+    # Part of every memo key: bump when prompts or generation lengths change
+    SUMMARY_VERSION = 1
+    TRANSIENT_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+    INSUFFICIENT = "Summary: The available data was insufficient for a detailed summary, but key findings are presented below."
 
-class SummarizerAgent:
     def __init__(self):
-        self.bart_summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
+        super().__init__()
+        self._bart_summarizer = None
+        self._bart_lock = threading.Lock()
         self.cohere_api_key = os.getenv("COHERE_API_KEY", "")
-        self.max_chunk_chars = 1600  # Increase chunk size for more context per summary
+        settings = get_section("summarizer")
+        # Chunks are packed by model tokens: BART reads 1024, leave room for special tokens
+        self.chunk_tokens = settings.get("chunk_tokens", 900)
+        self.chunk_overlap = settings.get("chunk_overlap", 0)
+        # Input size is bounded by these, not by how much the chain produced
+        self.context_tokens = settings.get("context_tokens", 1500)
+        self.context_list_items = settings.get("context_list_items", 5)
+        # Chunks summarized per forward pass
+        self.batch_size = settings.get("batch_size", 8)
+        # Seconds to wait for Cohere before racing local BART against it (None: only after Cohere fails)
+        self.hedge_delay = settings.get("hedge_delay", 4.0)
+        self.cohere_timeout = settings.get("cohere_timeout", 15)
+        self.cohere_retries = settings.get("cohere_retries", 2)
+        self.cohere_backoff = settings.get("cohere_backoff", 0.5)
+        # Memo of finished summaries keyed by input and engine settings
+        memo = settings.get("cache") or {}
+        self.summary_ttl = memo.get("ttl", 86400)
+        self.summary_cache = None
+        if memo.get("enabled", True):
+            path = memo.get("path", ".cache/summaries.sqlite3") if memo.get("persist", True) else None
+            self.summary_cache = open_cache(memo.get("memory_entries", 128), path)
+
+    @property
+    def bart_summarizer(self):
+        """
+        The local BART pipeline, loaded on first use so Cohere-only runs never pay for it.
+        The inference backend (pipeline, quantized, onnx) comes from the "summarizer" config section.
+        """
+        with self._bart_lock:
+            if self._bart_summarizer is None:
+                from utils.summarization import load_summarizer
+                self._bart_summarizer = load_summarizer(**get_section("summarizer"))
+        return self._bart_summarizer
+
+    def warm_up(self):
+        self.bart_summarizer
 
-    # summarizer_agent.py (update format_context method)
     def format_context(self, context: dict) -> str:
-        """Formats context into a detailed structured paragraph for N entities."""
-        parts = []
-        if context.get("goal"):
-            parts.append(f"🔍 Goal:\n{context['goal']}\n")
-        
-        # Prefer formatted weather summary if available
-        if context.get("weather_summary"):
-            parts.append(f"🌤 Weather Summary:\n{context['weather_summary']}\n")
-        
-        # Handle batch results
-        for key, value in context.items():
-            # Skip raw weather dict if weather_summary is present
-            if key in ("goal", "summary", "weather") and context.get("weather_summary"):
-                continue
-            if value:
-                if isinstance(value, list) and value and isinstance(value[0], dict):
-                    for item in value:
-                        entity = item.get("entity") or item.get("topic") or ""
-                        parts.append(f"🔹 {key.capitalize()} for {entity}:\n" +
-                                     "\n".join(f"  - {k}: {v}" for k, v in item.items() if k != "entity"))
-                elif isinstance(value, dict):
-                    val_str = "\n".join(f"  • {k}: {v}" for k, v in value.items())
-                    parts.append(f"🔹 {key.capitalize()}:\n{val_str}\n")
-                elif isinstance(value, list):
-                    val_str = "\n".join(f"  - {v}" for v in value)
-                    parts.append(f"🔹 {key.capitalize()}:\n{val_str}\n")
-                else:
-                    parts.append(f"🔹 {key.capitalize()}:\n{str(value)}\n")
-        return "\n".join(parts).strip() or "No relevant input found."
+        """Goal plus the context most relevant to it, within the "context_tokens" budget."""
+        return budget_context(context, self.context_tokens, self.context_list_items)
 
     # summarizer_agent.py (update cohere_in_depth_summary method)
-    def cohere_in_depth_summary(self, text: str) -> str | None:
-        """Uses Cohere for analytical summarization if API key is available."""
-        try:
-            response = requests.post(
-                "https://api.cohere.ai/v1/summarize",
-                headers={
-                    "Authorization": f"Bearer {self.cohere_api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "text": text,
-                    "length": "auto",
-                    "format": "paragraph",
-                    "extractiveness": "low",  # Encourage analysis
-                    "temperature": 0.7,
-                    "additional_command": "Convert all temperature values from Kelvin to Fahrenheit and Celsius. Report temperatures in °F and °C"
-                },
-                timeout=15
-            )
-            if response.ok:
-                result = response.json().get("summary")
-                return result.strip() if result else None
-        except Exception as e:
-            logging.warning(f"[Cohere Error] {e}")
+    def cohere_in_depth_summary(self, text: str, cancelled: threading.Event = None) -> str | None:
+        """
+        Uses Cohere for analytical summarization if API key is available.
+        Network errors, timeouts, 429 and 5xx are retried with jittered exponential backoff.
+        """
+        cancelled = cancelled or threading.Event()
+        for attempt in range(self.cohere_retries + 1):
+            try:
+                response = self.http.send(Request(
+                    "https://api.cohere.ai/v1/summarize",
+                    method="POST",
+                    headers={
+                        "Authorization": f"Bearer {self.cohere_api_key}",
+                        "Content-Type": "application/json"
+                    },
+                    json={
+                        "text": text,
+                        "length": "auto",
+                        "format": "paragraph",
+                        "extractiveness": "low",  # Encourage analysis
+                        "temperature": 0.7,
+                        "additional_command": "Convert all temperature values from Kelvin to Fahrenheit and Celsius. Report temperatures in °F and °C"
+                    },
+                    timeout=self.cohere_timeout
+                ))
+                if response.ok:
+                    result = response.json().get("summary")
+                    return result.strip() if result else None
+                logging.warning(f"[Cohere Error] HTTP {response.status_code}")
+                if response.status_code not in self.TRANSIENT_STATUSES:
+                    return None
+            except Exception as e:
+                logging.warning(f"[Cohere Error] {e}")
+            # wait() returns early (True) once the hedge has been won by BART
+            if attempt < self.cohere_retries and cancelled.wait(self.cohere_backoff * 2 ** attempt * random.uniform(0.5, 1)):
+                return None
         return None
 
-    def bart_deep_summary(self, text: str) -> str:
-        """Fallback using BART with chunking and reflective summarization."""
-        chunks = textwrap.wrap(text, width=self.max_chunk_chars)
-        combined_summary = []
-
-        for i, chunk in enumerate(chunks):
+    def summarize_batch(self, texts, on_summary=None, cancelled=None, **generate_kwargs):
+        """
+        Summarize ``texts`` in batched forward passes; summaries come back in input order (None on failure).
+        Inputs are sorted by length first so each batch pads to similar lengths.
+        ``on_summary(i, summary)`` is called as soon as each input's batch is done.
+        Setting ``cancelled`` stops before the next batch.
+        """
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        summaries = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            if cancelled is not None and cancelled.is_set():
+                break
+            batch = order[start:start + self.batch_size]
             try:
-                # First summarization pass (raw summarization)
-                basic_summary = self.bart_summarizer(
-                    chunk,
-                    max_length=350,   # Increase max length
-                    min_length=120,   # Increase min length
-                    do_sample=False
-                )[0]['summary_text']
-
-                # Second pass (reflective prompt)
-                analysis_prompt = (
-                    f"{basic_summary}\n\n"
-                    f"Based on this, provide deeper insights, implications, or cause-effect relationships. "
-                    f"Explain what this suggests or why it matters."
-                )
-                reflection = self.bart_summarizer(
-                    analysis_prompt,
-                    max_length=250,   # Increase max length
-                    min_length=100,   # Increase min length
-                    do_sample=False
-                )[0]['summary_text']
-
-                combined_summary.append(f"🧾 Section {i+1}:\n{reflection}")
+                results = self.bart_summarizer([texts[i] for i in batch], batch_size=len(batch),
+                                               truncation=True, **generate_kwargs)
+                for i, result in zip(batch, results):
+                    summaries[i] = result["summary_text"]
             except Exception as e:
-                logging.warning(f"[BART Summarization Error]: {e}")
+                # One bad input fails the whole batch; retry one at a time so the rest survive
+                logging.warning(f"[BART Summarization Error]: {e}; retrying inputs individually")
+                for i in batch:
+                    try:
+                        summaries[i] = self.bart_summarizer(texts[i], truncation=True, **generate_kwargs)[0]["summary_text"]
+                    except Exception as e:
+                        logging.warning(f"[BART Summarization Error]: {e}")
+            if on_summary:
+                for i in batch:
+                    if summaries[i]:
+                        on_summary(i, summaries[i])
+        return summaries
 
-        return "\n\n".join(combined_summary)
+    def bart_deep_summary(self, text: str, cancelled: threading.Event = None) -> str:
+        """Fallback using BART with chunking and reflective summarization."""
+        cancelled = cancelled or threading.Event()
+        chunks = chunk_text(text, tokenizer_counter(self.bart_summarizer.tokenizer),
+                            max_tokens=self.chunk_tokens, overlap=self.chunk_overlap)
 
-    def run(self, context: dict) -> str:
-        input_text = self.format_context(context)
+        # First pass over all chunks (raw summarization)
+        basic_summaries = self.summarize_batch(
+            chunks,
+            cancelled=cancelled,
+            max_length=350,   # Increase max length
+            min_length=120,   # Increase min length
+            do_sample=False
+        )
 
-        # Prefer Cohere if available
-        if self.cohere_api_key:
-            summary = self.cohere_in_depth_summary(input_text)
-            if summary and len(summary.split()) > 10:
-                return f"📊 In-depth Analytical Summary (Cohere):\n{summary}"
-            else:
-                return "Summary: The available data was insufficient for a detailed summary, but key findings are presented below."
+        def on_reflection(j, text):
+            # A hedge lost to Cohere must not stream sections of a summary nobody will use
+            if not cancelled.is_set():
+                streaming.emit("summary_section", index=sections[j] + 1, text=text)
+
+        # Second pass over all summaries (reflective prompt)
+        sections = [i for i, summary in enumerate(basic_summaries) if summary]
+        analysis_prompts = [
+            f"{basic_summaries[i]}\n\n"
+            f"Based on this, provide deeper insights, implications, or cause-effect relationships. "
+            f"Explain what this suggests or why it matters."
+            for i in sections
+        ]
+        reflections = self.summarize_batch(
+            analysis_prompts,
+            on_summary=on_reflection,
+            cancelled=cancelled,
+            max_length=250,   # Increase max length
+            min_length=100,   # Increase min length
+            do_sample=False
+        )
+
+        return "\n\n".join(f"🧾 Section {i+1}:\n{reflection}"
+                           for i, reflection in zip(sections, reflections) if reflection)
+
+    def summary_key(self, text: str, engine: str) -> str:
+        """Memo key: the formatted input plus everything that changes the summary produced from it."""
+        settings = get_section("summarizer")
+        if engine == "bart":
+            params = [settings.get("backend", "pipeline"), settings.get("model"), self.chunk_tokens, self.chunk_overlap]
+        else:
+            params = []
+        payload = json.dumps([engine, params, self.SUMMARY_VERSION, text], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
-        # Fallback to in-depth BART pipeline
-        summary = self.bart_deep_summary(input_text)
+    def cohere_summary(self, input_text: str, cancelled: threading.Event = None):
+        summary = self.cohere_in_depth_summary(input_text, cancelled)
+        if summary and len(summary.split()) > 10:
+            return f"📊 In-depth Analytical Summary (Cohere):\n{summary}"
+        return None
+
+    def bart_summary(self, input_text: str, cancelled: threading.Event = None):
+        summary = self.bart_deep_summary(input_text, cancelled)
         if summary and len(summary.split()) > 10:
             return f"📊 In-depth Analytical Summary (Local BART):\n{summary}"
-        else:
-            return "Summary: The available data was insufficient for a detailed summary, but key findings are presented below."
+        return None
+
+    def hedged_summary(self, input_text: str):
+        """
+        Race Cohere against local BART: BART starts once Cohere has been silent for
+        ``hedge_delay`` seconds, or as soon as it fails. The first usable summary wins and
+        the loser is told to stop at its next batch or retry. Returns (engine, summary).
+        """
+        results = queue.Queue()
+        cancelled = threading.Event()
+
+        def start(engine, summarize):
+            def attempt():
+                try:
+                    summary = summarize(input_text, cancelled)
+                except Exception as e:
+                    logging.warning(f"[Summarizer] {engine} failed: {e}")
+                    summary = None
+                results.put((engine, summary))
+            threading.Thread(target=contextvars.copy_context().run, args=(attempt,), daemon=True).start()
+
+        start("cohere", self.cohere_summary)
+        pending, hedged = 1, False
+        try:
+            while pending:
+                try:
+                    engine, summary = results.get(timeout=None if hedged else self.hedge_delay)
+                    pending -= 1
+                    if summary:
+                        return engine, summary
+                except queue.Empty:
+                    pass  # Cohere is slow
+                if not hedged:
+                    hedged = True
+                    pending += 1
+                    start("bart", self.bart_summary)
+            return None, None
+        finally:
+            cancelled.set()
+
+    def summarize(self, input_text: str, engine: str):
+        """(engine that produced it, formatted summary); the summary is None when nothing usable came back."""
+        # Prefer Cohere if available, hedged by the local BART pipeline
+        if engine == "cohere":
+            return self.hedged_summary(input_text)
+        return "bart", self.bart_summary(input_text)
+
+    def run(self, context: dict) -> str:
+        input_text = self.format_context(context)
+        engines = ["cohere", "bart"] if self.cohere_api_key else ["bart"]
+
+        # Identical input (a refinement iteration, a repeated goal) reuses the earlier summary,
+        # whichever engine won the race for it
+        keys = {engine: self.summary_key(input_text, engine) for engine in engines} if self.summary_cache else {}
+        for key in keys.values():
+            cached = self.summary_cache.get(key)
+            if cached is not None:
+                streaming.emit("summary", text=cached)
+                return cached
+
+        engine, summary = self.summarize(input_text, engines[0])
+        if summary is None:
+            return self.INSUFFICIENT
+        if engine == "cohere":
+            streaming.emit("summary", text=summary)
+        if keys:
+            self.summary_cache.set(keys[engine], summary, self.summary_ttl)
+        return summary
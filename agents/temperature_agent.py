@@ -1,6 +1,11 @@
 # temperature_agent.py (updated)
-class TemperatureAgent:
+from agents.base_agent import BaseAgent
+
+class TemperatureAgent(BaseAgent):
     """Converts temperature values in the context from Kelvin to Celsius and Fahrenheit."""
+    consumes = ["weather"]
+    produces = ["weather", "weather_summary"]
+
     def run(self, context):
         if "weather" in context and isinstance(context["weather"], dict):
             weather = context["weather"]
@@ -1,10 +1,14 @@
 import random
 from datetime import datetime
+from agents.base_agent import BaseAgent
+
+class TrafficAgent(BaseAgent):
+    consumes = ["cities", "city"]
+    produces = ["traffic"]
 
-class TrafficAgent:
     def run(self, context):
         # Support batch cities
-        cities = context.get("entities") or [context.get("city", "Delhi")]
+        cities = context.get("cities") or [context.get("city") or "Delhi"]
         results = []
         hour = datetime.now().hour
         for city in cities:
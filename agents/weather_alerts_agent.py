@@ -1,16 +1,22 @@
-import requests
 import os
+from agents.base_agent import BaseAgent
+from utils.geocoder import get_geocoder, location_params
+from utils.http import Request
 
-class WeatherAlertsAgent:
-    def run(self, context):
+class WeatherAlertsAgent(BaseAgent):
+    consumes = ["city"]
+    produces = ["weather_alerts"]
+
+    def fetch(self, context):
         city = context.get("city", "London")
-        api_key = os.getenv("OPENWEATHERMAP_API_KEY")
+        api_key = os.getenv("OPENWEATHER_API_KEY")
         url = f"https://api.openweathermap.org/data/2.5/weather"
-        params = {"q": city, "appid": api_key}
+        params = {**location_params(city), "appid": api_key}
         try:
-            resp = requests.get(url, params=params, timeout=10)
+            resp = yield Request(url, params=params, timeout=10)
             if resp.ok:
                 data = resp.json()
+                get_geocoder().learn_from_weather(city, data)
                 alerts = data.get("alerts", [])
                 if alerts:
                     return {"weather_alerts": [a.get("description", "Alert") for a in alerts]}
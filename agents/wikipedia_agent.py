@@ -1,7 +1,11 @@
-import requests
+from agents.base_agent import BaseAgent
+from utils.http import Request
 
-class WikipediaAgent:
-    def run(self, context):
+class WikipediaAgent(BaseAgent):
+    consumes = ["location", "city", "goal"]
+    produces = ["wikipedia"]
+
+    def fetch(self, context):
         # Use city, location, or a keyword from the goal
         query = context.get("location") or context.get("city")
         if not query and context.get("goal"):
@@ -11,8 +15,9 @@ class WikipediaAgent:
                 query = match.group(1).strip()
         if not query:
             return {"wikipedia": "No relevant topic found."}
-        resp = requests.get(
-            "https://en.wikipedia.org/api/rest_v1/page/summary/" + query.replace(" ", "_")
+        resp = yield Request(
+            "https://en.wikipedia.org/api/rest_v1/page/summary/" + query.replace(" ", "_"),
+            timeout=10
         )
         if resp.ok:
             data = resp.json()
@@ -1,13 +1,17 @@
-import requests
+from agents.base_agent import BaseAgent
+from utils.http import Request
 
-class WikipediaSummaryAgent:
-    def run(self, context):
+class WikipediaSummaryAgent(BaseAgent):
+    consumes = ["topic", "goal"]
+    produces = ["wikipedia_summary"]
+
+    def fetch(self, context):
         topic = context.get("topic") or context.get("goal")
         if not topic:
             return {"wikipedia_summary": "No topic provided."}
         url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{topic.replace(' ', '_')}"
         try:
-            resp = requests.get(url, timeout=10)
+            resp = yield Request(url, timeout=10)
             if resp.ok:
                 data = resp.json()
                 return {"wikipedia_summary": data.get("extract", "No summary found.")}
@@ -0,0 +1,159 @@
+"""Batch goal runner.
+
+Reads research goals from a JSONL file (or stdin) and runs them concurrently on a
+single event loop, sharing agent instances, HTTP sessions and caches across goals.
+Each line is either a JSON string or an object with a "goal" and optional "id"
+and "chain" fields. One JSON result per goal is written as soon as it completes,
+followed by throughput, latency and response-cache statistics on stderr.
+With --reports, each goal's report is also saved there in every --report-format.
+
+    python batch.py goals.jsonl -o results.jsonl -j 16
+    python batch.py goals.jsonl -o results.jsonl --reports reports/ --report-format markdown
+    cat goals.jsonl | python batch.py - > results.jsonl
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+
+from main import build_report, build_run_record, execute_chain_async, optimize_agent_selection
+from utils import http
+from utils.report import EXTENSIONS, RENDERERS, report_basename, write_report
+
+
+def read_goals(stream):
+    """Parse goal records from JSONL, skipping blank lines; a bad line raises ValueError with its number."""
+    goals = []
+    for line_no, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"line {line_no}: invalid JSON ({e.msg})") from None
+        if isinstance(item, str):
+            item = {"goal": item}
+        if not isinstance(item, dict) or not item.get("goal"):
+            raise ValueError(f"line {line_no}: missing 'goal'")
+        item.setdefault("id", line_no)
+        goals.append(item)
+    return goals
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return None
+    index = max(0, min(len(values) - 1, math.ceil(pct / 100 * len(values)) - 1))
+    return values[index]
+
+
+def latency_stats(latencies, wall_time):
+    latencies = sorted(latencies)
+    return {
+        "goals": len(latencies),
+        "wall_time": round(wall_time, 3),
+        "goals_per_sec": round(len(latencies) / wall_time, 3) if wall_time > 0 else None,
+        "latency_mean": round(sum(latencies) / len(latencies), 3) if latencies else None,
+        "latency_p50": percentile(latencies, 50),
+        "latency_p90": percentile(latencies, 90),
+        "latency_p99": percentile(latencies, 99),
+        "latency_max": latencies[-1] if latencies else None,
+    }
+
+
+def save_report(result, item, report_dir, formats):
+    """Write the goal's report to ``report_dir`` once per format; returns the paths."""
+    report = build_report(result, item["goal"])
+    basename = os.path.join(report_dir, f"{item['id']}_{report_basename(item['goal'], report.generated_at)}")
+    paths = [f"{basename}.{EXTENSIONS[fmt]}" for fmt in formats]
+    write_report(report, zip(formats, paths))
+    return paths
+
+
+async def run_batch(goals, out, parallelism=8, max_iterations=3, latency_budget=None, report_dir=None,
+                    report_formats=("text",)):
+    """
+    Run ``goals`` with at most ``parallelism`` in flight, writing results to ``out``
+    and, with ``report_dir``, each goal's report in ``report_formats``.
+    """
+    semaphore = asyncio.Semaphore(parallelism)
+    latencies = []
+    failures = 0
+
+    async def run_one(item):
+        nonlocal failures
+        async with semaphore:
+            chain = item.get("chain") or optimize_agent_selection(item["goal"])
+            start = time.perf_counter()
+            try:
+                result = await execute_chain_async(chain, item["goal"], max_iterations=max_iterations,
+                                                   latency_budget=latency_budget, verbose=False)
+                latency = time.perf_counter() - start
+                record = build_run_record(item["goal"], result, round(latency, 3))
+                record["status"] = "ok"
+            except Exception as e:
+                failures += 1
+                latency = time.perf_counter() - start
+                record = {"goal": item["goal"], "status": "error", "error": str(e), "latency": round(latency, 3)}
+            else:
+                if report_dir:
+                    # The goal itself succeeded; a report that cannot be written is noted, not fatal
+                    try:
+                        record["reports"] = await asyncio.to_thread(save_report, result, item, report_dir, report_formats)
+                    except Exception as e:
+                        record["report_error"] = str(e)
+            record["id"] = item["id"]
+            latencies.append(round(latency, 3))
+            out.write(json.dumps(record, default=str) + "\n")
+            out.flush()
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(run_one(item) for item in goals))
+    finally:
+        await http.aclose()
+    stats = latency_stats(latencies, time.perf_counter() - start)
+    stats["failed"] = failures
+    cache = http.get_http_client().cache
+    if cache is not None:
+        stats["cache"] = cache.stats()
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run research goals from a JSONL file concurrently.")
+    parser.add_argument("input", help="JSONL file of goals, or '-' for stdin")
+    parser.add_argument("-o", "--output", help="write results here instead of stdout")
+    parser.add_argument("-j", "--parallel", type=int, default=8, help="goals in flight at once (default: 8)")
+    parser.add_argument("--max-iterations", type=int, default=3)
+    parser.add_argument("--budget", type=float, help="per-goal latency budget in seconds")
+    parser.add_argument("--reports", metavar="DIR", help="also save each goal's report in this directory")
+    parser.add_argument("--report-format", action="append", choices=sorted(RENDERERS),
+                        help="report format to save, repeatable (default: text)")
+    args = parser.parse_args(argv)
+    if args.reports:
+        os.makedirs(args.reports, exist_ok=True)
+
+    if args.input == "-":
+        goals = read_goals(sys.stdin)
+    else:
+        with open(args.input) as f:
+            goals = read_goals(f)
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        stats = asyncio.run(run_batch(goals, out, args.parallel, args.max_iterations, args.budget,
+                                      args.reports, args.report_format or ["text"]))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(json.dumps(stats, indent=2), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
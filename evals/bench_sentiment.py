@@ -0,0 +1,87 @@
+"""Sentiment throughput benchmark: vectorized engine vs. one TextBlob per text.
+
+Scores synthetic news batches (entities x headlines) both ways and reports
+headlines per second and agreement with TextBlob's per-headline polarity.
+
+    python evals/bench_sentiment.py
+    python evals/bench_sentiment.py --sizes 100 1000 10000 --runs 5
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SUBJECTS = ["Shares", "The company", "Investors", "Regulators", "Analysts", "The city", "Officials", "Residents"]
+VERBS = ["report", "face", "welcome", "fear", "expect", "celebrate", "reject", "see"]
+PHRASES = ["a very strong quarter", "terrible losses", "not a good outlook", "record growth", "an uncertain future",
+           "disappointing results", "excellent service", "a bad decision", "great news!", "modest gains",
+           "no real progress", "a surprisingly positive response", "serious problems", "stable demand"]
+
+
+def make_batches(headlines, per_entity=10, seed=0):
+    rng = random.Random(seed)
+    batches = []
+    for i in range(0, headlines, per_entity):
+        news = [f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(PHRASES)} amid {rng.choice(PHRASES)}"
+                for _ in range(min(per_entity, headlines - i))]
+        batches.append({"entity": f"Entity {i // per_entity}", "news": news, "validated": True})
+    return batches
+
+
+def textblob_scores(batches):
+    from textblob import TextBlob
+    return [TextBlob(h).sentiment.polarity for batch in batches for h in batch["news"]]
+
+
+def engine_scores(engine, batches):
+    return [h["score"] for h in engine.score_batches(batches)["headlines"]]
+
+
+def timed(fn, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def benchmark(sizes, runs=3):
+    from utils.sentiment import SentimentEngine, label_for
+
+    start = time.perf_counter()
+    engine = SentimentEngine()
+    load_seconds = time.perf_counter() - start
+    textblob_scores(make_batches(10))  # TextBlob's lexicon loads lazily; keep it out of the timings
+    results = []
+    for size in sizes:
+        batches = make_batches(size)
+        blob_seconds, expected = timed(lambda: textblob_scores(batches), runs)
+        engine_seconds, actual = timed(lambda: engine_scores(engine, batches), runs)
+        results.append({
+            "headlines": size,
+            "textblob_per_second": round(size / blob_seconds),
+            "engine_per_second": round(size / engine_seconds),
+            "speedup": round(blob_seconds / engine_seconds, 1),
+            "label_agreement": round(statistics.mean(label_for(a) == label_for(e) for a, e in zip(actual, expected)), 3),
+            "mean_abs_diff": round(statistics.mean(abs(a - e) for a, e in zip(actual, expected)), 4),
+        })
+    return {"lexicon_load_seconds": round(load_seconds, 3), "results": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare sentiment engine throughput with TextBlob.")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 1000, 10000])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+    print(json.dumps(benchmark(args.sizes, args.runs), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Summarizer backend benchmark: latency, memory and output quality on CPU.
+
+Each backend is loaded in a fresh interpreter so peak memory is measured in
+isolation. Quality is ROUGE-L F1 of each backend's output against the stock
+"pipeline" backend on the same inputs (1.0 = identical summaries).
+
+    python evals/bench_summarizer.py
+    python evals/bench_summarizer.py --backends pipeline quantized --runs 5 --threads 4
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Formatted-context style inputs, as SummarizerAgent.bart_deep_summary receives them
+SAMPLES = [
+    "🔍 Goal:\nIn-depth assessment of climate conditions in New York\n\n"
+    "🌤 Weather Summary:\nNew York is partly cloudy at 21.4°C (70.5°F) with humidity of 64% and a "
+    "south-westerly wind of 5.1 m/s. Visibility is 10 km and pressure is steady at 1016 hPa.\n\n"
+    "🔹 Air_quality:\nThe air quality index for New York is 42, which is considered good. PM2.5 "
+    "concentrations are low and ozone levels are within the normal range for early summer.\n\n"
+    "🔹 News for New York:\n  - City expands cooling centers ahead of forecast heat wave\n"
+    "  - Subway service disrupted after overnight thunderstorms flood two stations\n"
+    "  - Officials urge residents to conserve power during peak afternoon hours",
+    "🔍 Goal:\nMarket outlook for Apple and Microsoft\n\n"
+    "🔹 Finance for AAPL:\n  - price: 189.84\n  - validated: True\n  - reasoning: Fetched price for AAPL.\n"
+    "🔹 Finance for MSFT:\n  - price: 415.26\n  - validated: True\n  - reasoning: Fetched price for MSFT.\n"
+    "🔹 News for Apple:\n  - Apple unveils new on-device AI features at its developer conference\n"
+    "  - Analysts raise price targets on services growth\n"
+    "🔹 News for Microsoft:\n  - Microsoft reports record cloud revenue for the quarter\n"
+    "  - Regulators review the company's latest acquisition\n\n"
+    "🔹 Sentiment:\nOverall sentiment across the headlines is moderately positive, driven by "
+    "product launches and strong earnings, tempered by regulatory uncertainty.",
+]
+
+WORKER = "--worker"
+
+
+def rouge_l(candidate: str, reference: str) -> float:
+    """ROUGE-L F1 over whitespace tokens."""
+    a, b = candidate.split(), reference.split()
+    if not a or not b:
+        return 0.0
+    prev = [0] * (len(b) + 1)
+    for x in a:
+        cur = [0]
+        for j, y in enumerate(b):
+            cur.append(prev[j] + 1 if x == y else max(prev[j + 1], cur[j]))
+        prev = cur
+    lcs = prev[-1]
+    if not lcs:
+        return 0.0
+    precision, recall = lcs / len(a), lcs / len(b)
+    return 2 * precision * recall / (precision + recall)
+
+
+def run_backend(backend, runs, threads, model):
+    """Worker side: load ``backend`` and summarize every sample ``runs`` times."""
+    from agents.summarizer_agent import SummarizerAgent
+    from utils.summarization import load_summarizer
+
+    start = time.perf_counter()
+    summarizer = load_summarizer(backend=backend, model=model, num_threads=threads)
+    load_seconds = time.perf_counter() - start
+
+    agent = SummarizerAgent()
+    agent._bart_summarizer = summarizer
+    latencies, outputs = [], []
+    for i in range(runs):
+        for text in SAMPLES:
+            start = time.perf_counter()
+            output = agent.bart_deep_summary(text)
+            latencies.append(time.perf_counter() - start)
+            if i == 0:
+                outputs.append(output)
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    return {
+        "backend": backend,
+        "load_seconds": round(load_seconds, 2),
+        "median_seconds": round(statistics.median(latencies), 3),
+        "max_seconds": round(max(latencies), 3),
+        "peak_rss_mb": round(peak_mb, 1),
+        "outputs": outputs,
+    }
+
+
+def benchmark(backends, runs=3, threads=None, model="facebook/bart-large-cnn"):
+    results = []
+    for backend in backends:
+        cmd = [sys.executable, os.path.abspath(__file__), WORKER, backend, "--runs", str(runs), "--model", model]
+        if threads:
+            cmd += ["--threads", str(threads)]
+        out = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+        if out.returncode != 0:
+            results.append({"backend": backend, "error": out.stderr.strip().splitlines()[-1:]})
+            continue
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    reference = next((r for r in results if r.get("backend") == "pipeline" and "outputs" in r), None)
+    for r in results:
+        if reference and "outputs" in r:
+            r["rouge_l_vs_pipeline"] = round(statistics.mean(
+                rouge_l(c, ref) for c, ref in zip(r["outputs"], reference["outputs"])), 3)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare summarizer inference backends on CPU.")
+    parser.add_argument("--backends", nargs="+", default=["pipeline", "quantized", "onnx"])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--threads", type=int)
+    parser.add_argument("--model", default="facebook/bart-large-cnn")
+    parser.add_argument(WORKER, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_backend(args.worker, args.runs, args.threads, args.model)))
+        return
+    results = benchmark(args.backends, args.runs, args.threads, args.model)
+    for r in results:
+        r.pop("outputs", None)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
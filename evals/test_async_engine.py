@@ -0,0 +1,137 @@
+import asyncio
+import json
+import time
+import unittest
+from unittest import mock
+
+from requests.structures import CaseInsensitiveDict
+
+import main
+from agents.base_agent import BaseAgent
+from utils.http import HttpClient, Request, Response
+
+PRICES = {"AAA": "10.0", "BBB": "20.0"}
+
+
+class FakeClient(HttpClient):
+    """Answers from PRICES without touching the network; unknown symbols fail."""
+
+    def __init__(self):
+        super().__init__()
+        self.sent = []
+
+    def send(self, request):
+        self.sent.append(request.params["symbol"])
+        price = PRICES.get(request.params["symbol"])
+        if price is None:
+            raise ConnectionError(f"no quote for {request.params['symbol']}")
+        return Response(200, CaseInsensitiveDict(), json.dumps({"price": price}).encode(), request.url)
+
+    async def asend(self, request):
+        await asyncio.sleep(0)
+        return self.send(request)
+
+
+class QuoteAgent(BaseAgent):
+    consumes = ["symbols"]
+    produces = ["quotes"]
+
+    def fetch(self, context):
+        first = yield Request("https://quotes.test/", params={"symbol": context["symbols"][0]})
+        quotes = {context["symbols"][0]: first.json()["price"]}
+        # The rest concurrently; failures come back in place
+        responses = yield [Request("https://quotes.test/", params={"symbol": s}) for s in context["symbols"][1:]]
+        for symbol, response in zip(context["symbols"][1:], responses):
+            quotes[symbol] = f"Error: {response}" if isinstance(response, Exception) else response.json()["price"]
+        return {"quotes": quotes}
+
+
+class FailingAgent(BaseAgent):
+    consumes = ["symbols"]
+    produces = ["status"]
+
+    def fetch(self, context):
+        try:
+            yield Request("https://quotes.test/", params={"symbol": "ZZZ"})
+        except ConnectionError as e:
+            return {"status": f"offline: {e}"}
+        return {"status": "online"}
+
+
+class PlainAgent(BaseAgent):
+    def __init__(self, consumes, produces, result):
+        super().__init__()
+        self.consumes, self.produces, self.result = consumes, produces, result
+
+    def run(self, context):
+        time.sleep(0.01)
+        return self.result(context)
+
+
+class TestAgentProtocol(unittest.TestCase):
+    def setUp(self):
+        self.client = FakeClient()
+        self.context = {"symbols": ["AAA", "BBB", "CCC"]}
+
+    def agent(self, cls):
+        agent = cls()
+        agent.http_client = self.client
+        return agent
+
+    def test_arun_drives_the_same_generator_as_run(self):
+        agent = self.agent(QuoteAgent)
+        blocking = agent.run(self.context)
+        self.assertEqual(asyncio.run(agent.arun(self.context)), blocking)
+        self.assertEqual(blocking["quotes"]["BBB"], "20.0")
+        self.assertIn("no quote for CCC", blocking["quotes"]["CCC"])
+        self.assertEqual(self.client.sent, ["AAA", "BBB", "CCC"] * 2)
+
+    def test_failures_are_raised_at_the_yield(self):
+        agent = self.agent(FailingAgent)
+        self.assertEqual(asyncio.run(agent.arun(self.context)), {"status": "offline: no quote for ZZZ"})
+
+    def test_plain_agents_run_in_the_default_executor(self):
+        agent = PlainAgent(["goal"], ["echo"], lambda context: {"echo": context["goal"]})
+        self.assertEqual(asyncio.run(agent.arun({"goal": "hi"})), {"echo": "hi"})
+
+
+class TestExecuteChainAsync(unittest.TestCase):
+    def setUp(self):
+        quotes = QuoteAgent()
+        quotes.http_client = FakeClient()
+        agents = {
+            "symbols": PlainAgent(["goal"], ["symbols"], lambda context: {"symbols": ["AAA", "BBB"]}),
+            "quotes": quotes,
+            "verdict": PlainAgent(["quotes"], ["verdict"],
+                                  lambda context: {"verdict": max(context["quotes"], key=context["quotes"].get)}),
+            "summarizer": PlainAgent(["*"], ["summary"],
+                                     lambda context: f"{context['verdict']} leads. " + "word " * 40),
+        }
+        patcher = mock.patch.object(main, "available_agents", agents)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_same_merged_context_as_execute_chain(self):
+        chain = ["symbols", "quotes", "verdict", "summarizer"]
+        blocking = main.execute_chain(chain, "Compare AAA and BBB", verbose=False)
+        concurrent = asyncio.run(main.execute_chain_async(chain, "Compare AAA and BBB", verbose=False))
+        volatile = ("processing_time", "trajectory_log")
+        self.assertEqual({k: v for k, v in concurrent.items() if k not in volatile},
+                         {k: v for k, v in blocking.items() if k not in volatile})
+        self.assertEqual(concurrent["verdict"], "BBB")
+        self.assertEqual(sorted(step["agent"] for step in concurrent["trajectory_log"]), sorted(chain))
+
+    def test_goals_share_one_loop(self):
+        chain = ["symbols", "quotes", "verdict", "summarizer"]
+
+        async def run_all():
+            return await asyncio.gather(*(main.execute_chain_async(chain, f"Goal {i}", verbose=False)
+                                          for i in range(4)))
+
+        results = asyncio.run(run_all())
+        self.assertEqual([r["goal"] for r in results], [f"Goal {i}" for i in range(4)])
+        self.assertTrue(all(r["verdict"] == "BBB" for r in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
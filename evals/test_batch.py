@@ -0,0 +1,62 @@
+import asyncio
+import io
+import json
+import unittest
+from unittest import mock
+
+import batch
+
+
+class TestReadGoals(unittest.TestCase):
+    def test_strings_objects_and_blank_lines(self):
+        goals = batch.read_goals(io.StringIO('"Weather in Paris"\n\n   \n{"goal": "SpaceX launch", "id": "x"}\n'))
+        self.assertEqual(goals, [{"goal": "Weather in Paris", "id": 1}, {"goal": "SpaceX launch", "id": "x"}])
+
+    def test_bad_lines_name_their_line(self):
+        for text, message in [('"ok"\n{"goal": \n', "line 2: invalid JSON"),
+                              ('\n{"id": 3}\n', "line 2: missing 'goal'"),
+                              ('42\n', "line 1: missing 'goal'")]:
+            with self.subTest(text=text), self.assertRaisesRegex(ValueError, message):
+                batch.read_goals(io.StringIO(text))
+
+
+class TestLatencyStats(unittest.TestCase):
+    def test_percentile_edges(self):
+        self.assertIsNone(batch.percentile([], 50))
+        for pct in (0, 50, 99, 100):
+            self.assertEqual(batch.percentile([1.5], pct), 1.5)
+        values = list(range(1, 101))
+        self.assertEqual((batch.percentile(values, 50), batch.percentile(values, 99)), (50, 99))
+
+    def test_no_goals(self):
+        stats = batch.latency_stats([], 0)
+        self.assertEqual(stats["goals"], 0)
+        self.assertIsNone(stats["goals_per_sec"])
+        self.assertIsNone(stats["latency_mean"])
+        self.assertIsNone(stats["latency_max"])
+
+
+class TestRunBatch(unittest.TestCase):
+    def test_one_failure_does_not_abort_the_batch(self):
+        async def execute(chain, goal, **kwargs):
+            await asyncio.sleep(0.01)
+            if goal == "Broken goal":
+                raise RuntimeError("agent exploded")
+            return {"goal": goal, "agent_chain": chain, "summary": f"Done: {goal}", "processing_time": 0.01}
+
+        goals = [{"goal": goal, "id": i, "chain": ["news", "summarizer"]}
+                 for i, goal in enumerate(["Goal A", "Broken goal", "Goal B"], 1)]
+        out = io.StringIO()
+        with mock.patch.object(batch, "execute_chain_async", execute), \
+                mock.patch.object(batch.http, "aclose", mock.AsyncMock()) as aclose:
+            stats = asyncio.run(batch.run_batch(goals, out, parallelism=2))
+        records = {r["id"]: r for r in map(json.loads, out.getvalue().splitlines())}
+        self.assertEqual({i: r["status"] for i, r in records.items()}, {1: "ok", 2: "error", 3: "ok"})
+        self.assertEqual(records[2]["error"], "agent exploded")
+        self.assertEqual(records[3]["summary"], "Done: Goal B")
+        self.assertEqual((stats["goals"], stats["failed"]), (3, 1))
+        aclose.assert_awaited_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
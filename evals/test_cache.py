@@ -0,0 +1,123 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from utils.cache import DiskCache, LRUCache, TieredCache
+from utils.http import HttpClient, Request
+
+
+class TestTieredCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cache.sqlite3")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_lru_evicts_least_recently_used(self):
+        lru = LRUCache(max_entries=2)
+        expires = time.time() + 60
+        lru.set("a", 1, expires)
+        lru.set("b", 2, expires)
+        lru.get("a")
+        lru.set("c", 3, expires)
+        self.assertEqual(lru.get("a"), 1)
+        self.assertIsNone(lru.get("b"))
+
+    def test_entries_expire(self):
+        cache = TieredCache(LRUCache(), DiskCache(self.path))
+        cache.set("k", "v", ttl=0.05)
+        self.assertEqual(cache.get("k"), "v")
+        time.sleep(0.1)
+        self.assertIsNone(cache.get("k"))
+
+    def test_disk_store_is_shared_and_promoted(self):
+        TieredCache(LRUCache(), DiskCache(self.path)).set("k", {"x": [1, 2]}, ttl=60)
+        other = TieredCache(LRUCache(), DiskCache(self.path))
+        self.assertEqual(other.get("k"), {"x": [1, 2]})
+        self.assertEqual(other.get("k"), {"x": [1, 2]})
+        stats = other.stats()
+        self.assertEqual((stats["disk_hits"], stats["memory_hits"], stats["misses"]), (1, 1, 0))
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    hits = 0
+
+    def do_GET(self):
+        type(self).hits += 1
+        status = 500 if "fail" in self.path else 200
+        body = b'{"Note": "API call frequency exceeded"}' if "throttled" in self.path else b'{"ok": true}'
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHttpClientCaching(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        CountingHandler.hits = 0
+        self.client = HttpClient(cache=TieredCache(LRUCache()))
+        patcher = mock.patch("utils.http.cache_ttl_for", return_value=60)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_successful_get_is_served_from_cache(self):
+        for _ in range(3):
+            self.assertEqual(self.client.send(Request(self.url + "/ok", params={"q": "x"})).json(), {"ok": True})
+        self.client.send(Request(self.url + "/ok", params={"q": "y"}))
+        self.assertEqual(CountingHandler.hits, 2)
+
+    def test_errors_are_not_cached(self):
+        for _ in range(2):
+            self.assertEqual(self.client.send(Request(self.url + "/fail")).status_code, 500)
+        self.assertEqual(CountingHandler.hits, 2)
+
+    def test_in_band_errors_are_not_cached(self):
+        with mock.patch("utils.http.error_fields_for", return_value={"Note": None}):
+            for _ in range(2):
+                self.assertIn("Note", self.client.send(Request(self.url + "/throttled")).json())
+            self.client.send(Request(self.url + "/ok"))
+            self.client.send(Request(self.url + "/ok"))
+        self.assertEqual(CountingHandler.hits, 3)
+
+    def test_credentials_stay_out_of_the_cache(self):
+        self.client.send(Request(self.url + "/ok", params={"q": "x", "appid": "secret-1"}))
+        # Another key for the same query is the same response
+        self.client.send(Request(self.url + "/ok", params={"q": "x", "appid": "secret-2"}))
+        self.assertEqual(CountingHandler.hits, 1)
+        (_, entry), = self.client.cache.memory._entries.values()
+        self.assertEqual(entry["url"], self.url + "/ok?q=x")
+
+    def test_async_path_uses_the_cache(self):
+        async def main():
+            try:
+                for _ in range(2):
+                    await self.client.asend(Request(self.url + "/ok", params={"q": "x"}))
+            finally:
+                await self.client.aclose()
+
+        asyncio.run(main())
+        self.assertEqual(CountingHandler.hits, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from utils.chunking import chunk_text, split_sentences
+
+
+def words(text):
+    return len(text.split())
+
+
+class TestChunking(unittest.TestCase):
+    def test_sentences_and_lines(self):
+        text = "It is 21.4°C today. Wind is calm!\n  - Headline one\n  - Headline two"
+        self.assertEqual([s.strip() for s in split_sentences(text)],
+                         ["It is 21.4°C today.", "Wind is calm!", "- Headline one", "- Headline two"])
+
+    def test_packs_fewest_chunks_without_splitting_sentences(self):
+        text = "One two three. Four five. Six seven eight. Nine."
+        chunks = chunk_text(text, words, max_tokens=5)
+        self.assertEqual(chunks, ["One two three. Four five.", "Six seven eight. Nine."])
+        self.assertTrue(all(words(c) <= 5 for c in chunks))
+
+    def test_long_sentence_is_split_on_words(self):
+        chunks = chunk_text("a " * 13, words, max_tokens=5)
+        self.assertEqual([words(c) for c in chunks], [5, 5, 3])
+
+    def test_overlap_repeats_trailing_sentences(self):
+        text = "One two. Three four. Five six. Seven eight."
+        chunks = chunk_text(text, words, max_tokens=4, overlap=2)
+        self.assertEqual(chunks, ["One two. Three four.", "Three four. Five six.", "Five six. Seven eight."])
+
+    def test_no_content_is_lost(self):
+        text = "First point here. Second point, longer than the first one. Third.\n- A bullet\n- Another bullet"
+        chunks = chunk_text(text, words, max_tokens=6)
+        self.assertEqual(" ".join(" ".join(chunks).split()), " ".join(text.split()))
+
+
+if __name__ == "__main__":
+    unittest.main()
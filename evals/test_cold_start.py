@@ -0,0 +1,56 @@
+"""Cold-start benchmark: importing main must stay cheap.
+
+Run directly to print the measured import time:
+    python evals/test_cold_start.py
+"""
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Seconds allowed for `import main` in a fresh interpreter; override on slow machines
+IMPORT_BUDGET = float(os.getenv("COLD_START_BUDGET", "1.0"))
+HEAVY_MODULES = ["torch", "transformers", "textblob", "google.generativeai", "aiohttp", "numpy"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "import_seconds": elapsed,
+    "heavy_modules": [m for m in %r if m in sys.modules],
+    "agents_loaded": main.available_agents.loaded(),
+}))
+""" % (HEAVY_MODULES,)
+
+
+def measure_cold_start(runs=3):
+    """Import main in fresh interpreters and return the fastest run's measurements."""
+    results = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, capture_output=True, text=True, check=True)
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return min(results, key=lambda r: r["import_seconds"])
+
+
+class TestColdStart(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.result = measure_cold_start()
+
+    def test_no_heavy_imports(self):
+        self.assertEqual(self.result["heavy_modules"], [])
+
+    def test_agents_constructed_lazily(self):
+        self.assertEqual(self.result["agents_loaded"], [])
+
+    def test_import_time_budget(self):
+        self.assertLess(self.result["import_seconds"], IMPORT_BUDGET)
+
+
+if __name__ == "__main__":
+    print(json.dumps(measure_cold_start(), indent=2))
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+from utils.context_budget import budget_context, context_blocks
+
+
+def news_context(entities, headlines_each=20):
+    return {
+        "goal": "Latest news about Apple",
+        "entities": ["Apple"],
+        "validated": True,
+        "reasoning": ["Fetched news for every entity."],
+        "news": [{"entity": name, "headlines": [f"{name} headline {i}" for i in range(headlines_each)],
+                  "validated": True} for name in entities],
+    }
+
+
+class TestContextBudget(unittest.TestCase):
+    def test_bookkeeping_is_dropped_and_lists_truncated(self):
+        text = budget_context(news_context(["Apple"]), max_items=3)
+        self.assertNotIn("validated", text)
+        self.assertNotIn("Fetched news", text)
+        self.assertIn("Apple headline 2", text)
+        self.assertNotIn("Apple headline 3", text)
+        self.assertIn("(+17 more)", text)
+
+    def test_size_follows_the_budget_not_the_context(self):
+        sizes = [len(budget_context(news_context([f"Company{i}" for i in range(n)]), max_tokens=200))
+                 for n in (20, 2000)]
+        # ~4 characters per token
+        self.assertLessEqual(max(sizes), 200 * 4)
+        self.assertLess(sizes[1] - sizes[0], 100)
+
+    def test_relevant_blocks_come_first(self):
+        text = budget_context(news_context([f"Company{i}" for i in range(50)] + ["Apple"]), max_tokens=120)
+        self.assertTrue(text.split("\n\n")[1].startswith("🔹 News for Apple"))
+
+    def test_raw_weather_gives_way_to_its_summary(self):
+        context = {"goal": "Weather in Paris", "weather": {"main": {"temp": 294.1}, "cod": 200},
+                   "weather_summary": "Sunny, 21°C"}
+        self.assertEqual([header for header, _ in context_blocks(context)], ["🌤 Weather Summary:"])
+        del context["weather_summary"]
+        self.assertEqual(context_blocks(context), [("🔹 Weather:", ["  • main.temp: 294.1"])])
+
+
+if __name__ == "__main__":
+    unittest.main()
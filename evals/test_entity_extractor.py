@@ -0,0 +1,62 @@
+import unittest
+
+from utils.entity_extractor import extract_entities
+from utils.gazetteer import Automaton, get_gazetteer
+
+
+class TestAutomaton(unittest.TestCase):
+    def test_finds_overlapping_patterns_in_one_pass(self):
+        automaton = Automaton()
+        for word in ("he", "she", "his", "hers"):
+            automaton.add(word, ("word", word, None))
+        found = {(start, end, payload[1]) for start, end, payload in automaton.build().matches("ushers")}
+        self.assertEqual(found, {(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")})
+
+
+class TestGazetteer(unittest.TestCase):
+    def tag(self, text):
+        return [(e.text, e.type, e.value) for e in get_gazetteer().tag(text)]
+
+    def test_types_and_canonical_values(self):
+        self.assertEqual(self.tag("Apple and NVDA news in São Paulo, Brazil"), [
+            ("Apple", "company", "AAPL"), ("NVDA", "company", "NVDA"),
+            ("São Paulo", "city", "São Paulo"), ("Brazil", "country", "BR"),
+        ])
+
+    def test_leftmost_longest_whole_words(self):
+        self.assertEqual(self.tag("Flights to Mexico City"), [("Mexico City", "city", "Mexico City")])
+        # "Parisian" is not Paris, and lowercase "uk" is not the United Kingdom
+        self.assertEqual(self.tag("a Parisian cafe in the uk"), [])
+        self.assertEqual(self.tag("Rents in NYC and sao paulo"), [
+            ("NYC", "city", "New York"), ("sao paulo", "city", "São Paulo"),
+        ])
+
+
+class TestExtractEntities(unittest.TestCase):
+    def test_company_goals_get_symbols_not_cities(self):
+        info = extract_entities("Stock market impact on Apple and Microsoft")
+        self.assertEqual(info["symbols"], ["AAPL", "MSFT"])
+        self.assertEqual(info["entity_key"], "company")
+        self.assertIsNone(info["city"])
+        self.assertEqual(info["topic"], "stock market")
+
+    def test_city_goals_are_geocoded(self):
+        info = extract_entities("Weather analysis in Paris and London")
+        self.assertEqual(info["entities"], ["Paris", "London"])
+        self.assertEqual(info["entity_key"], "city")
+        self.assertEqual(info["city"], "Paris")
+        self.assertEqual(info["country"], "FR")
+
+    def test_unknown_places_and_books_keep_working(self):
+        self.assertEqual(extract_entities("Weather in Smallville")["entities"], ["Smallville"])
+        info = extract_entities("Books on gardening")
+        self.assertEqual((info["entities"], info["entity_key"]), (["gardening"], "book"))
+
+    def test_results_are_memoized_but_not_shared(self):
+        first = extract_entities("News about Tesla")
+        first["symbols"].append("XXX")
+        self.assertEqual(extract_entities("News about Tesla")["symbols"], ["TSLA"])
+
+
+if __name__ == "__main__":
+    unittest.main()
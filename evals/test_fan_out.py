@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from agents.books_agent import BooksAgent
+from utils.http import FanOut, HttpClient, Request, Response
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+        time.sleep(0.1)
+        with cls.lock:
+            cls.active -= 1
+        body = self.path.encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def fetch_all(url, n):
+    responses = yield [Request(f"{url}/{i}") for i in range(n)] + [Request("http://127.0.0.1:1/unreachable", timeout=1)]
+    return [r.text if not isinstance(r, Exception) else "error" for r in responses]
+
+
+class TestFanOut(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        SlowHandler.peak = 0
+        self.client = HttpClient()
+
+    def test_results_in_order_with_errors_in_place(self):
+        start = time.perf_counter()
+        results = self.client.drive(fetch_all(self.url, 6), max_concurrency=3)
+        self.assertEqual(results, [f"/{i}" for i in range(6)] + ["error"])
+        self.assertEqual(SlowHandler.peak, 3)
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+    def test_explicit_cap_wins(self):
+        def gen():
+            responses = yield FanOut([Request(f"{self.url}/{i}") for i in range(4)], max_concurrency=1)
+            return len(responses)
+
+        self.assertEqual(self.client.drive(gen(), max_concurrency=4), 4)
+        self.assertEqual(SlowHandler.peak, 1)
+
+    def test_async_fan_out(self):
+        async def main():
+            try:
+                return await self.client.adrive(fetch_all(self.url, 6), max_concurrency=3)
+            finally:
+                await self.client.aclose()
+
+        self.assertEqual(asyncio.run(main()), [f"/{i}" for i in range(6)] + ["error"])
+        self.assertEqual(SlowHandler.peak, 3)
+
+
+class TestPerEntityErrors(unittest.TestCase):
+    def test_books_keep_other_topics_when_one_fails(self):
+        fetch = BooksAgent().fetch({"entities": ["python", "rust"]})
+        requests = next(fetch)
+        self.assertEqual(len(requests), 2)
+        ok = Response(200, {}, b'{"items": [{"volumeInfo": {"title": "Fluent Python", "authors": ["L. Ramalho"]}}]}',
+                      requests[0].url)
+        with self.assertRaises(StopIteration) as done:
+            fetch.send([ok, TimeoutError("timed out")])
+        books = done.exception.value["books"]
+        self.assertEqual(books[0]["books"][0]["title"], "Fluent Python")
+        self.assertEqual(books[1]["topic"], "rust")
+        self.assertEqual(books[1]["books"], [])
+        self.assertIn("timed out", books[1]["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+
+from utils.geocoder import Geocoder, Place, build_index, normalize
+
+
+class TestGeocoder(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = os.path.join(self.tmp.name, "geo.idx")
+        self.journal = os.path.join(self.tmp.name, "geo.journal")
+        build_index([
+            Place("Paris", 48.8566, 2.3522, "FR", 2148000),
+            Place("Paris", 33.6609, -95.5555, "US", 24000),
+            Place("São Paulo", -23.5505, -46.6333, "BR", 12330000),
+            Place("New York", 40.7128, -74.0060, "US", 8336000),
+        ], self.index)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_normalize(self):
+        self.assertEqual(normalize("  São-Paulo "), "sao paulo")
+
+    def test_lookup_prefers_most_populous_then_normalizes(self):
+        geocoder = Geocoder(self.index)
+        self.assertEqual(geocoder.lookup("Paris").country, "FR")
+        self.assertEqual(geocoder.lookup("sao paulo").name, "São Paulo")
+        self.assertEqual(geocoder.lookup("NEW YORK").lat, 40.7128)
+        self.assertIsNone(geocoder.lookup("Atlantis"))
+        self.assertIsNone(geocoder.lookup(""))
+
+    def test_learned_places_are_journaled_for_other_processes(self):
+        Geocoder(self.index, self.journal).learn("Pune", 18.5204, 73.8567, "IN")
+        geocoder = Geocoder(self.index, self.journal)
+        self.assertEqual(geocoder.lookup("pune").country, "IN")
+        # Re-learning a known place does not grow the journal
+        geocoder.learn("Pune", 18.52, 73.86, "IN")
+        with open(self.journal) as f:
+            self.assertEqual(len(f.readlines()), 1)
+
+    def test_rebuild_folds_in_new_places(self):
+        build_index([Place("Lima", -12.0464, -77.0428, "PE")], self.index)
+        self.assertEqual(Geocoder(self.index).lookup("Lima").country, "PE")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import threading
+import time
+import unittest
+
+from agents.planner_agent import PlannerAgent, parse_chain, rule_based_plan
+from agents.registry import AGENT_SPECS
+
+AGENTS = list(AGENT_SPECS)
+
+
+class TestPlanner(unittest.TestCase):
+    def setUp(self):
+        self.planner = PlannerAgent()
+        self.planner.timeout = 0.2
+        self.calls = []
+
+    def model(self, answer, delay=0.0):
+        def llm_plan(goal, available_agents):
+            self.calls.append(goal)
+            time.sleep(delay)
+            if isinstance(answer, Exception):
+                raise answer
+            return parse_chain(answer)
+        self.planner.llm_plan = llm_plan
+
+    def test_confident_goals_are_planned_locally(self):
+        self.model("['news', 'summarizer']")
+        chain = self.planner.plan("Weather forecast and temperature in Paris", AGENTS)
+        self.assertEqual(chain[0], "weather")
+        self.assertEqual(chain[-1], "summarizer")
+        self.assertEqual(self.calls, [])
+        # A single keyword is not enough
+        self.assertEqual(self.planner.plan("Weather analysis in Paris", AGENTS), ["news", "summarizer"])
+        self.assertEqual(self.calls, ["Weather analysis in Paris"])
+
+    def test_refinements_do_not_replan_the_same_chain_locally(self):
+        goal = "Weather forecast and temperature in Paris"
+        first = rule_based_plan(goal)[0]
+        self.model("['weather', 'news', 'wikipedia_summary', 'summarizer']")
+        refined = self.planner.plan(goal, AGENTS, current_chain=first)
+        self.assertEqual(refined, ["weather", "news", "wikipedia_summary", "summarizer"])
+        self.assertNotEqual(refined, self.planner.usable(first, AGENTS))
+        self.assertEqual(self.calls, [goal])
+        # Rules that suggest something new for a different chain are still used locally
+        self.assertIn("finance", self.planner.plan("Stock market trends", AGENTS, current_chain=["news", "summarizer"]))
+        self.assertEqual(len(self.calls), 1)
+
+    def test_plans_are_cached_per_normalized_goal_and_agent_set(self):
+        self.model("```python\n['wikipedia', 'news', 'summarizer', 'unknown']\n```")
+        first = self.planner.plan("Tell me about octopuses", AGENTS)
+        self.assertEqual(first, ["wikipedia", "news", "summarizer"])
+        self.assertEqual(self.planner.plan("  tell me about Octopuses? ", AGENTS), first)
+        self.assertEqual(len(self.calls), 1)
+        self.planner.plan("Tell me about octopuses", AGENTS[:-1])
+        self.assertEqual(len(self.calls), 2)
+
+    def test_slow_or_unusable_model_falls_back_to_rules(self):
+        self.model("['news', 'summarizer']", delay=1.0)
+        start = time.perf_counter()
+        chain = self.planner.plan("Tell me about octopuses", AGENTS)
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(chain, ["news", "wikipedia_summary", "sentiment", "summarizer"])
+        for answer in ("I cannot help with that", "['summarizer']", ValueError("quota")):
+            self.model(answer)
+            self.assertEqual(self.planner.plan(f"Octopuses {answer}", AGENTS)[-1], "summarizer")
+        self.assertEqual(self.planner.stats["fallback"], 4)
+
+    def test_a_hung_model_call_does_not_hold_up_later_plans(self):
+        release = threading.Event()
+        self.planner.llm_plan = lambda goal, agents: release.wait() and parse_chain("['news', 'summarizer']")
+        self.planner.plan("Tell me about octopuses", AGENTS)
+        self.assertEqual((self.planner.stats["timeouts"], self.planner.stats["stuck"]), (1, 1))
+        self.model("['wikipedia', 'summarizer']")
+        self.assertEqual(self.planner.plan("Tell me about squid", AGENTS), ["wikipedia", "summarizer"])
+        self.assertEqual(self.planner.stats["llm"], 1)
+        release.set()
+        for _ in range(50):
+            if not self.planner.stats["stuck"]:
+                break
+            time.sleep(0.01)
+        self.assertEqual(self.planner.stats["stuck"], 0)
+
+    def test_model_is_skipped_while_too_many_calls_are_stuck(self):
+        self.model("['wikipedia', 'summarizer']")
+        self.planner.stats["stuck"] = self.planner.max_stuck_calls
+        self.planner.plan("Tell me about octopuses", AGENTS)
+        self.assertEqual(self.calls, [])
+        self.assertEqual(self.planner.stats["fallback"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
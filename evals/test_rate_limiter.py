@@ -0,0 +1,122 @@
+import asyncio
+import time
+import unittest
+from email.utils import formatdate
+from unittest import mock
+
+from requests.structures import CaseInsensitiveDict
+
+from utils.http import HttpClient, Request, Response
+from utils.rate_limiter import RateLimiter, TokenBucket, retry_after
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_refill(self):
+        bucket = TokenBucket(rate=20, capacity=2)
+        self.assertEqual(bucket._reserve(), 0.0)
+        self.assertEqual(bucket._reserve(), 0.0)
+        self.assertAlmostEqual(bucket._reserve(), 0.05, delta=0.01)
+        time.sleep(0.15)
+        self.assertEqual(bucket._reserve(), 0.0)
+
+    def test_acquire_waits_for_a_token(self):
+        bucket = TokenBucket.for_quota(calls=1, period=0.1)
+        start = time.perf_counter()
+        for _ in range(3):
+            bucket.acquire()
+        self.assertGreaterEqual(time.perf_counter() - start, 0.18)
+
+        async def acquire_twice():
+            await bucket.acquire_async()
+            await bucket.acquire_async()
+
+        start = time.perf_counter()
+        asyncio.run(acquire_twice())
+        self.assertGreaterEqual(time.perf_counter() - start, 0.09)
+
+    def test_pause_holds_back_tokens(self):
+        bucket = TokenBucket(rate=100, capacity=5)
+        bucket.pause(0.2)
+        self.assertAlmostEqual(bucket._reserve(), 0.21, delta=0.02)
+
+
+class TestRetryAfter(unittest.TestCase):
+    def test_seconds(self):
+        self.assertEqual(retry_after(429, {"Retry-After": "5"}), 5.0)
+        self.assertEqual(retry_after(503, {"Retry-After": "-3"}), 0.0)
+
+    def test_http_date(self):
+        delay = retry_after(429, {"Retry-After": formatdate(time.time() + 60, usegmt=True)})
+        self.assertAlmostEqual(delay, 60, delta=2)
+
+    def test_only_throttling_statuses_with_a_usable_header(self):
+        self.assertIsNone(retry_after(200, {"Retry-After": "5"}))
+        self.assertIsNone(retry_after(429, {}))
+        self.assertIsNone(retry_after(429, {"Retry-After": "soon"}))
+
+
+class TestRateLimiterConfig(unittest.TestCase):
+    def test_agent_endpoints_and_providers(self):
+        limiter = RateLimiter.from_config({
+            "weather": {"endpoint": "https://api.weather.test/data", "rate_limit": {"calls": 1, "period": 1}},
+            "spacex_next": {"endpoint": "https://api.spacex.test/v4", "rate_limit": {"calls": 50, "period": 10}},
+            "providers": {
+                "api.weather.test": {"rate_limit": {"calls": 5, "period": 1, "burst": 2}},
+                "news.test": {"cache_ttl": 60},
+            },
+        })
+        # The providers section wins over the agent's own declaration
+        weather = limiter.bucket_for("https://api.weather.test/data?q=Paris")
+        self.assertEqual((weather.rate, weather.capacity), (5, 2))
+        self.assertEqual(limiter.bucket_for("https://api.spacex.test/v4/launches").rate, 5)
+        self.assertIsNone(limiter.bucket_for("https://news.test/api"))
+
+
+def throttled(delay):
+    return Response(429, CaseInsensitiveDict({"Retry-After": str(delay)}), b"", "https://api.test/")
+
+
+class TestRetryLoop(unittest.TestCase):
+    def setUp(self):
+        self.bucket = TokenBucket(rate=100, capacity=10)
+        limiter = RateLimiter({})
+        limiter.buckets["api.test"] = self.bucket
+        patches = [mock.patch("utils.http.get_rate_limiter", return_value=limiter),
+                   mock.patch("utils.http.retry_policy", return_value=(2, 1))]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.client = HttpClient()
+
+    def test_throttled_request_is_retried_after_the_delay(self):
+        ok = Response(200, CaseInsensitiveDict(), b"{}", "https://api.test/")
+        with mock.patch.object(self.client, "_send_once", side_effect=[throttled(0.1), ok]) as send:
+            start = time.perf_counter()
+            response = self.client._send_limited(Request("https://api.test/"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(send.call_count, 2)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.09)
+
+    def test_retries_are_bounded(self):
+        with mock.patch.object(self.client, "_send_once", return_value=throttled(0)) as send:
+            self.assertEqual(self.client._send_limited(Request("https://api.test/")).status_code, 429)
+        self.assertEqual(send.call_count, 3)
+
+    def test_far_off_retry_after_does_not_block_the_host(self):
+        with mock.patch.object(self.client, "_send_once", return_value=throttled(86400)) as send:
+            self.assertEqual(self.client._send_limited(Request("https://api.test/")).status_code, 429)
+        self.assertEqual(send.call_count, 1)
+        # Paused for at most max_retry_after, not a day
+        self.assertLessEqual(self.bucket._reserve(), 1.1)
+
+    def test_async_path_caps_the_pause_too(self):
+        async def send():
+            with mock.patch.object(self.client, "_asend_once", mock.AsyncMock(return_value=throttled(86400))):
+                return await self.client._asend_limited(Request("https://api.test/"))
+
+        self.assertEqual(asyncio.run(send()).status_code, 429)
+        self.assertLessEqual(self.bucket._reserve(), 1.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import asyncio
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import main
+from utils.report import RENDERERS, render, write_report
+
+RESULT = {
+    "goal": "Weather in London",
+    "agent_chain": ["weather", "news", "summarizer"],
+    "entities": ["London"],
+    "weather": [{"entity": "London", "weather": "light rain", "temperature": 12}],
+    "news": [{"entity": "London", "news": ["London markets rally", "Rain expected in London"]}],
+    "summary": "London is rainy today. " * 20,
+    "errors": ["news: timed out"],
+    "processing_time": 1.234,
+}
+
+
+class TestReport(unittest.TestCase):
+    def test_sinks_share_one_analysis(self):
+        analysis = main.generate_comprehensive_analysis
+        with mock.patch.object(main, "generate_comprehensive_analysis", side_effect=analysis) as generate, \
+                mock.patch.object(sys, "stdout", io.StringIO()):
+            report = main.build_report(RESULT, RESULT["goal"])
+            terminal, copy = io.StringIO(), io.StringIO()
+            rendered = write_report(report, [("ansi", terminal), ("text", copy), ("markdown", io.StringIO()),
+                                             ("json", io.StringIO()), ("ansi", io.StringIO())])
+            self.assertFalse(sys.stdout.getvalue())
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(sorted(rendered), sorted(RENDERERS))
+        self.assertIn("\033[", terminal.getvalue())
+        self.assertNotIn("\033[", copy.getvalue())
+        # Same layout, minus the color codes
+        self.assertEqual(copy.getvalue(), render(report, "text"))
+        self.assertIn("Operational Issues: 1 errors encountered", copy.getvalue())
+        self.assertIn("Analysis Depth: Basic (80 words)", copy.getvalue())
+
+    def test_terminal_report_matches_print_functions(self):
+        report = main.build_report(RESULT, RESULT["goal"])
+        with mock.patch.object(sys, "stdout", io.StringIO()) as printed:
+            main.print_detailed_report(RESULT, RESULT["goal"])
+            main.print_execution_metrics(RESULT)
+        undated = lambda text: re.sub(r"\d{4}-\d\d-\d\d \d\d:\d\d:\d\d", "<date>", text)
+        self.assertEqual(undated(printed.getvalue()), undated(render(report, "ansi")))
+
+    def test_markdown_and_json(self):
+        report = main.build_report(RESULT, RESULT["goal"])
+        markdown = render(report, "markdown")
+        self.assertTrue(markdown.startswith("# AI Research Report"))
+        for section in report.sections:
+            self.assertIn(f"## {section.title.title()}", markdown)
+        data = json.loads(render(report, "json"))
+        self.assertEqual(data["goal"], "Weather in London")
+        self.assertEqual([s["title"] for s in data["sections"]], [s.title for s in report.sections])
+        self.assertEqual(data["metrics"]["coverage_score"], 55)
+
+    def test_writes_paths_and_rejects_unknown_formats(self):
+        report = main.build_report({}, "Anything")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "report.md")
+            write_report(report, [("markdown", path)])
+            with open(path, encoding="utf-8") as f:
+                self.assertIn("Analysis Depth:** Insufficient", f.read())
+        with self.assertRaises(ValueError):
+            render(report, "pdf")
+
+
+class TestBatchReports(unittest.TestCase):
+    def run_batch(self, report_dir):
+        import batch
+
+        async def execute(chain, goal, **kwargs):
+            return dict(RESULT)
+
+        out = io.StringIO()
+        with mock.patch.object(batch, "execute_chain_async", execute), mock.patch.object(batch.http, "aclose", mock.AsyncMock()):
+            stats = asyncio.run(batch.run_batch([{"goal": RESULT["goal"], "id": 1, "chain": ["weather"]}], out,
+                                                report_dir=report_dir, report_formats=["markdown"]))
+        return json.loads(out.getvalue()), stats
+
+    def test_reports_are_saved_per_goal(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            record, stats = self.run_batch(tmp)
+            self.assertEqual(record["status"], "ok")
+            self.assertTrue(record["reports"][0].endswith(".md"))
+            self.assertTrue(os.path.exists(record["reports"][0]))
+
+    def test_report_errors_do_not_fail_the_goal(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            record, stats = self.run_batch(os.path.join(tmp, "missing", "dir"))
+        self.assertEqual(record["status"], "ok")
+        self.assertTrue(record["summary"])
+        self.assertIn("report_error", record)
+        self.assertEqual(stats["failed"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import time
+import unittest
+from utils.scheduler import AgentGraph, AgentTimeoutError, arun_graph, run_graph, input_fingerprint
+
+
+class FakeAgent:
+    def __init__(self, consumes=(), produces=(), delay=0.05):
+        self.consumes = list(consumes)
+        self.produces = list(produces)
+        self.delay = delay
+
+
+def run_fake_chain(chain, agents):
+    events = []
+    lock = threading.Lock()
+
+    def run_agent(name):
+        with lock:
+            events.append(("start", name, time.monotonic()))
+        time.sleep(agents[name].delay)
+        with lock:
+            events.append(("end", name, time.monotonic()))
+        return name
+
+    run_graph(AgentGraph(chain, agents), run_agent, lambda name, result, error: None)
+    return events
+
+
+class TestAgentGraph(unittest.TestCase):
+    def setUp(self):
+        self.agents = {
+            "news": FakeAgent(produces=["news"]),
+            "weather": FakeAgent(produces=["weather"]),
+            "temperature": FakeAgent(consumes=["weather"], produces=["weather", "weather_summary"]),
+            "sentiment": FakeAgent(consumes=["news"], produces=["sentiment"]),
+            "summarizer": FakeAgent(consumes=["*"], produces=["summary"]),
+        }
+
+    def test_consumers_wait_for_producers(self):
+        # Chain order deliberately puts consumers first
+        chain = ["summarizer", "sentiment", "temperature", "news", "weather"]
+        events = run_fake_chain(chain, self.agents)
+        when = {(kind, name): t for kind, name, t in events}
+        self.assertGreaterEqual(when[("start", "sentiment")], when[("end", "news")])
+        self.assertGreaterEqual(when[("start", "temperature")], when[("end", "weather")])
+        for name in ["news", "weather", "temperature", "sentiment"]:
+            self.assertGreaterEqual(when[("start", "summarizer")], when[("end", name)])
+
+    def test_independent_agents_run_concurrently(self):
+        events = run_fake_chain(["news", "weather", "summarizer"], self.agents)
+        starts = [name for kind, name, _ in events[:2]]
+        self.assertEqual(sorted(starts), ["news", "weather"])
+
+    def test_duplicates_and_cycles(self):
+        agents = {
+            "a": FakeAgent(consumes=["b"], produces=["a"], delay=0),
+            "b": FakeAgent(consumes=["a"], produces=["b"], delay=0),
+        }
+        events = run_fake_chain(["a", "b", "a"], agents)
+        self.assertEqual([name for kind, name, _ in events if kind == "start"], ["a", "b"])
+
+    def test_skip_and_dependents(self):
+        chain = ["news", "weather", "temperature", "sentiment", "summarizer"]
+        graph = AgentGraph(chain, self.agents)
+        self.assertEqual(graph.dependents({"weather"}), {"temperature", "summarizer"})
+        graph.skip(["news", "sentiment"])
+        events = []
+        run_graph(graph, lambda name: events.append(name), lambda name, result, error: None)
+        self.assertEqual(sorted(events), ["summarizer", "temperature", "weather"])
+
+    def test_input_fingerprint(self):
+        data = {"weather": {"main": {"temp": 280}}, "news": []}
+        temperature = self.agents["temperature"]
+        sentiment = self.agents["sentiment"]
+        # Keys an agent rewrites itself do not count as changed inputs
+        self.assertEqual(input_fingerprint(temperature, data), input_fingerprint(temperature, {}))
+        before = input_fingerprint(sentiment, data)
+        data["news"] = [{"entity": "Paris", "news": ["headline"]}]
+        self.assertNotEqual(before, input_fingerprint(sentiment, data))
+        self.assertIsNone(input_fingerprint(self.agents["summarizer"], data))
+
+    def test_deadlines_cancel_slow_agents(self):
+        self.agents["weather"].delay = 1
+        chain = ["news", "weather", "temperature", "summarizer"]
+        deadlines = {"weather": 0.1, "temperature": 0}
+
+        def check(results, elapsed):
+            self.assertLess(elapsed, 0.8)
+            self.assertIsInstance(results["weather"], AgentTimeoutError)
+            self.assertIsInstance(results["temperature"], AgentTimeoutError)
+            self.assertIsNone(results["news"])
+            self.assertIsNone(results["summarizer"])
+
+        results = {}
+        start = time.monotonic()
+        run_graph(AgentGraph(chain, self.agents), lambda name: time.sleep(self.agents[name].delay),
+                  lambda name, result, error: results.setdefault(name, error),
+                  deadline_for=deadlines.get)
+        check(results, time.monotonic() - start)
+
+        results = {}
+        start = time.monotonic()
+        asyncio.run(arun_graph(AgentGraph(chain, self.agents), lambda name: asyncio.sleep(self.agents[name].delay),
+                               lambda name, result, error: results.setdefault(name, error),
+                               deadline_for=deadlines.get))
+        check(results, time.monotonic() - start)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+from agents.sentiment_agent import SentimentAgent
+from utils.sentiment import get_sentiment_engine
+
+# TextBlob 0.17+ polarity for each headline
+EXPECTED = {
+    "Stocks rally as strong earnings beat expectations": 0.433,
+    "Markets crash amid terrible recession fears": -1.0,
+    "This is not good": -0.35,
+    "Not a bad result": 0.35,
+    "A very good day": 0.91,
+    "Company reports quarterly results": 0.0,
+    "Great, great news!": 0.9,
+}
+
+
+class TestSentimentEngine(unittest.TestCase):
+    def test_matches_textblob_rules(self):
+        scores = get_sentiment_engine().score(list(EXPECTED))
+        for (headline, expected), score in zip(EXPECTED.items(), scores):
+            self.assertAlmostEqual(score, expected, places=3, msg=headline)
+
+    def test_rules_do_not_cross_headlines(self):
+        # A negation or modifier ending one headline must not reach into the next one
+        scores = get_sentiment_engine().score(["This is not", "good", "Very", "good"])
+        self.assertAlmostEqual(scores[1], 0.7, places=3)
+        self.assertAlmostEqual(scores[3], 0.7, places=3)
+        self.assertAlmostEqual(scores[2], 0.2, places=3)
+
+    def test_agent_scores_headlines_entities_and_overall(self):
+        result = SentimentAgent().run({"news": [
+            {"entity": "Apple", "news": ["Apple reports excellent growth", "A very good quarter"], "validated": True},
+            {"entity": "Boeing", "news": ["Boeing faces terrible losses"], "validated": True},
+            {"entity": "Nowhere", "news": ["Error: 429"], "validated": False},
+        ]})
+        self.assertEqual([e["entity"] for e in result["entities"]], ["Apple", "Boeing"])
+        self.assertEqual([e["sentiment"] for e in result["entities"]], ["Positive", "Negative"])
+        self.assertEqual(len(result["headlines"]), 3)
+        self.assertEqual(result["label"], "Positive")
+        self.assertIn("Boeing faces terrible losses", result["reasoning"])
+
+    def test_no_headlines(self):
+        result = SentimentAgent().run({})
+        self.assertEqual((result["score"], result["label"]), (0.0, "Neutral"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import http.client
+import json
+import threading
+import unittest
+from http.server import ThreadingHTTPServer
+from unittest import mock
+
+import service
+
+
+def run_goal(payload):
+    goal, chain = service.parse_goal(payload)
+    return {"goal": goal, "agent_chain": chain, "summary": "All clear."}
+
+
+def stream_chain(chain, goal, max_iterations=3, latency_budget=None):
+    for name in chain:
+        yield {"type": "agent", "agent": name, "status": "success"}
+    yield {"type": "done", "record": {"goal": goal, "agent_chain": chain}}
+
+
+class TestService(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.patches = [mock.patch.object(service, "run_goal", run_goal),
+                       mock.patch.object(service, "stream_chain", stream_chain)]
+        for patch in cls.patches:
+            patch.start()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), service.GoalRequestHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        for patch in cls.patches:
+            patch.stop()
+
+    def request(self, method, path, body=None):
+        conn = http.client.HTTPConnection(*self.server.server_address, timeout=5)
+        self.addCleanup(conn.close)
+        conn.request(method, path, body=body, headers={"Content-Type": "application/json"} if body else {})
+        response = conn.getresponse()
+        return response, response.read()
+
+    def test_health(self):
+        response, body = self.request("GET", "/health")
+        self.assertEqual(response.status, 200)
+        data = json.loads(body)
+        self.assertEqual(data["status"], "ok")
+        self.assertEqual(data["agents"], sorted(service.available_agents))
+
+    def test_goal(self):
+        response, body = self.request("POST", "/goals", json.dumps({"goal": "Weather in Paris", "chain": ["weather"]}))
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader("Content-Type"), "application/json")
+        self.assertEqual(json.loads(body), {"goal": "Weather in Paris", "agent_chain": ["weather"],
+                                            "summary": "All clear."})
+
+    def test_bad_requests(self):
+        for body in ("{not json", "[1, 2]"):
+            with self.subTest(body=body):
+                response, data = self.request("POST", "/goals", body)
+                self.assertEqual(response.status, 400)
+                self.assertTrue(json.loads(data)["error"].startswith("invalid request:"))
+        response, data = self.request("POST", "/goals", json.dumps({"goal": "x", "chain": ["nope"]}))
+        self.assertEqual((response.status, json.loads(data)), (400, {"error": "Unknown agents: nope"}))
+
+    def test_unknown_paths(self):
+        for method, path in (("GET", "/goals"), ("POST", "/nowhere")):
+            with self.subTest(path=path):
+                response, body = self.request(method, path, "{}" if method == "POST" else None)
+                self.assertEqual((response.status, json.loads(body)), (404, {"error": "not found"}))
+
+    def test_stream_is_one_json_event_per_line(self):
+        response, body = self.request("POST", "/goals/stream",
+                                      json.dumps({"goal": "Weather in Paris", "chain": ["weather", "summarizer"]}))
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader("Content-Type"), "application/x-ndjson")
+        self.assertEqual(response.getheader("Connection"), "close")
+        self.assertTrue(body.endswith(b"\n"))
+        events = [json.loads(line) for line in body.decode("utf-8").splitlines()]
+        self.assertEqual([e.get("agent") for e in events[:-1]], ["weather", "summarizer"])
+        self.assertEqual(events[-1], {"type": "done", "record": {"goal": "Weather in Paris",
+                                                                  "agent_chain": ["weather", "summarizer"]}})
+
+    def test_stream_rejects_a_bad_goal_before_streaming(self):
+        response, body = self.request("POST", "/goals/stream", json.dumps({"chain": ["weather"]}))
+        self.assertEqual((response.status, json.loads(body)), (400, {"error": "'goal' is required"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import asyncio
+import contextvars
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.singleflight import SingleFlight, run_group, run_scope
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_threads_share_one_call(self):
+        group = SingleFlight()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.1)
+            return "response"
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            results = list(pool.map(lambda _: group.do("url", fetch), range(5)))
+        self.assertEqual(results, ["response"] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(group.shared, 4)
+        # Nothing is remembered once the call completes
+        group.do("url", fetch)
+        self.assertEqual(len(calls), 2)
+
+    def test_errors_are_shared_but_not_remembered(self):
+        group = SingleFlight(remember=True)
+
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            group.do("url", fail)
+        self.assertEqual(group.do("url", lambda: "ok"), "ok")
+
+    def test_run_scope_remembers_kept_results(self):
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return len(calls)
+
+        with run_scope() as group:
+            self.assertIs(run_group(), group)
+            self.assertEqual(group.do("a", fetch), 1)
+            self.assertEqual(group.do("a", fetch), 1)
+            self.assertEqual(group.do("b", fetch, keep=lambda result: False), 2)
+            self.assertEqual(group.do("b", fetch), 3)
+        self.assertIsNone(run_group())
+
+    def test_run_scope_reaches_copied_thread_context(self):
+        with run_scope() as group:
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                seen = pool.submit(contextvars.copy_context().run, run_group).result()
+        self.assertIs(seen, group)
+
+
+class TestAsyncSingleFlight(unittest.TestCase):
+    def test_concurrent_tasks_share_one_call(self):
+        group = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "response"
+
+        async def main():
+            return await asyncio.gather(*(group.ado("url", fetch) for _ in range(5)))
+
+        self.assertEqual(asyncio.run(main()), ["response"] * 5)
+        self.assertEqual(len(calls), 1)
+
+    def test_waiter_takes_over_when_leader_is_cancelled(self):
+        group = SingleFlight()
+        started = threading.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(10)
+
+        async def fast():
+            return "response"
+
+        async def main():
+            leader = asyncio.create_task(group.ado("url", slow))
+            await asyncio.sleep(0.01)
+            waiter = asyncio.create_task(group.ado("url", fast))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await asyncio.wait_for(waiter, 1)
+
+        self.assertEqual(asyncio.run(main()), "response")
+        self.assertTrue(started.is_set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import asyncio
+import time
+import unittest
+from concurrent.futures import Future
+from unittest import mock
+
+import main
+from agents.base_agent import BaseAgent
+from utils.http import HttpClient, Request, Response
+
+
+class Agent:
+    def __init__(self, name, consumes, produces, calls, delay=0.0, result=None):
+        self.name, self.consumes, self.produces = name, consumes, produces
+        self.calls, self.delay, self.result = calls, delay, result
+
+    def run(self, context):
+        self.calls.append(self.name)
+        time.sleep(self.delay)
+        return self.result(context) if self.result else {self.produces[0]: self.name}
+
+    async def arun(self, context):
+        return await asyncio.to_thread(self.run, context)
+
+
+class SlowClient(HttpClient):
+    def __init__(self):
+        super().__init__()
+        self.sent = []
+
+    def send(self, request):
+        self.sent.append(request.url)
+        time.sleep(0.1)
+        return Response(200, {}, b"{}", request.url)
+
+
+class Fetcher(BaseAgent):
+    consumes = ["goal"]
+    produces = ["extra"]
+
+    def fetch(self, context):
+        for i in range(10):
+            yield Request(f"http://provider.invalid/{i}")
+        return {"extra": "extra"}
+
+
+class TestSpeculativePlanning(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        summary = lambda context: "word " * 40 if "extra" in context or context["goal"] == "easy goal" else "short"
+        agents = {
+            "base": Agent("base", ["goal"], ["base"], self.calls, delay=0.3),
+            "extra": Agent("extra", ["goal"], ["extra"], self.calls, delay=0.3),
+            "derived": Agent("derived", ["base"], ["derived"], self.calls),
+            "summarizer": Agent("summarizer", ["*"], ["summary"], self.calls, result=summary),
+        }
+        patches = [
+            mock.patch.object(main, "available_agents", agents),
+            mock.patch.object(main.planner, "plan", self.plan),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def plan(self, goal, available_agents, current_chain=None):
+        self.assertEqual(current_chain, ["base", "summarizer"])
+        time.sleep(0.1)
+        return ["base", "extra", "derived", "summarizer"]
+
+    def test_new_root_agents_are_prefetched_and_committed(self):
+        start = time.perf_counter()
+        result = main.execute_chain(["base", "summarizer"], "hard goal", verbose=False, speculative=True)
+        self.assertLess(time.perf_counter() - start, 0.6)
+        self.assertEqual(result["extra"], "extra")
+        # Prefetched once, and never the agents that depend on chain output
+        self.assertEqual(self.calls.count("extra"), 1)
+        self.assertEqual(self.calls[:2], ["base", "extra"])
+        self.assertEqual(result["agent_chain"], ["base", "extra", "derived", "summarizer"])
+
+    def test_prefetches_are_discarded_without_refinement(self):
+        result = main.execute_chain(["base", "summarizer"], "easy goal", verbose=False, speculative=True)
+        self.assertNotIn("extra", result)
+        self.assertNotIn("extra", [step["agent"] for step in result["trajectory_log"]])
+
+    def test_discarded_prefetches_stop_fetching(self):
+        fetcher = Fetcher()
+        fetcher.http_client = SlowClient()
+        main.available_agents["extra"] = fetcher
+        main.execute_chain(["base", "summarizer"], "easy goal", verbose=False, speculative=True)
+        sent = len(fetcher.http_client.sent)
+        time.sleep(0.3)
+        self.assertLess(sent, 10)
+        self.assertLessEqual(len(fetcher.http_client.sent), sent + 1)
+
+    def test_cancelled_plan_prefetches_nothing(self):
+        # As the executor's cancel_futures leaves a plan that never started
+        speculation = mock.Mock(spec=main.Speculation)
+        plan = Future()
+        plan.cancel()
+        main.Speculation._prefetch(speculation, plan)
+        speculation.prefetchable.assert_not_called()
+
+    def test_late_plan_falls_back_to_rules(self):
+        with mock.patch.object(main.planner, "timeout", 0.05), \
+                mock.patch.object(main.planner, "plan", lambda goal, agents, current_chain: time.sleep(1) or ["extra"]), \
+                self.assertLogs(level="WARNING"):
+            start = time.perf_counter()
+            result = main.execute_chain(["base", "summarizer"], "hard goal", max_iterations=1,
+                                        verbose=False, speculative=True)
+        self.assertLess(time.perf_counter() - start, 0.8)
+        self.assertEqual(result["agent_chain"], main.rule_based_plan("hard goal")[0])
+
+    def test_waiting_for_prefetches_does_not_block_the_loop(self):
+        main.available_agents["extra"].delay = 0.8
+
+        async def run():
+            gaps, done = [], asyncio.Event()
+
+            async def ticker():
+                last = time.perf_counter()
+                while not done.is_set():
+                    await asyncio.sleep(0.02)
+                    now = time.perf_counter()
+                    gaps.append(now - last)
+                    last = now
+
+            task = asyncio.create_task(ticker())
+            result = await main.execute_chain_async(["base", "summarizer"], "hard goal", verbose=False, speculative=True)
+            done.set()
+            await task
+            return result, max(gaps)
+
+        result, longest_stall = asyncio.run(run())
+        self.assertEqual(result["extra"], "extra")
+        self.assertEqual(self.calls.count("extra"), 1)
+        self.assertLess(longest_stall, 0.2)
+
+    def test_async_engine(self):
+        result = asyncio.run(main.execute_chain_async(["base", "summarizer"], "hard goal", verbose=False, speculative=True))
+        self.assertEqual(result["extra"], "extra")
+        self.assertEqual(self.calls.count("extra"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
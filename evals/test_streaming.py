@@ -0,0 +1,102 @@
+import contextvars
+import threading
+import unittest
+from unittest import mock
+
+import main
+from utils import streaming
+from agents.summarizer_agent import SummarizerAgent
+from evals.test_summarizer import FakePipeline
+
+
+class TestStreaming(unittest.TestCase):
+    def test_events_are_dropped_without_a_sink(self):
+        self.assertFalse(streaming.active())
+        streaming.emit("agent", agent="weather")
+
+    def test_events_follow_the_run_into_threads(self):
+        def run():
+            streaming.emit("agent", agent="weather")
+            # As the scheduler submits agents: in a copy of the caller's context
+            worker = threading.Thread(target=contextvars.copy_context().run,
+                                      args=(lambda: streaming.emit("agent", agent="news"),))
+            worker.start()
+            worker.join()
+            return "result"
+
+        events = streaming.stream_events(run)
+        received = []
+        while True:
+            try:
+                received.append(next(events))
+            except StopIteration as done:
+                self.assertEqual(done.value, "result")
+                break
+        self.assertEqual([e["agent"] for e in received], ["weather", "news"])
+        self.assertFalse(streaming.active())
+
+    def test_errors_are_raised_to_the_consumer(self):
+        def run():
+            streaming.emit("agent", agent="weather")
+            raise RuntimeError("boom")
+
+        events = streaming.stream_events(run)
+        self.assertEqual(next(events)["agent"], "weather")
+        with self.assertRaises(RuntimeError):
+            next(events)
+
+    def test_summary_sections_stream_per_batch(self):
+        agent = SummarizerAgent()
+        agent.cohere_api_key = ""
+        agent.summary_cache = None
+        agent._bart_summarizer = FakePipeline()
+        agent.chunk_tokens, agent.batch_size = 20, 1
+        text = " ".join(f"Sentence number {i} about the weather." for i in range(12))
+        received = []
+        with streaming.stream_to(received.append):
+            summary = agent.run({"goal": text})
+        sections = [e for e in received if e["type"] == "summary_section"]
+        self.assertGreater(len(sections), 1)
+        for event in sections:
+            self.assertIn(f"🧾 Section {event['index']}:\n{event['text']}", summary)
+
+
+class Agent:
+    def __init__(self, consumes, produces, result):
+        self.consumes, self.produces, self.result = consumes, produces, result
+
+    def run(self, context):
+        return self.result
+
+
+class TestStreamChain(unittest.TestCase):
+    def setUp(self):
+        agents = {
+            "weather": Agent(["goal"], ["weather"], {"weather": {"main": {"temp": 288.15, "feels_like": 287.0},
+                                                                 "weather": [{"description": "light rain"}]}}),
+            "summarizer": Agent(["*"], ["summary"], "word " * 40),
+        }
+        patcher = mock.patch.object(main, "available_agents", agents)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_data_sections_stream_when_the_summarizer_starts(self):
+        events = list(main.stream_chain(["weather", "summarizer"], "Weather in London"))
+        types = [e["type"] for e in events]
+        thematic = next(e for e in events if e["type"] == "section" and e["title"] == "THEMATIC ANALYSIS")
+        self.assertIn("15.0°C", thematic["content"])
+        # Streamed during the run, before the summarizer's result
+        self.assertEqual(thematic["iteration"], 1)
+        self.assertLess(events.index(thematic), types.index("done"))
+        self.assertEqual(events[-1]["record"]["summary"].split()[0], "word")
+
+    def test_section_errors_do_not_abort_the_run(self):
+        with mock.patch.object(main, "data_sections", side_effect=RuntimeError("bad report")), \
+                self.assertLogs(level="WARNING"):
+            events = list(main.stream_chain(["weather", "summarizer"], "Weather in London"))
+        self.assertEqual(events[-1]["type"], "done")
+        self.assertTrue(events[-1]["record"]["summary"])
+
+
+if __name__ == "__main__":
+    unittest.main()
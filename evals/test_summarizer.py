@@ -0,0 +1,179 @@
+import json
+import threading
+import time
+import unittest
+
+from requests.structures import CaseInsensitiveDict
+
+from agents.summarizer_agent import SummarizerAgent
+from utils.cache import open_cache
+from utils.http import Response
+
+
+class FakeTokenizer:
+    def encode(self, text, add_special_tokens=False):
+        return text.split()
+
+
+class FakePipeline:
+    tokenizer = FakeTokenizer()
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, inputs, **kwargs):
+        self.calls += 1
+        texts = inputs if isinstance(inputs, list) else [inputs]
+        return [{"summary_text": "a detailed summary of the findings " + " ".join(t.split()[:8])} for t in texts]
+
+
+class TestSummaryMemo(unittest.TestCase):
+    def setUp(self):
+        self.agent = SummarizerAgent()
+        self.agent.cohere_api_key = ""
+        self.agent.summary_cache = open_cache(16)
+        self.agent._bart_summarizer = self.pipeline = FakePipeline()
+        self.context = {"goal": "Weather in Paris", "weather_summary": "Sunny, 21°C"}
+
+    def test_identical_input_is_summarized_once(self):
+        first = self.agent.run(dict(self.context))
+        calls = self.pipeline.calls
+        # The next refinement iteration sees its own previous summary in the context
+        second = self.agent.run(dict(self.context, summary=first))
+        self.assertEqual(first, second)
+        self.assertEqual(self.pipeline.calls, calls)
+        self.assertEqual(self.agent.summary_cache.stats()["memory_hits"], 1)
+
+    def test_changed_input_or_settings_miss(self):
+        self.agent.run(dict(self.context))
+        calls = self.pipeline.calls
+        self.agent.run(dict(self.context, weather_summary="Rain, 12°C"))
+        self.assertGreater(self.pipeline.calls, calls)
+        text = self.agent.format_context(self.context)
+        key = self.agent.summary_key(text, "bart")
+        self.agent.chunk_tokens += 1
+        self.assertNotEqual(key, self.agent.summary_key(text, "bart"))
+        self.assertNotEqual(key, self.agent.summary_key(text, "cohere"))
+
+
+COHERE_SUMMARY = "Paris is sunny and mild today, with clear skies expected to continue through the weekend."
+
+
+class FailingPipeline(FakePipeline):
+    """Records each forward pass and fails any pass that includes ``bad``."""
+
+    def __init__(self, bad):
+        super().__init__()
+        self.bad = bad
+        self.passes = []
+
+    def __call__(self, inputs, **kwargs):
+        texts = inputs if isinstance(inputs, list) else [inputs]
+        self.passes.append(list(texts))
+        if self.bad in texts:
+            raise RuntimeError("index out of range in self")
+        return [{"summary_text": f"summary of {t}"} for t in texts]
+
+
+class TestSummarizeBatch(unittest.TestCase):
+    TEXTS = ["a" * 9, "b" * 3, "c" * 7, "d" * 1, "e" * 5]
+
+    def setUp(self):
+        self.agent = SummarizerAgent()
+        self.agent.batch_size = 2
+
+    def test_batches_by_length_and_restores_order(self):
+        self.agent._bart_summarizer = pipeline = FailingPipeline(bad=None)
+        summaries = self.agent.summarize_batch(self.TEXTS)
+        self.assertEqual(summaries, [f"summary of {t}" for t in self.TEXTS])
+        self.assertEqual(pipeline.passes, [["d", "bbb"], ["eeeee", "ccccccc"], ["a" * 9]])
+
+    def test_failed_batch_is_retried_per_input(self):
+        self.agent._bart_summarizer = pipeline = FailingPipeline(bad="ccccccc")
+        with self.assertLogs(level="WARNING"):
+            summaries = self.agent.summarize_batch(self.TEXTS)
+        self.assertEqual(summaries, ["summary of " + "a" * 9, "summary of bbb", None, "summary of d",
+                                     "summary of eeeee"])
+        self.assertIn(["eeeee"], pipeline.passes)
+        self.assertIn(["ccccccc"], pipeline.passes)
+
+    def test_on_summary_follows_batches_and_skips_failures(self):
+        self.agent._bart_summarizer = FailingPipeline(bad="ccccccc")
+        received = []
+        with self.assertLogs(level="WARNING"):
+            self.agent.summarize_batch(self.TEXTS, on_summary=lambda i, summary: received.append(i))
+        self.assertEqual(received, [3, 1, 4, 0])
+
+    def test_cancellation_stops_before_the_next_batch(self):
+        self.agent._bart_summarizer = pipeline = FailingPipeline(bad=None)
+        cancelled = threading.Event()
+        summaries = self.agent.summarize_batch(self.TEXTS, on_summary=lambda i, summary: cancelled.set(),
+                                               cancelled=cancelled)
+        self.assertEqual(len(pipeline.passes), 1)
+        self.assertEqual(summaries, [None, "summary of bbb", None, "summary of d", None])
+
+
+class FakeCohere:
+    """Stands in for the HTTP client: answers with ``statuses`` in turn, after ``delay`` seconds."""
+
+    def __init__(self, statuses, delay=0.0):
+        self.statuses = list(statuses)
+        self.delay = delay
+        self.calls = 0
+
+    def send(self, request):
+        self.calls += 1
+        time.sleep(self.delay)
+        status = self.statuses.pop(0) if self.statuses else 200
+        body = json.dumps({"summary": COHERE_SUMMARY} if status == 200 else {"message": "error"}).encode()
+        return Response(status, CaseInsensitiveDict(), body, request.url)
+
+
+class TestHedgedSummary(unittest.TestCase):
+    def setUp(self):
+        self.agent = SummarizerAgent()
+        self.agent.cohere_api_key = "key"
+        self.agent.summary_cache = open_cache(16)
+        self.agent._bart_summarizer = self.pipeline = FakePipeline()
+        self.agent.hedge_delay = 0.2
+        self.agent.cohere_backoff = 0.01
+        self.context = {"goal": "Weather in Paris", "weather_summary": "Sunny, 21°C"}
+
+    def test_fast_cohere_wins_without_bart(self):
+        self.agent.http_client = FakeCohere([200])
+        summary = self.agent.run(dict(self.context))
+        self.assertIn(COHERE_SUMMARY, summary)
+        self.assertEqual(self.pipeline.calls, 0)
+
+    def test_transient_errors_are_retried(self):
+        self.agent.http_client = cohere = FakeCohere([503, 429])
+        summary = self.agent.run(dict(self.context))
+        self.assertIn(COHERE_SUMMARY, summary)
+        self.assertEqual(cohere.calls, 3)
+
+    def test_failed_cohere_falls_back_to_bart(self):
+        self.agent.http_client = cohere = FakeCohere([401])
+        summary = self.agent.run(dict(self.context))
+        self.assertIn("(Local BART)", summary)
+        self.assertEqual(cohere.calls, 1)
+        # Memoized under the engine that produced it
+        self.assertEqual(self.agent.run(dict(self.context)), summary)
+        self.assertEqual(cohere.calls, 1)
+
+    def test_slow_cohere_is_hedged(self):
+        self.agent.http_client = FakeCohere([200], delay=2.0)
+        start = time.perf_counter()
+        summary = self.agent.run(dict(self.context))
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertIn("(Local BART)", summary)
+
+    def test_losing_retries_stop(self):
+        self.agent.http_client = cohere = FakeCohere([500] * 10)
+        self.agent.cohere_retries, self.agent.cohere_backoff = 10, 0.5
+        self.assertIn("(Local BART)", self.agent.run(dict(self.context)))
+        time.sleep(0.6)
+        self.assertLessEqual(cohere.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,88 +1,29 @@
 #main.py
-import json, dotenv, requests, time, sys
-import datetime
+import dotenv, time, sys
+import asyncio
+import contextvars
 import os
-from textwrap import fill
-from agents.planner_agent import PlannerAgent
-from agents.api_fetch_agent import APIFetchAgent
-from agents.summarizer_agent import SummarizerAgent
-from agents.news_agent import NewsAgent
-from agents.wikipedia_agent import WikipediaAgent
-from agents.holidays_agent import HolidaysAgent
-from agents.air_quality_agent import AirQualityAgent
-from agents.finance_agent import FinanceAgent
-from agents.books_agent import BooksAgent
-from agents.covid_agent import COVIDAgent
-from agents.sports_agent import SportsAgent
-from agents.movies_agent import MoviesAgent
-from agents.sentiment_agent import SentimentAgent
-from agents.factcheck_agent import FactCheckAgent
-from agents.exchange_rate_agent import ExchangeRateAgent
-from agents.weather_alerts_agent import WeatherAlertsAgent
-from agents.wikipedia_summary_agent import WikipediaSummaryAgent
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, wait
+from agents.planner_agent import PlannerAgent, rule_based_plan
+from agents.registry import AgentRegistry
 from utils.entity_extractor import extract_entities
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from agents.health_agent import HealthAgent
-from agents.heatcheck_agent import HeatCheckAgent
-from agents.pollution_agent import PollutionAgent
-from agents.traffic_agent import TrafficAgent
-from agents.currency_agent import CurrencyAgent
-from agents.event_agent import EventAgent
-from agents.job_market_agent import JobMarketAgent
-from agents.temperature_agent import TemperatureAgent
-from agents.base_agent import BaseAgent
+from utils.config import get_section
 from utils.context import AgentContext
+from utils.scheduler import AgentGraph, AgentTimeoutError, WILDCARD, dedupe_chain, run_graph, arun_graph, input_fingerprint
+from utils.singleflight import run_scope
+from utils import http, streaming
+from utils.report import (BLUE, BOLD, CYAN, EXTENSIONS, GREEN, MAGENTA, RED, RESET, TEXT_WIDTH, YELLOW, Metrics,
+                          Report, Section, render, render_lines, report_basename, wrap_text, write_report)
 import logging
 
-# Terminal color codes
-BOLD = "\033[1m"
-CYAN = "\033[96m"
-GREEN = "\033[92m"
-YELLOW = "\033[93m"
-RED = "\033[91m"
-BLUE = "\033[94m"
-MAGENTA = "\033[95m"
-RESET = "\033[0m"
-
-# Text width for wrapping
-TEXT_WIDTH = 80
-
 dotenv.load_dotenv()
 
-with open('configs/agents.json') as f:
-    configs = json.load(f)
+def load_agents(configs=None):
+    # Agents are imported and constructed on first use, see agents/registry.py
+    return AgentRegistry(configs)
 
-def load_agents(configs):
-    # Dynamically load agents, can be extended for plugin support
-    return {
-        "weather": APIFetchAgent(configs["weather"]),
-        "spacex_next": APIFetchAgent(configs["spacex_next"]),
-        "news": NewsAgent(),
-        "summarizer": SummarizerAgent(),
-        "wikipedia": WikipediaAgent(),
-        "holidays": HolidaysAgent(),
-        "air_quality": AirQualityAgent(),
-        "finance": FinanceAgent(),
-        "books": BooksAgent(),
-        "covid": COVIDAgent(),
-        "sports": SportsAgent(),
-        "movies": MoviesAgent(),
-        "sentiment": SentimentAgent(),
-        "fact_check": FactCheckAgent(),
-        "exchange_rate": ExchangeRateAgent(),
-        "weather_alerts": WeatherAlertsAgent(),
-        "wikipedia_summary": WikipediaSummaryAgent(),
-        "health": HealthAgent(),
-        "heat_check": HeatCheckAgent(),
-        "pollution": PollutionAgent(),
-        "traffic": TrafficAgent(),
-        "currency": CurrencyAgent(),
-        "events": EventAgent(),
-        "job_market": JobMarketAgent(),
-        "temperature": TemperatureAgent(),
-    }
-
-available_agents = load_agents(configs)
+available_agents = load_agents()
 
 planner = PlannerAgent()
 
@@ -93,10 +34,6 @@ def print_section(title, color=CYAN):
 def print_agent_step(agent_name, step, color=YELLOW):
     print(f"{color}{BOLD}[{agent_name}]{RESET} {step}")
 
-def wrap_text(text, indent=0, width=TEXT_WIDTH):
-    """Wrap text with proper indentation and line breaks"""
-    return fill(text, width=width, initial_indent=' '*indent, subsequent_indent=' '*indent)
-
 def print_paragraph(title, content, color=RESET, indent=0):
     """Print formatted paragraph with title and wrapped content"""
     if not content:
@@ -129,125 +66,429 @@ def evaluate_planner_routing(old_chain, new_chain):
         print(f"{GREEN}Planner refined the agent chain for better goal satisfaction.{RESET}")
     print()
 
-def execute_chain(chain, goal, max_iterations=3):
-    context = AgentContext(
-        goal=goal,
-        start_time=time.time(),
-        entities=extract_entities(goal).get("entities", []),
-        entity_key=extract_entities(goal).get("entity_key", "general"),
-        agent_chain=chain
-    )
-    satisfied = False
-    iteration = 1
-    trajectory_log = []
-
-    while not satisfied and iteration <= max_iterations:
-        print_section(f"Execution Iteration {iteration}", MAGENTA)
-        context_snapshot_before = dict(context.data)  # For trajectory tracking
-
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            futures = {executor.submit(available_agents[agent_name].run, context.data): agent_name for agent_name in chain}
-            for future in as_completed(futures):
-                agent_name = futures[future]
-                keys_before = list(context.data.keys())
-                try:
-                    result = future.result()
-                    # --- FIX: update context.data, not context ---
-                    if agent_name == "spacex_next" and isinstance(result, dict):
-                        context.data.update(result)
-                        launchpad_id = result.get("launchpad")
-                        if launchpad_id:
-                            pad_resp = requests.get(f"https://api.spacexdata.com/v4/launchpads/{launchpad_id}")
-                            if pad_resp.ok:
-                                pad = pad_resp.json()
-                                if pad.get("locality"):
-                                    context.data["launch_location"] = pad["locality"]
-                                if pad.get("latitude") and pad.get("longitude"):
-                                    context.data["lat"] = pad["latitude"]
-                                    context.data["lon"] = pad["longitude"]
-                    elif agent_name == "summarizer":
-                        context.data["summary"] = result
-                    elif agent_name == "sentiment":
-                        context.data["sentiment_score"] = result.get("score", 0)
-                        context.data["sentiment"] = result.get("label", "Neutral")
-                        context.data["sentiment_reasoning"] = result.get("reasoning", "")
-                    elif isinstance(result, dict):
-                        context.data.update(result)
-                    else:
-                        context.data[agent_name] = result
-
-                    print_agent_step(agent_name, "Completed successfully", GREEN)
-                    keys_after = list(context.data.keys())
-                    trajectory_log.append({
-                        "agent": agent_name,
-                        "context_keys_before": keys_before,
-                        "context_keys_after": keys_after,
-                        "error": None
-                    })
-                except Exception as e:
-                    logging.error(f"Agent {agent_name} failed: {str(e)}", exc_info=True)
-                    context.errors.append(f"{agent_name}: {str(e)}")
-                    print_agent_step(agent_name, f"Error: {str(e)}", RED)
-                    keys_after = list(context.data.keys())
-                    trajectory_log.append({
-                        "agent": agent_name,
-                        "context_keys_before": keys_before,
-                        "context_keys_after": keys_after,
-                        "error": str(e)
-                    })
-                time.sleep(0.1)
-
+def merge_agent_result(context, agent_name, result):
+    """Merge one agent's output into the shared context data."""
+    # --- FIX: update context.data, not context ---
+    if agent_name == "summarizer":
+        context.data["summary"] = result
+    elif agent_name == "sentiment":
+        context.data["sentiment_score"] = result.get("score", 0)
+        context.data["sentiment"] = result.get("label", "Neutral")
+        context.data["sentiment_reasoning"] = result.get("reasoning", "")
+        context.data["entity_sentiment"] = result.get("entities", [])
+        context.data["headline_sentiment"] = result.get("headlines", [])
+    elif isinstance(result, dict):
+        context.data.update(result)
+    else:
+        context.data[agent_name] = result
+
+class ChainRun:
+    """State for one execute_chain call, shared by the sync and async engines."""
+
+    def __init__(self, chain, goal, latency_budget=None, verbose=True, speculative=None):
+        entity_info = extract_entities(goal)
+        self.goal = goal
+        self.verbose = verbose
+        self.chain = chain
+        self.context = AgentContext(
+            goal=goal,
+            start_time=time.time(),
+            entities=entity_info.get("entities", []),
+            entity_key=entity_info.get("entity_key", "general"),
+            agent_chain=chain
+        )
+        # Seed the inputs agents consume; everything else is produced by the chain
+        self.context.data.update({k: v for k, v in entity_info.items() if v})
+        self.context.data["goal"] = goal
+        self.trajectory_log = []
+        self.iteration = 1
+        self.satisfied = False
+        # agent name -> {"ok": bool, "inputs": fingerprint at dispatch}
+        self.history = {}
+        execution = get_section("execution")
+        self.latency_budget = latency_budget or execution.get("latency_budget")
+        self.default_deadline = execution.get("default_deadline")
+        self.deadlines = execution.get("deadlines", {})
+        self.graph = None
+        self.speculative = execution.get("speculative_planning", False) if speculative is None else speculative
+        self.speculation = None
+
+    def start_iteration(self):
+        """Print the iteration banner and return the dependency graph to execute."""
+        if self.verbose:
+            print_section(f"Execution Iteration {self.iteration}", MAGENTA)
+        # Dispatch each agent as soon as the agents producing its inputs are done
+        graph = AgentGraph(self.chain, available_agents)
+        reused = [name for name in graph.chain if name not in self.stale_agents(graph)]
+        if reused:
+            graph.skip(reused)
+            if self.verbose:
+                print(f"{BOLD}Reusing results from previous iterations:{RESET} {GREEN}{', '.join(reused)}{RESET}")
+        self.graph = graph
+        if self.speculative and self.iteration == 1:
+            self.speculation = Speculation(self)
+        return graph
+
+    def remaining_budget(self):
+        if not self.latency_budget:
+            return None
+        return self.latency_budget - (time.time() - self.context.start_time)
+
+    def deadline_for(self, agent_name):
+        """
+        Seconds the agent may take: its own deadline, capped by the remaining latency budget.
+        Regular agents also leave room for the summarizer so it always gets to run on
+        whatever data has arrived.
+        """
+        deadline = self.deadlines.get(agent_name, self.default_deadline)
+        remaining = self.remaining_budget()
+        if remaining is None:
+            return deadline
+        if not self._is_wildcard(agent_name):
+            reserve = max([self.deadlines.get(name, self.default_deadline) or 0
+                           for name in self.graph.pending if self._is_wildcard(name)] or [0])
+            # Never reserve more than half of what is left, or tight budgets starve every fetcher
+            remaining -= min(reserve, remaining / 2)
+        return remaining if deadline is None else min(deadline, remaining)
+
+    def _is_wildcard(self, agent_name):
+        return WILDCARD in (getattr(available_agents[agent_name], "consumes", []) or [])
+
+    def has_budget(self):
+        remaining = self.remaining_budget()
+        return remaining is None or remaining > 0
+
+    def stale_agents(self, graph):
+        """
+        Agents that must (re-)run: new to the chain, failed last time, or whose
+        inputs changed since they ran - plus everything downstream of those.
+        """
+        data = self.context.data
+        stale = set()
+        for name in graph.chain:
+            record = self.history.get(name)
+            inputs = input_fingerprint(available_agents[name], data)
+            if record is None or not record["ok"] or inputs is None or inputs != record["inputs"]:
+                stale.add(name)
+        return stale | graph.dependents(stale)
+
+    def handle_start(self, agent_name):
+        if self._is_wildcard(agent_name) and streaming.active():
+            # Everything but the summary is known once the summarizer starts
+            self.stream_data_sections()
+        self.history[agent_name] = {
+            "ok": False,
+            "inputs": input_fingerprint(available_agents[agent_name], self.context.data),
+        }
+
+    def handle_result(self, agent_name, result, error):
+        context = self.context
+        keys_before = list(context.data.keys())
+        if error is None:
+            try:
+                merge_agent_result(context, agent_name, result)
+            except Exception as e:
+                error = e
+        if error is None:
+            # Agents that report validated=False are retried on refinement as well
+            self.history[agent_name]["ok"] = not (isinstance(result, dict) and result.get("validated") is False)
+            if self.verbose:
+                print_agent_step(agent_name, "Completed successfully", GREEN)
+        else:
+            if isinstance(error, AgentTimeoutError):
+                logging.warning(f"Agent {agent_name} cancelled: {str(error)}")
+            else:
+                logging.error(f"Agent {agent_name} failed: {str(error)}", exc_info=error)
+            context.errors.append(f"{agent_name}: {str(error)}")
+            if self.verbose:
+                print_agent_step(agent_name, f"Error: {str(error)}", RED)
+        streaming.emit("agent", agent=agent_name, iteration=self.iteration, ok=error is None,
+                       result=result if error is None else None, error=str(error) if error is not None else None)
+        self.trajectory_log.append({
+            "agent": agent_name,
+            "context_keys_before": keys_before,
+            "context_keys_after": list(context.data.keys()),
+            "error": str(error) if error is not None else None,
+            "timed_out": isinstance(error, AgentTimeoutError)
+        })
+
+    def stream_data_sections(self):
+        # Best effort: the run must not depend on the optional event stream
+        try:
+            # On a copy: the report injects keys (weather_summary) the agents did not produce
+            sections = data_sections(dict(self.context.data), self.goal)
+        except Exception as e:
+            logging.warning(f"Could not stream report sections: {e}", exc_info=True)
+            return
+        for title, content in sections:
+            streaming.emit("section", title=title, content=content, iteration=self.iteration)
+
+    def evaluate(self):
+        """Decide whether the goal is satisfied after an iteration."""
+        context = self.context
         # --- FIX: use context.data.get(...) ---
         summary = context.data.get("summary", "")
         if summary and len(summary.split()) > 30:
-            satisfied = True
+            self.satisfied = True
             feedback = "Goal satisfied: summary generated"
         elif "error" in context.data:
-            satisfied = False
+            self.satisfied = False
             feedback = f"Goal not satisfied due to error: {context.data['error']}"
         else:
-            satisfied = False
+            self.satisfied = False
             feedback = "Goal not satisfied: summary missing or incomplete"
 
-        print_section("Evaluation", YELLOW)
-        print(f"{BOLD}{feedback}{RESET}")
-
-        # Show agent trajectory and context enrichment
-        evaluate_agent_trajectory(context, trajectory_log)
-
-        if not satisfied:
-            print_section("Refining Agent Chain", RED)
-            new_chain = planner.plan(goal, list(available_agents.keys()))
-            evaluate_planner_routing(chain, new_chain)
-            if new_chain != chain:
-                chain = new_chain
-                print(f"{BOLD}New agent chain:{RESET} {GREEN}{chain}{RESET}")
+        if self.verbose:
+            print_section("Evaluation", YELLOW)
+            print(f"{BOLD}{feedback}{RESET}")
+
+            # Show agent trajectory and context enrichment
+            evaluate_agent_trajectory(context, self.trajectory_log)
+            if not self.satisfied:
+                print_section("Refining Agent Chain", RED)
+        return self.satisfied
+
+    def refine(self, new_chain):
+        if self.verbose:
+            evaluate_planner_routing(self.chain, new_chain)
+            if new_chain != self.chain:
+                print(f"{BOLD}New agent chain:{RESET} {GREEN}{new_chain}{RESET}")
             else:
                 print(f"{YELLOW}No changes to agent chain{RESET}")
-            iteration += 1
+        self.chain = new_chain
+        self.iteration += 1
+        if self.speculation:
+            committed = self.speculation.commit(new_chain)
+            self.speculation = None
+            if committed and self.verbose:
+                print(f"{BOLD}Prefetched during the previous iteration:{RESET} {GREEN}{', '.join(committed)}{RESET}")
+
+    def finish(self):
+        if self.speculation:
+            # Never refined: the speculative results are not part of this run
+            self.speculation.discard()
+            self.speculation = None
+        context = self.context
+        context.data["processing_time"] = time.time() - context.start_time
+        context.data["trajectory_log"] = self.trajectory_log  # Save for later reporting
+        context.data["errors"] = context.errors
+        context.data["agent_chain"] = self.chain
+        return context.data
+
+class Speculation:
+    """
+    Refinement planned in the background while the first iteration runs.
+    Agents that only the speculative chain uses, and whose inputs need nothing the
+    chains produce, are prefetched as soon as the plan arrives. If the run is refined
+    their results are committed like results of the new iteration; otherwise they
+    are discarded.
+    """
+
+    def __init__(self, run):
+        self.run = run
+        self.goal = run.goal
+        self.chain = list(run.chain)
+        self.seed = dict(run.context.data)
+        self.prefetched = {}  # agent name -> (input fingerprint, future)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._settled = False
+        # Set on discard: fetcher prefetches stop before their next request (utils.http.cancel_scope)
+        self._cancelled = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="speculative")
+        # In the run's context, so prefetches share its coalesced provider requests
+        self.plan = self._executor.submit(contextvars.copy_context().run, planner.plan, self.goal,
+                                          list(available_agents.keys()), self.chain)
+        self.plan.add_done_callback(self._prefetch)
+
+    def prefetchable(self, chain):
+        graph = AgentGraph(self.chain + list(chain), available_agents)
+        return [name for name in dedupe_chain(chain)
+                if name not in self.chain and not graph.deps[name] and not self.run._is_wildcard(name)]
+
+    def _prefetch(self, plan):
+        # Discarded before it ran: exception() would raise CancelledError here
+        if plan.cancelled() or plan.exception() is not None:
+            return
+        with self._lock:
+            if self._closed:
+                return
+            for name in self.prefetchable(plan.result()):
+                agent = available_agents[name]
+                data = dict(self.seed)
+                self.prefetched[name] = (input_fingerprint(agent, data),
+                                         self._executor.submit(contextvars.copy_context().run, self._prefetch_one, agent, data))
+
+    def _prefetch_one(self, agent, data):
+        with http.cancel_scope(self._cancelled):
+            return agent.run(data)
+
+    def refined_chain(self):
+        """The speculative plan, or the rule-based chain if it is not ready within the planner's timeout."""
+        try:
+            return self.plan.result(timeout=planner.timeout)
+        except FuturesTimeoutError:
+            return self._late_plan()
+
+    async def arefined_chain(self):
+        done, _ = await asyncio.wait([asyncio.wrap_future(self.plan)], timeout=planner.timeout)
+        return done.pop().result() if done else self._late_plan()
+
+    def _late_plan(self):
+        logging.warning(f"Speculative plan not ready within {planner.timeout}s, using rule-based chain")
+        return rule_based_plan(self.goal)[0]
+
+    def _pending(self, new_chain):
+        """Closes the speculation; in-flight prefetches ``new_chain`` uses, and how long to wait for them."""
+        with self._lock:
+            self._closed = True
+            prefetched = {name: entry for name, entry in self.prefetched.items() if name in new_chain}
+        in_flight = [future for _, future in prefetched.values() if not future.done()]
+        deadlines = [self.run.deadline_for(name) for name in prefetched]
+        return prefetched, in_flight, None if None in deadlines else max(deadlines, default=0)
+
+    async def settle(self, new_chain):
+        """Wait for in-flight prefetches without blocking the event loop, so commit() need not."""
+        _, in_flight, timeout = self._pending(new_chain)
+        if in_flight:
+            await asyncio.wait([asyncio.wrap_future(future) for future in in_flight], timeout=timeout)
+        self._settled = True
+
+    def commit(self, new_chain):
+        """Merge the prefetches ``new_chain`` uses; the rest are discarded."""
+        prefetched, in_flight, timeout = self._pending(new_chain)
+        # One still in flight is further along than a fresh dispatch would be
+        if in_flight and not self._settled:
+            wait(in_flight, timeout=timeout)
+        committed = []
+        for name, (inputs, future) in prefetched.items():
+            if not future.done() or future.cancelled():
+                continue
+            # Recorded with the inputs it ran on: start_iteration re-runs it if they changed since
+            self.run.history[name] = {"ok": False, "inputs": inputs}
+            self.run.handle_result(name, *_outcome(future))
+            committed.append(name)
+        self.discard()
+        return committed
+
+    def discard(self):
+        """
+        Cancel what has not started. Fetcher agents still running stop before their next
+        request and cache nothing more; plain run() agents finish, but nobody reads their results.
+        """
+        with self._lock:
+            self._closed = True
+            self._cancelled.set()
+            self.plan.cancel()
+            for _, future in self.prefetched.values():
+                future.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+def _outcome(future):
+    error = future.exception()
+    return (None, error) if error is not None else (future.result(), None)
+
+def execute_chain(chain, goal, max_iterations=3, latency_budget=None, verbose=True, speculative=None):
+    """
+    Run the chain until the goal is satisfied, max_iterations is reached or the
+    latency budget (seconds; defaults to configs/agents.json "execution") runs out.
+    Pass verbose=False to suppress the progress output (batch and service modes).
+    With speculative=True (default: "speculative_planning" in "execution") the refined
+    chain is planned, and its new root agents fetched, while the first iteration runs.
+    """
+    run = ChainRun(chain, goal, latency_budget, verbose, speculative)
+    data = run.context.data
+    # Identical provider requests within the run are fetched once and shared
+    with run_scope():
+        while not run.satisfied and run.iteration <= max_iterations and run.has_budget():
+            graph = run.start_iteration()
+            run_graph(graph, lambda name: available_agents[name].run(data), run.handle_result,
+                      on_start=run.handle_start, deadline_for=run.deadline_for)
+            if not run.evaluate() and run.has_budget():
+                if run.speculation:
+                    run.refine(run.speculation.refined_chain())
+                else:
+                    run.refine(planner.plan(goal, list(available_agents.keys()), run.chain))
+    return run.finish()
+
+async def execute_chain_async(chain, goal, max_iterations=3, latency_budget=None, verbose=True, speculative=None):
+    """
+    Event-loop version of execute_chain.
+    Fetcher agents run natively via arun(); many goals can share one loop,
+    e.g. asyncio.gather(*(execute_chain_async(c, g) for c, g in jobs)).
+    """
+    run = ChainRun(chain, goal, latency_budget, verbose, speculative)
+    data = run.context.data
+    with run_scope():
+        while not run.satisfied and run.iteration <= max_iterations and run.has_budget():
+            graph = run.start_iteration()
+            await arun_graph(graph, lambda name: available_agents[name].arun(data), run.handle_result,
+                             on_start=run.handle_start, deadline_for=run.deadline_for)
+            if not run.evaluate() and run.has_budget():
+                if run.speculation:
+                    new_chain = await run.speculation.arefined_chain()
+                    # commit() would otherwise block the loop waiting for in-flight prefetches
+                    await run.speculation.settle(new_chain)
+                else:
+                    new_chain = await asyncio.to_thread(planner.plan, goal, list(available_agents.keys()), run.chain)
+                run.refine(new_chain)
+    return run.finish()
+
+def stream_chain(chain, goal, max_iterations=3, latency_budget=None):
+    """
+    Run execute_chain in the background and yield report events as soon as they are ready:
+      {"type": "agent", "agent", "iteration", "ok", "result", "error"}  as each agent finishes
+      {"type": "section", "title", "content", "iteration"}             data-only report sections, once the summarizer starts
+      {"type": "summary_section", "index", "text"}                     each BART summary section as it is generated
+      {"type": "summary", "text"}                                      a complete summary (Cohere or memoized)
+      {"type": "section", "title", "content"}                          the remaining report sections at the end
+      {"type": "done", "record"}                                       build_run_record() of the finished run
+    """
+    start = time.time()
+    events = streaming.stream_events(execute_chain, chain, goal, max_iterations, latency_budget, verbose=False)
+    sent = set()
+    while True:
+        try:
+            event = next(events)
+        except StopIteration as done:
+            result = done.value
+            break
+        if event["type"] == "section":
+            sent.add(event["title"])
+        yield event
+    # Chains without a summarizer never streamed the data sections either
+    for title, content in generate_comprehensive_analysis(result, goal):
+        if title not in sent:
+            yield {"type": "section", "title": title, "content": content}
+    yield {"type": "done", "record": build_run_record(goal, result, round(time.time() - start, 3))}
+
+def build_run_record(goal, result, latency=None):
+    """JSON-serializable outcome of one goal, used by the batch and service modes."""
+    return {
+        "goal": goal,
+        "agent_chain": result.get("agent_chain", []),
+        "entities": result.get("entities", []),
+        "summary": result.get("summary", ""),
+        "errors": result.get("errors", []),
+        "processing_time": result.get("processing_time"),
+        "latency": latency,
+        "data": {k: v for k, v in result.items() if k not in ("trajectory_log", "goal", "summary", "errors")},
+    }
 
-    context.data["processing_time"] = time.time() - context.start_time
-    context.data["trajectory_log"] = trajectory_log  # Save for later reporting
-    return context.data
+def claim_text(fact):
+    """FactCheckAgent reports claims as headline strings; older results carried {"text": ...}."""
+    claim = fact.get("claim", "")
+    return claim.get("text", "") if isinstance(claim, dict) else str(claim)
 
-# main.py (update generate_comprehensive_analysis function)
-# main.py (update generate_comprehensive_analysis function)
-def generate_comprehensive_analysis(context, goal):
-    """Generate deep paragraph-style analysis"""
-    analysis = []
-    goal_lower = goal.lower()
-    
-    # 1. Executive Summary
-    if "summary" in context and context["summary"]:
-        # Clean up summary text
-        clean_summary = context["summary"]
-        if "📊 In-depth Analytical Summary (Cohere):" in clean_summary:
-            clean_summary = clean_summary.replace("📊 In-depth Analytical Summary (Cohere):", "").strip()
-        analysis.append(("EXECUTIVE OVERVIEW", clean_summary))
-    else:
-        analysis.append(("EXECUTIVE OVERVIEW", "No summary was generated, but all available data is presented below."))
+def kelvin_to_celsius(kelvin):
+    return round(kelvin - 273.15, 1) if isinstance(kelvin, (int, float)) else "N/A"
 
-    # 2. Thematic Analysis
+def kelvin_to_fahrenheit(kelvin):
+    return round((kelvin - 273.15) * 9 / 5 + 32, 1) if isinstance(kelvin, (int, float)) else "N/A"
+
+def thematic_analysis_text(context, goal):
+    """THEMATIC ANALYSIS section text; needs only the agents' data, not the summary"""
+    goal_lower = goal.lower()
     thematic_analysis = ""
     
     # Environmental Factors
@@ -340,11 +581,10 @@ def generate_comprehensive_analysis(context, goal):
         thematic_analysis += f"Sentiment Analysis:\nOverall sentiment is assessed as {sentiment}. "
         if "sentiment_reasoning" in context:
             thematic_analysis += f"This assessment is based on: {context['sentiment_reasoning']}\n\n"
-    
-    if thematic_analysis:
-        analysis.append(("THEMATIC ANALYSIS", thematic_analysis))
-    
-    # 3. Detailed Entity Analysis
+    return thematic_analysis
+
+def entity_analysis_sections(context):
+    """(title, text) of each ENTITY ANALYSIS section; needs only the agents' data, not the summary"""
     entity_analysis = []
     entities = context.get("entities", [])
     for entity in entities:
@@ -373,21 +613,60 @@ def generate_comprehensive_analysis(context, goal):
                         entity_text += f"[Source: {news_item['source']}]"
                     entity_text += "\n"
                 entity_text += "\n"
-        
+
+        # Headline Sentiment
+        for scored in context.get("entity_sentiment", []):
+            if scored.get("headlines") and (scored.get("entity") or "").lower() == entity.lower():
+                entity_text += (f"News Sentiment: {scored['sentiment']} ({scored['score']:+.2f}) "
+                                f"across {scored['headlines']} headlines.\n\n")
+
         # Fact Verification
         if "fact_checks" in context:
-            entity_facts = [f for f in context["fact_checks"] if entity.lower() in f.get("claim", {}).get("text", "").lower()]
+            entity_facts = [f for f in context["fact_checks"] if entity.lower() in claim_text(f).lower()]
             if entity_facts:
                 entity_text += "Fact Verification Findings:\n"
                 for fact in entity_facts:
-                    rating = fact.get("rating", "Unrated")
-                    entity_text += f"- Claim: '{fact.get('claim', {}).get('text', 'N/A')}' "
+                    rating = fact.get("rating") or fact.get("fact_check", "Unrated")
+                    entity_text += f"- Claim: '{claim_text(fact) or 'N/A'}' "
                     entity_text += f"was rated as '{rating}' with explanation: {fact.get('explanation', 'No explanation provided')}\n"
                 entity_text += "\n"
         
         if len(entity_text) > len(f"Analysis of {entity}:\n\n"):
             entity_analysis.append((f"ENTITY ANALYSIS: {entity.upper()}", entity_text))
+    return entity_analysis
+
+def data_sections(context, goal):
+    """Report sections computed from agent data alone, streamed before the summary is ready"""
+    sections = []
+    thematic_analysis = thematic_analysis_text(context, goal)
+    if thematic_analysis:
+        sections.append(("THEMATIC ANALYSIS", thematic_analysis))
+    return sections + entity_analysis_sections(context)
+
+# main.py (update generate_comprehensive_analysis function)
+# main.py (update generate_comprehensive_analysis function)
+def generate_comprehensive_analysis(context, goal):
+    """Generate deep paragraph-style analysis"""
+    analysis = []
+    goal_lower = goal.lower()
     
+    # 1. Executive Summary
+    if "summary" in context and context["summary"]:
+        # Clean up summary text
+        clean_summary = context["summary"]
+        if "📊 In-depth Analytical Summary (Cohere):" in clean_summary:
+            clean_summary = clean_summary.replace("📊 In-depth Analytical Summary (Cohere):", "").strip()
+        analysis.append(("EXECUTIVE OVERVIEW", clean_summary))
+    else:
+        analysis.append(("EXECUTIVE OVERVIEW", "No summary was generated, but all available data is presented below."))
+
+    # 2. Thematic Analysis
+    thematic_analysis = thematic_analysis_text(context, goal)
+    if thematic_analysis:
+        analysis.append(("THEMATIC ANALYSIS", thematic_analysis))
+    
+    # 3. Detailed Entity Analysis
+    entity_analysis = entity_analysis_sections(context)
     if entity_analysis:
         for title, content in entity_analysis:
             analysis.append((title, content))
@@ -452,133 +731,35 @@ def generate_comprehensive_analysis(context, goal):
     return analysis
 
     
+def execution_metrics(context):
+    """Performance and data quality figures of a finished run."""
+    return Metrics(
+        processing_time=context.get("processing_time") or 0,
+        errors=[str(error) for error in context.get("errors", [])],
+        summary_words=len(str(context["summary"]).split()) if "summary" in context else None,
+        entities=len(context.get("entities", [])),
+    )
+
+def build_report(context, goal):
+    """The report model of a finished run; render it with utils.report (render, write_report)."""
+    return Report(
+        goal=goal,
+        sections=[Section(title, content) for title, content in generate_comprehensive_analysis(context, goal)],
+        metrics=execution_metrics(context),
+        agent_chain=list(context.get("agent_chain", [])),
+    )
+
 def print_detailed_report(context, goal):
     """Print professional report with deep paragraph-style analysis"""
-    current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    # Report Header
-    print_section("AI RESEARCH REPORT", BLUE)
-    print(f"{BOLD}Research Goal:{RESET} {goal}")
-    print(f"{BOLD}Date of Analysis:{RESET} {current_time}")
-    print(f"{BOLD}Processing Metrics:{RESET} Completed in {context.get('processing_time', 0):.2f} seconds")
-    print(f"{BOLD}Agent Workflow:{RESET} {', '.join(context.get('agent_chain', []))}\n")
-    
-    # Generate comprehensive analysis
-    analysis = generate_comprehensive_analysis(context, goal)
-    
-    # Print each section with proper formatting
-    section_texts = {}
-    for section_title, section_content in analysis:
-        print_section(section_title, CYAN)
-        print(wrap_text(section_content, indent=2))
-        print()
-        section_texts[section_title] = section_content  # Collect for total summary
-
-    # --- TOTAL SUMMARY SECTION ---
-    print_section("TOTAL SUMMARY", GREEN)
-    print(wrap_text(
-        "This section provides a concise synthesis of all key findings, insights, and recommendations from the analysis above. Use this as a quick reference for decision-making.",
-        indent=2
-    ))
-    print()
-
-    # Synthesize from previous sections
-    if "EXECUTIVE OVERVIEW" in section_texts:
-        print(f"{BOLD}Executive Overview:{RESET}")
-        print(wrap_text(section_texts["EXECUTIVE OVERVIEW"], indent=4))
-        print()
-        # Add word count
-        word_count = len(section_texts["EXECUTIVE OVERVIEW"].split())
-        print(f"{BOLD}Executive Overview Word Count:{RESET} {word_count}\n")
-    if "THEMATIC ANALYSIS" in section_texts:
-        print(f"{BOLD}Key Environmental & Thematic Insights:{RESET}")
-        print(wrap_text(section_texts["THEMATIC ANALYSIS"], indent=4))
-        print()
-    if "CRITICAL INSIGHTS" in section_texts:
-        print(f"{BOLD}Critical Insights:{RESET}")
-        # Present each insight as a bullet point
-        for line in section_texts["CRITICAL INSIGHTS"].split('\n'):
-            if line.strip():
-                print("    •", line.strip().lstrip('-').strip())
-        print()
-    if "CONCLUSIONS & RECOMMENDATIONS" in section_texts:
-        print(f"{BOLD}Conclusions & Recommendations:{RESET}")
-        print(wrap_text(section_texts["CONCLUSIONS & RECOMMENDATIONS"], indent=4))
-        print()
-    # --- END TOTAL SUMMARY ---
-
-    # Footer
-    print_section("END OF REPORT", BLUE)
-    print(f"{BOLD}Report Generated By:{RESET} ADK Research Platform v3.0")
-    print(f"{BOLD}Confidentiality:{RESET} This report contains privileged analysis for authorized use only\n")
+    print(render(build_report(context, goal), "ansi", metrics=False), end="")
 
 def optimize_agent_selection(goal):
     """Select agents based on goal content for deep analysis"""
-    goal_lower = goal.lower()
-    base_agents = ["news", "wikipedia_summary", "sentiment", "summarizer"]
-    
-    # Entity-specific agents
-    if "finance" in goal_lower or any(word in goal_lower for word in ["stock", "market", "investment"]):
-        base_agents.insert(0, "finance")
-        base_agents.insert(3, "fact_check")
-    
-    if "weather" in goal_lower or any(word in goal_lower for word in ["temperature", "forecast", "climate"]):
-        base_agents.insert(0, "weather")
-        base_agents.insert(1, "temperature")  # <-- Insert temperature agent after weather
-        base_agents.insert(2, "air_quality")
-        base_agents.insert(3, "weather_alerts")
-    
-    if "health" in goal_lower or any(word in goal_lower for word in ["medical", "disease", "hospital"]):
-        base_agents.insert(0, "health")
-        if "covid" in goal_lower:
-            base_agents.insert(0, "covid")
-    
-    if "spacex" in goal_lower or "launch" in goal_lower:
-        base_agents.insert(0, "spacex_next")
-        base_agents.insert(1, "weather")
-        base_agents.insert(2, "air_quality")
-    
-    # Analysis depth agents
-    if any(word in goal_lower for word in ["analyze", "impact", "effect", "trend"]):
-        if "fact_check" not in base_agents:
-            base_agents.insert(2, "fact_check")
-        base_agents.insert(3, "sentiment")
-    
-    # Ensure summarizer is last
-    if "summarizer" in base_agents:
-        base_agents.remove("summarizer")
-        base_agents.append("summarizer")
-    
-    return base_agents
+    return rule_based_plan(goal)[0]
 
 def print_execution_metrics(context):
     """Print performance metrics"""
-    print_section("SYSTEM PERFORMANCE METRICS", MAGENTA)
-    print(f"{BOLD}Total Processing Time:{RESET} {context.get('processing_time', 0):.2f} seconds")
-    
-    errors = context.get("errors", [])
-    if errors:
-        print(f"{BOLD}{RED}Operational Issues:{RESET} {len(errors)} errors encountered")
-        for error in errors[:3]:
-            print(f"  - {error}")
-    else:
-        print(f"{BOLD}{GREEN}Operational Status:{RESET} All agents executed successfully")
-    
-    # Data quality assessment
-    print(f"\n{BOLD}Data Quality Assessment:{RESET}")
-    if "summary" in context:
-        word_count = len(context["summary"].split())
-        quality = "Comprehensive" if word_count > 200 else "Detailed" if word_count > 100 else "Basic"
-        print(f"  • Analysis Depth: {quality} ({word_count} words)")
-    else:
-        print(f"  • Analysis Depth: {RED}Insufficient{RESET}")
-    
-    entities = len(context.get("entities", []))
-    print(f"  • Entity Coverage: {entities} key entities analyzed")
-    
-    coverage_score = min(100, entities * 15 + (40 if "summary" in context else 0))
-    print(f"  • Comprehensive Coverage Index: {coverage_score}/100")
-    print()
+    print(render_lines(execution_metrics(context).lines), end="")
 
 if __name__ == "__main__":
     print(f"{BOLD}{BLUE}{' ADVANCED RESEARCH PLATFORM ':^80}{RESET}")
@@ -603,20 +784,13 @@ if __name__ == "__main__":
     
     # Execute analysis
     result = execute_chain(agent_chain, goal)
-    result["agent_chain"] = agent_chain
     
-    # Generate comprehensive report
-    print_detailed_report(result, goal)
-    print_execution_metrics(result)
-    
-    # Save report to file
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"reports/{goal[:20].replace(' ', '_')}_{timestamp}.txt"
-    with open(filename, "w") as f:
-        sys.stdout = f
-        print_detailed_report(result, goal)
-        print_execution_metrics(result)
-        sys.stdout = sys.__stdout__
-    
-    print(f"{GREEN}Full report saved to {filename}{RESET}")
-    print(f"{BOLD}{YELLOW}Analysis complete. Thank you for using ADK Research Platform{RESET}")
\ No newline at end of file
+    # Generate comprehensive report once; print it and save it without re-rendering
+    report = build_report(result, goal)
+    os.makedirs("reports", exist_ok=True)
+    basename = os.path.join("reports", report_basename(goal, report.generated_at))
+    formats = get_section("report").get("save_formats", ["text"])
+    saved = [f"{basename}.{EXTENSIONS[fmt]}" for fmt in formats]
+    write_report(report, [("ansi", sys.stdout)] + list(zip(formats, saved)))
+
+    print(f"{GREEN}Full report saved to {', '.join(saved)}{RESET}")
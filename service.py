@@ -0,0 +1,152 @@
+"""Long-running HTTP service mode.
+
+Imports the agents, loads the summarization model and configures the LLM client
+once at startup, then serves goals over a local JSON API so each request only
+pays for agent work:
+
+    python service.py --port 8080
+
+    POST /goals         {"goal": "...", "chain": [...]?, "max_iterations": 3?, "budget": 60?,
+                         "report_format": "markdown"|"text"|"ansi"|"json"?}
+    POST /goals/stream  same body; newline-delimited JSON events as agents and report sections
+                        complete, ending with {"type": "done", "record": ...} (see main.stream_chain)
+    GET  /health  (agents and response-cache hit/miss counters)
+"""
+import argparse
+import itertools
+import json
+import logging
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from main import (available_agents, build_report, build_run_record, execute_chain, optimize_agent_selection, planner,
+                  stream_chain)
+from utils.geocoder import get_geocoder
+from utils.http import get_http_client
+from utils.report import RENDERERS, render
+
+
+def warm_up():
+    """Construct every agent and load the models and clients they use before the first request."""
+    start = time.perf_counter()
+    agents = list(available_agents.values())
+    for agent in agents:
+        agent.warm_up()
+    planner.warm_up()
+    get_geocoder()
+    logging.info(f"Warmed {len(agents)} agents in {time.perf_counter() - start:.2f}s")
+
+
+def parse_goal(payload):
+    goal = (payload.get("goal") or "").strip()
+    if not goal:
+        raise ValueError("'goal' is required")
+    chain = payload.get("chain") or optimize_agent_selection(goal)
+    unknown = [name for name in chain if name not in available_agents]
+    if unknown:
+        raise ValueError(f"Unknown agents: {', '.join(unknown)}")
+    return goal, chain
+
+
+def run_goal(payload):
+    goal, chain = parse_goal(payload)
+    report_format = payload.get("report_format")
+    if report_format is not None and report_format not in RENDERERS:
+        raise ValueError(f"Unknown report_format: {report_format}")
+    start = time.perf_counter()
+    result = execute_chain(chain, goal, max_iterations=payload.get("max_iterations", 3),
+                           latency_budget=payload.get("budget"), verbose=False)
+    record = build_run_record(goal, result, round(time.perf_counter() - start, 3))
+    report = build_report(result, goal)
+    record["report"] = [{"title": section.title, "content": section.content} for section in report.sections]
+    if report_format:
+        record["rendered_report"] = render(report, report_format)
+    return record
+
+
+class GoalRequestHandler(BaseHTTPRequestHandler):
+    server_version = "ResearchService/1.0"
+
+    def _send_json(self, status, body):
+        data = json.dumps(body, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/health":
+            cache = get_http_client().cache
+            self._send_json(200, {"status": "ok", "agents": sorted(available_agents.keys()),
+                                  "cache": cache.stats() if cache is not None else None})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def _stream_goal(self, payload):
+        goal, chain = parse_goal(payload)
+        events = stream_chain(chain, goal, max_iterations=payload.get("max_iterations", 3),
+                              latency_budget=payload.get("budget"))
+        first = next(events)  # errors before any output still get a proper status code
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            for event in itertools.chain([first], events):
+                self.wfile.write(json.dumps(event, default=str).encode("utf-8") + b"\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            logging.info(f"{self.address_string()} disconnected mid-stream")
+        except Exception as e:
+            # Headers are gone; report the failure in-band
+            logging.error(f"Streamed goal failed: {e}", exc_info=True)
+            self.wfile.write(json.dumps({"type": "error", "error": str(e)}).encode("utf-8") + b"\n")
+
+    def do_POST(self):
+        if self.path not in ("/goals", "/goals/stream"):
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("request body must be a JSON object")
+        except ValueError as e:
+            self._send_json(400, {"error": f"invalid request: {e}"})
+            return
+        try:
+            if self.path == "/goals/stream":
+                self._stream_goal(payload)
+            else:
+                self._send_json(200, run_goal(payload))
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+        except Exception as e:
+            logging.error(f"Goal failed: {e}", exc_info=True)
+            self._send_json(500, {"error": str(e)})
+
+    def log_message(self, format, *args):
+        logging.info(f"{self.address_string()} {format % args}")
+
+
+def serve(host="127.0.0.1", port=8080):
+    warm_up()
+    server = ThreadingHTTPServer((host, port), GoalRequestHandler)
+    logging.info(f"Research service listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve research goals over a local HTTP API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    serve(args.host, args.port)
@@ -0,0 +1,195 @@
+"""Tiered TTL caches for provider responses and other expensive results.
+
+A bounded in-memory LRU sits in front of a SQLite store (WAL mode) that every
+process on the machine shares, so a batch run, the service and an interactive
+session all reuse each other's responses. Values must be JSON-serializable.
+
+Expiry is per entry. ``HttpClient`` caches successful GETs for the hosts listed
+with a "cache_ttl" (seconds) in the "providers" section of configs/agents.json,
+skipping 2xx bodies that match the provider's "error_fields". Credentials in
+query strings and headers never reach the store;
+the "cache" section sets the store's location and the LRU's size. Other users
+(e.g. the summarizer's memo) get their own store from ``open_cache``.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+from utils.config import CONFIG_PATH, get_section
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe in-memory cache holding at most ``max_entries`` unexpired values."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires <= time.time():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, expires: float):
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskCache:
+    """SQLite-backed store that several processes can read and write concurrently."""
+
+    # Expired rows are purged every this many writes
+    PURGE_EVERY = 256
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, expires REAL NOT NULL, value TEXT NOT NULL)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections may not be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str):
+        """(value, expires) for an unexpired entry, or None."""
+        row = self._connection().execute(
+            "SELECT value, expires FROM entries WHERE key = ? AND expires > ?", (key, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value: Any, expires: float):
+        with self._connection() as conn:
+            conn.execute("INSERT OR REPLACE INTO entries (key, expires, value) VALUES (?, ?, ?)",
+                         (key, expires, json.dumps(value)))
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                conn.execute("DELETE FROM entries WHERE expires <= ?", (time.time(),))
+
+
+class TieredCache:
+    """Memory LRU backed by an optional ``DiskCache``, with hit/miss counters."""
+
+    def __init__(self, memory: LRUCache, disk: Optional[DiskCache] = None):
+        self.memory = memory
+        self.disk = disk
+        self._lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    def get(self, key: str, default=None):
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            self._count("memory_hits")
+            return value
+        if self.disk is not None:
+            try:
+                found = self.disk.get(key)
+            except sqlite3.Error:
+                found = None
+            if found is not None:
+                value, expires = found
+                self.memory.set(key, value, expires)
+                self._count("disk_hits")
+                return value
+        self._count("misses")
+        return default
+
+    def set(self, key: str, value: Any, ttl: float):
+        expires = time.time() + ttl
+        self.memory.set(key, value, expires)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value, expires)
+            except sqlite3.Error:
+                pass  # A locked or read-only store only costs us persistence
+        self._count("writes")
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.counters)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((lookups - stats["misses"]) / lookups, 3) if lookups else 0.0
+        stats["memory_entries"] = len(self.memory)
+        return stats
+
+
+def cache_ttl_for(url: str) -> Optional[float]:
+    """Seconds responses from ``url``'s host may be reused for, per the "providers" config."""
+    provider = get_section("providers").get(urlsplit(url).hostname) or {}
+    return provider.get("cache_ttl")
+
+
+def error_fields_for(url: str) -> dict:
+    """
+    Top-level JSON fields that mark a 2xx response from ``url``'s host as an error
+    ("error_fields" in the "providers" config), e.g. Alpha Vantage's throttling
+    {"Note": ...}. A null value matches the field whatever its value.
+    """
+    provider = get_section("providers").get(urlsplit(url).hostname) or {}
+    return provider.get("error_fields") or {}
+
+
+def open_cache(memory_entries: int = 1024, path: Optional[str] = None) -> TieredCache:
+    """A tiered cache persisted at ``path`` (relative to the repo root), or memory-only without one."""
+    disk = None
+    if path:
+        if not os.path.isabs(path):
+            path = os.path.join(os.path.dirname(os.path.dirname(CONFIG_PATH)), path)
+        try:
+            disk = DiskCache(path)
+        except (OSError, sqlite3.Error):
+            pass  # Unwritable location: still cache in memory
+    return TieredCache(LRUCache(memory_entries), disk)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[TieredCache]:
+    """Process-wide cache built from the "cache" config section, or None when disabled."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            settings = get_section("cache")
+            if not settings.get("enabled", True):
+                return None
+            _cache = open_cache(settings.get("memory_entries", 1024), settings.get("path", ".cache/responses.sqlite3"))
+    return _cache
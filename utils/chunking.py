@@ -0,0 +1,73 @@
+"""Sentence-aligned, token-budgeted chunking for the local summarizer.
+
+``chunk_text`` splits text into sentences (and lines, since the formatted context
+is mostly bullet lists), then greedily packs consecutive sentences into as few
+chunks as fit the token budget. Sentences longer than the budget are split on
+word boundaries. With ``overlap`` set, each chunk repeats the trailing sentences
+of the previous one, up to that many tokens, to keep local context.
+"""
+import re
+from typing import Callable, List
+
+# A sentence runs to terminal punctuation followed by whitespace (so "21.4°C" stays whole),
+# a line break, or the end of the text; trailing whitespace stays attached to it
+_SENTENCE = re.compile(r".+?(?:[.!?]+(?=\s)|\n|$)\s*", re.S)
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s for s in _SENTENCE.findall(text) if s.strip()]
+
+
+def approx_token_count(text: str) -> int:
+    """Rough BPE token estimate (~4 characters per token) for when no tokenizer is loaded."""
+    return max(1, len(text) // 4)
+
+
+def tokenizer_counter(tokenizer) -> Callable[[str], int]:
+    """Token counter backed by a Hugging Face tokenizer (special tokens excluded)."""
+    return lambda text: len(tokenizer.encode(text, add_special_tokens=False))
+
+
+def _split_long(sentence: str, count_tokens: Callable[[str], int], max_tokens: int) -> List[str]:
+    # Per-word counts add up to (nearly) the count of the joined text and keep this linear
+    pieces, current, used = [], "", 0
+    for word in re.findall(r"\S+\s*", sentence):
+        tokens = count_tokens(word)
+        if current and used + tokens > max_tokens:
+            pieces.append(current)
+            current, used = "", 0
+        current += word
+        used += tokens
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_text(text: str, count_tokens: Callable[[str], int] = approx_token_count,
+               max_tokens: int = 900, overlap: int = 0) -> List[str]:
+    """Split ``text`` into the fewest sentence-aligned chunks of at most ``max_tokens`` tokens each."""
+    units = []
+    for sentence in split_sentences(text):
+        tokens = count_tokens(sentence)
+        if tokens > max_tokens:
+            units.extend((piece, count_tokens(piece)) for piece in _split_long(sentence, count_tokens, max_tokens))
+        else:
+            units.append((sentence, tokens))
+
+    chunks, current, used = [], [], 0
+    for sentence, tokens in units:
+        if current and used + tokens > max_tokens:
+            chunks.append("".join(s for s, _ in current).strip())
+            # Carry trailing sentences into the next chunk, leaving room for the new one
+            carried, carried_tokens = [], 0
+            for s, t in reversed(current):
+                if carried_tokens + t > min(overlap, max_tokens - tokens):
+                    break
+                carried.insert(0, (s, t))
+                carried_tokens += t
+            current, used = carried, carried_tokens
+        current.append((sentence, tokens))
+        used += tokens
+    if current:
+        chunks.append("".join(s for s, _ in current).strip())
+    return chunks
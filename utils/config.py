@@ -0,0 +1,17 @@
+import json
+import os
+from functools import lru_cache
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "configs", "agents.json")
+
+
+@lru_cache(maxsize=None)
+def load_config(path: str = CONFIG_PATH) -> dict:
+    """Read configs/agents.json once per process."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def get_section(name: str) -> dict:
+    """Return a top-level section of the config, or an empty dict if it is absent."""
+    return load_config().get(name) or {}
@@ -0,0 +1,140 @@
+"""Relevance-ranked, budgeted rendering of the shared context for summarization.
+
+The context accumulates everything the chain produced, including bookkeeping
+(``validated`` flags, ``reasoning`` traces, coordinates) and raw API payloads.
+``budget_context`` turns it into summarizer input whose size is bounded by a
+token budget rather than by the size of the context:
+
+* bookkeeping keys and API noise fields are dropped,
+* each value becomes a block (one per entity for per-entity results),
+* lists are cut to ``max_items`` entries,
+* blocks are ranked by how many goal and entity terms they mention, and taken
+  in that order until the budget is spent; the block that crosses the budget
+  keeps as many of its lines as still fit.
+"""
+import re
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from utils.chunking import approx_token_count
+
+# Context keys that describe the run (or merely repeat the goal) rather than the world
+BOOKKEEPING = {
+    "goal", "summary", "validated", "reasoning", "error", "errors", "entities", "entity_key",
+    "typed_entities", "cities", "symbols", "countries", "topics", "city", "symbol", "topic",
+    "lat", "lon", "trajectory_log", "agent_chain", "processing_time", "headline_sentiment",
+}
+# Fields of raw API payloads that carry no information for a reader
+NOISE_FIELDS = {"id", "cod", "base", "coord", "dt", "timezone", "icon", "sunrise", "sunset", "validated", "reasoning"}
+
+_STOPWORDS = {
+    "the", "and", "for", "with", "about", "from", "into", "that", "this", "what", "how", "are",
+    "analysis", "assessment", "report", "depth", "in-depth", "overview", "current", "latest",
+}
+_WORD = re.compile(r"[a-z0-9][a-z0-9\-]+")
+
+Block = Tuple[str, List[str]]
+
+
+def _terms(text: str) -> set:
+    return {w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS}
+
+
+def _flatten(value: Dict[str, Any], prefix: str = "") -> Iterable[Tuple[str, Any]]:
+    """Nested payload fields as (dotted.key, scalar); a list of dicts contributes its first entry."""
+    for k, v in value.items():
+        if k in NOISE_FIELDS or v in (None, "", [], {}):
+            continue
+        if isinstance(v, list) and v and isinstance(v[0], dict):
+            v = v[0]
+        if isinstance(v, dict):
+            yield from _flatten(v, f"{prefix}{k}.")
+        else:
+            yield f"{prefix}{k}", v
+
+
+def _items(values: list, max_items: int) -> List[str]:
+    lines = [f"  - {v}" for v in values[:max_items]]
+    if len(values) > max_items:
+        lines.append(f"  - (+{len(values) - max_items} more)")
+    return lines
+
+
+def context_blocks(context: Dict[str, Any], max_items: int = 5) -> List[Block]:
+    """Renderable (header, lines) blocks for every informative value in ``context``, in context order."""
+    blocks = []
+    if context.get("weather_summary"):
+        blocks.append(("🌤 Weather Summary:", [str(context["weather_summary"])]))
+    for key, value in context.items():
+        if key in BOOKKEEPING or key == "weather_summary" or not value:
+            continue
+        # The raw payload adds nothing once it has been summarized
+        if key == "weather" and context.get("weather_summary"):
+            continue
+        title = key.capitalize()
+        if isinstance(value, list) and isinstance(value[0], dict):
+            for item in value:
+                entity = item.get("entity") or item.get("topic") or ""
+                lines = []
+                for k, v in item.items():
+                    if k in ("entity", "topic") or k in NOISE_FIELDS or v in (None, "", []):
+                        continue
+                    if isinstance(v, list):
+                        lines.append(f"  - {k}:")
+                        lines.extend("  " + line for line in _items(v, max_items))
+                    else:
+                        lines.append(f"  - {k}: {v}")
+                if lines:
+                    blocks.append((f"🔹 {title} for {entity}:" if entity else f"🔹 {title}:", lines))
+        elif isinstance(value, dict):
+            lines = [f"  • {k}: {v}" for k, v in _flatten(value)]
+            if lines:
+                blocks.append((f"🔹 {title}:", lines))
+        elif isinstance(value, list):
+            blocks.append((f"🔹 {title}:", _items(value, max_items)))
+        else:
+            blocks.append((f"🔹 {title}:", [str(value)]))
+    return blocks
+
+
+def _relevance(block: Block, terms: set) -> int:
+    header, lines = block
+    words = _terms(header + " " + " ".join(lines))
+    # A hit in the header ("News for Apple", "Weather") counts double
+    return len(terms & words) + len(terms & _terms(header))
+
+
+def _render(header: str, lines: List[str]) -> str:
+    return header + "\n" + "\n".join(lines) + "\n"
+
+
+def budget_context(context: Dict[str, Any], max_tokens: int = 1500, max_items: int = 5,
+                   count_tokens: Callable[[str], int] = approx_token_count) -> str:
+    """The goal plus the most relevant context blocks that fit in ``max_tokens``, most relevant first."""
+    goal = context.get("goal") or ""
+    entities = context.get("entities") or []
+    terms = _terms(" ".join([goal, *map(str, entities), str(context.get("city") or "")]))
+
+    parts = [f"🔍 Goal:\n{goal}\n"] if goal else []
+    remaining = max_tokens - sum(count_tokens(p) for p in parts)
+    blocks = context_blocks(context, max_items)
+    # sorted() is stable: equally relevant blocks keep their context order
+    for header, lines in sorted(blocks, key=lambda b: -_relevance(b, terms)):
+        if remaining <= 0:
+            break
+        text = _render(header, lines)
+        cost = count_tokens(text)
+        if cost > remaining:
+            # Keep the leading lines that still fit (blocks are short: max_items bounds every list)
+            kept = []
+            for line in lines:
+                if count_tokens(_render(header, kept + [line])) > remaining:
+                    break
+                kept.append(line)
+            if not kept:
+                continue
+            text = _render(header, kept)
+            cost = count_tokens(text)
+        parts.append(text)
+        # +1 for the separating newline
+        remaining -= cost + 1
+    return "\n".join(parts).strip() or "No relevant input found."
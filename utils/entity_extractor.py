@@ -1,20 +1,78 @@
+import copy
 import re
+from functools import lru_cache
+
+from utils.gazetteer import get_gazetteer
+from utils.geocoder import get_geocoder
+
+_BOOKS = re.compile(r"books? on ([A-Za-z ]+?)(?:,| and |$)", re.IGNORECASE)
+# Places the gazetteer does not know, e.g. "Weather in Smallville"
+_IN_PLACES = re.compile(r"in ([A-Za-z ]+?)(?:,| and |$)")
+_NEAR = re.compile(r"(?:in|for|at)\s+([A-Za-z ]+)")
+_TOPIC = re.compile(r"(?:books on|about|regarding)\s+([A-Za-z ]+)")
+
 
 def extract_entities(goal):
-    # Example: extract multiple cities or books
-    cities = re.findall(r"in ([A-Za-z ]+?)(?:,| and |$)", goal)
-    books = re.findall(r"books? on ([A-Za-z ]+?)(?:,| and |$)", goal)
-    if cities:
-        return {"entities": [c.strip() for c in cities], "entity_key": "city"}
+    info = copy.deepcopy(_match_entities(goal))
+    # Resolve the goal's city locally so location-aware agents start with coordinates
+    city = info.get("city")
+    place = get_geocoder().lookup(city) if city else None
+    if place:
+        info.update(lat=place.lat, lon=place.lon, country=place.country or None)
+    return info
+
+def _unique(values):
+    return list(dict.fromkeys(values))
+
+@lru_cache(maxsize=1024)
+def _match_entities(goal):
+    """
+    Typed entities of ``goal`` (memoized; extract_entities hands out copies):
+    "typed_entities" lists every gazetteer match with its type, and "cities", "symbols",
+    "countries" and "topics" group them for the agents that need one kind. "entities" and
+    "entity_key" keep the primary group for agents that fan out over entities.
+    """
+    tagged = get_gazetteer().tag(goal)
+    by_type = {}
+    for entity in tagged:
+        by_type.setdefault(entity.type, []).append(entity)
+    cities = _unique(e.value for e in by_type.get("city", []))
+    symbols = _unique(e.value for e in by_type.get("company", []))
+    # Company names as written (news and books search by name), one per symbol
+    names = {}
+    for entity in by_type.get("company", []):
+        names.setdefault(entity.value, entity.text)
+    companies = list(names.values())
+    info = {
+        "typed_entities": [{"text": e.text, "type": e.type, "value": e.value} for e in tagged],
+        "cities": cities,
+        "symbols": symbols,
+        "countries": _unique(e.value for e in by_type.get("country", [])),
+        "topics": _unique(e.value for e in by_type.get("topic", [])),
+    }
+
+    books = _BOOKS.findall(goal)
     if books:
-        return {"entities": [b.strip() for b in books], "entity_key": "book"}
-    # fallback: single city/topic
-    city = None
-    match = re.search(r"(?:in|for|at)\s+([A-Za-z ]+)", goal)
-    if match:
-        city = match.group(1).strip().split()[0]
-    topic = None
-    match = re.search(r"(?:books on|about|regarding)\s+([A-Za-z ]+)", goal)
-    if match:
-        topic = match.group(1).strip()
-    return {"city": city, "topic": topic}
\ No newline at end of file
+        info.update(entities=[b.strip() for b in books], entity_key="book")
+    elif cities:
+        info.update(entities=cities, entity_key="city")
+    elif companies:
+        info.update(entities=companies, entity_key="company")
+    else:
+        # Unknown places, as long as they are not something the gazetteer typed otherwise
+        known = {e.text.lower() for e in tagged}
+        places = [p.strip() for p in _IN_PLACES.findall(goal) if p.strip().lower() not in known]
+        if places:
+            info.update(entities=places, entity_key="city", cities=places)
+            cities = places
+        else:
+            # fallback: single city
+            match = _NEAR.search(goal)
+            word = match.group(1).strip().split()[0] if match else None
+            if word and word.lower() not in known:
+                cities = [word]
+    info["city"] = cities[0] if cities else None
+    info["symbol"] = symbols[0] if symbols else None
+    match = _TOPIC.search(goal)
+    info["topic"] = info["topics"][0] if info["topics"] else (match.group(1).strip() if match else None)
+    return info
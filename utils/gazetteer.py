@@ -0,0 +1,170 @@
+"""Typed gazetteer matching for entity extraction.
+
+Every known name - cities (the geocoder seed plus aliases), countries, company
+names and ticker symbols, topics - is compiled once into an Aho-Corasick
+automaton, so tagging a goal is a single left-to-right pass over its characters
+however large the gazetteers grow. Matching is case- and accent-insensitive and
+whole-word; short all-caps names ("UK", "NYC", tickers) must appear in capitals.
+Overlapping matches resolve to the leftmost, then longest ("Mexico City" over
+"Mexico").
+
+Gazetteers live in configs/gazetteer.json; city names come from the geocoding seed.
+"""
+import json
+import os
+import threading
+import unicodedata
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.config import CONFIG_PATH
+from utils.geocoder import index_paths, read_places
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(CONFIG_PATH), "gazetteer.json")
+ROOT = os.path.dirname(os.path.dirname(CONFIG_PATH))
+
+# Shortest ticker matched on its own; shorter ones ("V", "KO") are everyday words
+MIN_SYMBOL_LENGTH = 3
+
+
+@dataclass(frozen=True)
+class Entity:
+    text: str    # as written in the goal
+    type: str    # "city", "country", "company", "topic"
+    value: str   # canonical name (ticker symbol for companies, ISO code for countries)
+    start: int
+    end: int
+
+
+def _fold(ch: str) -> str:
+    # One character in, one out, so match offsets index the original text
+    base = unicodedata.normalize("NFKD", ch)[0]
+    return base.casefold()[:1] or ch
+
+
+def fold(text: str) -> str:
+    return "".join(_fold(ch) for ch in text)
+
+
+def _case_sensitive(name: str) -> bool:
+    return name.isupper() and len(name.replace(".", "")) <= 4
+
+
+class Automaton:
+    """Aho-Corasick automaton over folded patterns, each carrying (type, value, case-sensitive form)."""
+
+    def __init__(self):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[List[Tuple[int, tuple]]] = [[]]
+
+    def add(self, pattern: str, payload: tuple):
+        state = 0
+        for ch in fold(pattern):
+            nxt = self.goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            state = nxt
+        if not any(existing[1][:2] == payload[:2] for existing in self.out[state]):
+            self.out[state].append((len(pattern), payload))
+
+    def build(self):
+        """Breadth-first failure links; a state also emits everything its failure state emits."""
+        # Children of the root keep failure link 0
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+        return self
+
+    def matches(self, text: str) -> Iterable[Tuple[int, int, tuple]]:
+        """Every (start, end, payload) occurrence in ``text``, in order of end position."""
+        state = 0
+        for i, ch in enumerate(fold(text)):
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            for length, payload in self.out[state]:
+                yield i + 1 - length, i + 1, payload
+
+
+def _word_bounded(text: str, start: int, end: int) -> bool:
+    return (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum())
+
+
+class Gazetteer:
+    def __init__(self, automaton: Automaton):
+        self.automaton = automaton
+
+    def tag(self, text: str) -> List[Entity]:
+        """Non-overlapping whole-word entities in ``text``, leftmost-longest, in order of appearance."""
+        candidates = []
+        for start, end, (kind, value, exact) in self.automaton.matches(text):
+            if not _word_bounded(text, start, end):
+                continue
+            if exact and text[start:end] != exact:
+                continue
+            candidates.append(Entity(text[start:end], kind, value, start, end))
+        candidates.sort(key=lambda e: (e.start, -(e.end - e.start)))
+        entities, taken = [], 0
+        for entity in candidates:
+            if entity.start >= taken:
+                entities.append(entity)
+                taken = entity.end
+        return entities
+
+
+def load_gazetteer(path: str = GAZETTEER_PATH) -> Gazetteer:
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    automaton = Automaton()
+
+    def add(name, kind, value):
+        automaton.add(name, (kind, value, name if _case_sensitive(name) else None))
+
+    cities = config.get("cities") or {}
+    seed = cities.get("seed") or index_paths()[2]
+    if not os.path.isabs(seed):
+        seed = os.path.join(ROOT, seed)
+    if os.path.exists(seed):
+        for place in read_places(seed):
+            add(place.name, "city", place.name)
+    for city, aliases in (cities.get("aliases") or {}).items():
+        add(city, "city", city)
+        for alias in aliases:
+            add(alias, "city", city)
+    for code, names in (config.get("countries") or {}).items():
+        for name in names:
+            add(name, "country", code)
+    for symbol, names in (config.get("companies") or {}).items():
+        if len(symbol) >= MIN_SYMBOL_LENGTH:
+            automaton.add(symbol, ("company", symbol, symbol))
+        for name in names:
+            add(name, "company", symbol)
+    for topic in config.get("topics") or []:
+        add(topic, "topic", topic)
+    return Gazetteer(automaton.build())
+
+
+_gazetteer: Optional[Gazetteer] = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> Gazetteer:
+    """Process-wide gazetteer, compiled on first use."""
+    global _gazetteer
+    with _gazetteer_lock:
+        if _gazetteer is None:
+            _gazetteer = load_gazetteer()
+    return _gazetteer
@@ -0,0 +1,259 @@
+"""Local city -> coordinates index.
+
+Lookups never touch the network: the index is a sorted file of fixed-width records
+that is memory-mapped and binary-searched, so resolving a city costs a few
+microseconds and nothing is parsed at startup. Places learned at runtime (e.g. from
+OpenWeatherMap geocoding/weather responses) are appended to a journal that every
+process reads on open; rebuilding the index folds the journal in.
+
+Build or rebuild the index from an offline dataset - a CSV with
+name,country,lat,lon[,population] columns or a GeoNames cities*.txt dump:
+
+    python -m utils.geocoder build data/cities.csv
+    python -m utils.geocoder build cities15000.txt
+    python -m utils.geocoder lookup "São Paulo"
+
+Paths come from the "geocoding" section of configs/agents.json.
+"""
+import argparse
+import bisect
+import csv
+import mmap
+import os
+import struct
+import sys
+import threading
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from utils.config import CONFIG_PATH, get_section
+
+ROOT = os.path.dirname(os.path.dirname(CONFIG_PATH))
+
+MAGIC = b"GEOIDX1\0"
+HEADER = struct.Struct("<8sI")
+# normalized key, display name, lat, lon, population, ISO country code
+RECORD = struct.Struct("<40s40sddI2s")
+KEY_BYTES = 40
+
+
+@dataclass(frozen=True)
+class Place:
+    name: str
+    lat: float
+    lon: float
+    country: str = ""
+    population: int = 0
+
+
+def normalize(name: str) -> str:
+    """Case-, accent- and punctuation-insensitive form of a place name."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+    return " ".join("".join(c if c.isalnum() else " " for c in stripped).split())
+
+
+def _key(name: str) -> bytes:
+    return normalize(name).encode("utf-8")[:KEY_BYTES]
+
+
+def _text(raw: bytes) -> str:
+    return raw.rstrip(b"\0").decode("utf-8", errors="ignore")
+
+
+def build_index(places: Iterable[Place], path: str) -> int:
+    """Write ``places`` as a sorted index at ``path`` (atomically) and return the record count."""
+    # Most populous first among places sharing a name
+    rows = sorted(((_key(p.name), -p.population, p) for p in places if normalize(p.name)),
+                  key=lambda row: row[:2])
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(rows)))
+        for key, _, p in rows:
+            f.write(RECORD.pack(key, p.name.encode("utf-8")[:KEY_BYTES], p.lat, p.lon,
+                                min(max(p.population, 0), 2**32 - 1), p.country.encode("ascii", errors="ignore")[:2]))
+    os.replace(tmp, path)
+    return len(rows)
+
+
+def read_places(path: str) -> Iterable[Place]:
+    """Places from a name,country,lat,lon[,population] CSV or a GeoNames dump (tab-separated)."""
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            for row in csv.DictReader(f):
+                yield Place(row["name"], float(row["lat"]), float(row["lon"]),
+                            row.get("country", ""), int(row.get("population") or 0))
+        else:
+            for line in f:
+                cols = line.rstrip("\n").split("\t")
+                if len(cols) > 14:
+                    yield Place(cols[1], float(cols[4]), float(cols[5]), cols[8], int(cols[14] or 0))
+
+
+def read_journal(path: str) -> Iterable[Place]:
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) == 4:
+                try:
+                    yield Place(cols[0], float(cols[1]), float(cols[2]), cols[3])
+                except ValueError:
+                    continue  # A torn write from a crashed process
+
+
+class _KeyView:
+    """Sequence of index keys read on demand, so bisect only touches the records it probes."""
+
+    def __init__(self, geocoder):
+        self.geocoder = geocoder
+
+    def __len__(self):
+        return self.geocoder._count
+
+    def __getitem__(self, i):
+        return self.geocoder._key_at(i)
+
+
+class Geocoder:
+    """Memory-mapped index plus the journal of places learned since it was built."""
+
+    def __init__(self, index_path: str, journal_path: Optional[str] = None):
+        self.index_path = index_path
+        self.journal_path = journal_path
+        self._lock = threading.Lock()
+        self._map = None
+        self._count = 0
+        self._learned: Dict[bytes, List[Place]] = {}
+        if os.path.exists(index_path) and os.path.getsize(index_path) > HEADER.size:
+            with open(index_path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self._count = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{index_path} is not a geocoding index")
+        if journal_path:
+            for place in read_journal(journal_path):
+                self._learned.setdefault(_key(place.name), []).insert(0, place)
+
+    def __len__(self):
+        return self._count + sum(len(places) for places in self._learned.values())
+
+    def _key_at(self, i: int) -> bytes:
+        return self._map[HEADER.size + i * RECORD.size:HEADER.size + i * RECORD.size + KEY_BYTES].rstrip(b"\0")
+
+    def _indexed(self, key: bytes) -> List[Place]:
+        if self._map is None:
+            return []
+        i = bisect.bisect_left(_KeyView(self), key)
+        places = []
+        while i < self._count and self._key_at(i) == key:
+            _, name, lat, lon, population, country = RECORD.unpack_from(self._map, HEADER.size + i * RECORD.size)
+            places.append(Place(_text(name), lat, lon, _text(country), population))
+            i += 1
+        return places
+
+    def lookup(self, name: str) -> Optional[Place]:
+        """Best match for ``name``: an exact spelling if known, else the most populous normalized match."""
+        if not name or not name.strip():
+            return None
+        key = _key(name)
+        candidates = self._learned.get(key, []) + self._indexed(key)
+        if not candidates:
+            return None
+        exact = name.strip()
+        return next((p for p in candidates if p.name == exact), candidates[0])
+
+    def learn(self, name: str, lat: float, lon: float, country: str = ""):
+        """Remember a place resolved elsewhere; persisted in the journal for other processes."""
+        if not normalize(name or ""):
+            return
+        place = Place(name.strip(), float(lat), float(lon), country or "")
+        known = self.lookup(place.name)
+        # Providers round coordinates differently; anything within ~10 km is the same place
+        if known and abs(known.lat - place.lat) < 0.1 and abs(known.lon - place.lon) < 0.1:
+            return
+        with self._lock:
+            self._learned.setdefault(_key(place.name), []).insert(0, place)
+            if self.journal_path:
+                os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+                # One short O_APPEND write per line keeps concurrent writers from interleaving
+                with open(self.journal_path, "a", encoding="utf-8") as f:
+                    f.write(f"{place.name}\t{place.lat}\t{place.lon}\t{place.country}\n")
+
+    def learn_from_weather(self, name: str, payload):
+        """Learn ``name``'s coordinates from an OpenWeatherMap weather response."""
+        if isinstance(payload, dict) and isinstance(payload.get("coord"), dict):
+            coord = payload["coord"]
+            if "lat" in coord and "lon" in coord:
+                self.learn(name, coord["lat"], coord["lon"], (payload.get("sys") or {}).get("country", ""))
+
+
+def _path(setting: str, default: str) -> str:
+    path = get_section("geocoding").get(setting, default)
+    return path if os.path.isabs(path) else os.path.join(ROOT, path)
+
+
+def index_paths():
+    return (_path("index", ".cache/geocode.idx"),
+            _path("journal", ".cache/geocode.journal"),
+            _path("seed", "data/cities.csv"))
+
+
+_geocoder = None
+_geocoder_lock = threading.Lock()
+
+
+def get_geocoder() -> Geocoder:
+    """Process-wide geocoder; builds the index from the seed dataset if it does not exist yet."""
+    global _geocoder
+    with _geocoder_lock:
+        if _geocoder is None:
+            index, journal, seed = index_paths()
+            if not os.path.exists(index) and os.path.exists(seed):
+                try:
+                    build_index(read_places(seed), index)
+                except OSError:
+                    pass
+            _geocoder = Geocoder(index, journal)
+    return _geocoder
+
+
+def location_params(city: str) -> dict:
+    """OpenWeatherMap location parameters: coordinates when the city is indexed, else the name."""
+    place = get_geocoder().lookup(city) if city else None
+    if place is None:
+        return {"q": city}
+    return {"lat": round(place.lat, 4), "lon": round(place.lon, 4)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query the local geocoding index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="build the index from a dataset plus the runtime journal")
+    build.add_argument("source", nargs="?", help="CSV or GeoNames dump (default: the configured seed)")
+    build.add_argument("-o", "--output", help="index path (default: the configured index)")
+    lookup = sub.add_parser("lookup", help="resolve a place name")
+    lookup.add_argument("name")
+    args = parser.parse_args(argv)
+
+    index, journal, seed = index_paths()
+    if args.command == "build":
+        places = list(read_places(args.source or seed)) + list(read_journal(journal))
+        count = build_index(places, args.output or index)
+        print(f"Indexed {count} places into {args.output or index}", file=sys.stderr)
+    else:
+        place = get_geocoder().lookup(args.name)
+        if place is None:
+            print(f"{args.name}: not found", file=sys.stderr)
+            return 1
+        print(f"{place.name} ({place.country}): {place.lat}, {place.lon}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,432 @@
+"""HTTP plumbing shared by the fetcher agents.
+
+Fetcher agents describe their provider calls as a generator (``BaseAgent.fetch``):
+they ``yield`` a ``Request`` and get a ``Response`` (or the raised exception)
+sent back. Yielding a list of ``Request``s (or a ``FanOut``) issues them
+concurrently, bounded by the agent's ``max_concurrency``, and sends back a list
+with one ``Response`` or exception per request, in order. ``HttpClient.drive`` executes such a generator with blocking ``requests``
+calls and ``HttpClient.adrive`` with non-blocking ``aiohttp`` calls, so the same
+agent code works from a worker thread or from an event loop.
+
+One ``HttpClient`` is shared by the whole process (``get_http_client``). It keeps
+per-host keep-alive connection pools for both transports, negotiates gzip/brotli
+and applies a default timeout, all configured from the "http" section of
+configs/agents.json. Successful GETs to providers with a "cache_ttl" are served
+from the shared response cache (utils/cache.py) before touching the network
+or the provider's rate limit, and identical GETs are coalesced so concurrent
+agents share one call (utils/singleflight.py).
+"""
+import asyncio
+import base64
+import contextvars
+import hashlib
+import json
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Generator, List, Optional, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from utils.cache import cache_ttl_for, error_fields_for, get_response_cache
+from utils.config import get_section
+from utils.rate_limiter import get_rate_limiter, retry_after, retry_policy
+from utils.singleflight import process_group, run_group
+
+
+# Query params and headers carrying API keys; kept out of cache keys and cached entries
+CREDENTIAL_PARAMS = frozenset({"apikey", "api_key", "appid", "key", "token", "access_token"})
+CREDENTIAL_HEADERS = frozenset({"authorization", "x-api-key"})
+
+
+def redact_url(url: str) -> str:
+    """``url`` without credential query params."""
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() not in CREDENTIAL_PARAMS]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class FetchCancelled(Exception):
+    """Raised by ``drive``/``adrive`` once the fetch's ``cancel_scope`` event is set."""
+
+
+_cancel_event: contextvars.ContextVar = contextvars.ContextVar("fetch_cancel_event", default=None)
+
+
+@contextmanager
+def cancel_scope(event: threading.Event):
+    """
+    Make fetches in this context abandonable: once ``event`` is set they stop before
+    their next request and store nothing more in the response cache.
+    """
+    token = _cancel_event.set(event)
+    try:
+        yield event
+    finally:
+        _cancel_event.reset(token)
+
+
+def _check_cancelled():
+    event = _cancel_event.get()
+    if event is not None and event.is_set():
+        raise FetchCancelled("fetch cancelled")
+
+
+class HTTPError(Exception):
+    def __init__(self, message, response=None):
+        super().__init__(message)
+        self.response = response
+
+
+@dataclass
+class Request:
+    url: str
+    params: Optional[Dict[str, Any]] = None
+    method: str = "GET"
+    headers: Optional[Dict[str, str]] = None
+    json: Any = None
+    timeout: Optional[float] = None
+
+    def query_params(self) -> Dict[str, str]:
+        """Params with unset values dropped, as ``requests`` would send them."""
+        return {k: str(v) for k, v in (self.params or {}).items() if v is not None}
+
+    def cache_key(self) -> str:
+        # Credentials select an account, not a response; leave them out of anything persisted
+        params = [(k, v) for k, v in self.query_params().items() if k.lower() not in CREDENTIAL_PARAMS]
+        headers = [(k, v) for k, v in (self.headers or {}).items() if k.lower() not in CREDENTIAL_HEADERS]
+        parts = [self.method.upper(), redact_url(self.url), sorted(params), sorted(headers)]
+        return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class FanOut:
+    """Requests to issue concurrently, at most ``max_concurrency`` at a time (default: the agent's cap)."""
+    requests: List[Request]
+    max_concurrency: Optional[int] = None
+
+
+@dataclass
+class Response:
+    status_code: int
+    headers: CaseInsensitiveDict
+    content: bytes
+    url: str
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+    def to_cache(self) -> dict:
+        return {"status_code": self.status_code, "headers": dict(self.headers),
+                "content": base64.b64encode(self.content).decode("ascii"), "url": redact_url(self.url)}
+
+    @classmethod
+    def from_cache(cls, entry: dict) -> "Response":
+        return cls(entry["status_code"], CaseInsensitiveDict(entry["headers"]),
+                   base64.b64decode(entry["content"]), entry["url"])
+
+
+def _error_payload(request: Request, response: Response) -> bool:
+    """Whether a 2xx body is one of the provider's in-band errors ("error_fields")."""
+    fields = error_fields_for(request.url)
+    if not fields:
+        return False
+    try:
+        data = response.json()
+    except ValueError:
+        return False
+    return isinstance(data, dict) and any(
+        name in data and (expected is None or data[name] == expected) for name, expected in fields.items())
+
+
+def _accept_encoding() -> str:
+    # Both urllib3 and aiohttp decode brotli when one of these packages is installed
+    for module in ("brotli", "brotlicffi"):
+        try:
+            __import__(module)
+            return "gzip, deflate, br"
+        except ImportError:
+            continue
+    return "gzip, deflate"
+
+
+class HttpClient:
+    """Pooled, rate-limited HTTP client for blocking and asyncio callers."""
+
+    def __init__(self, max_hosts=32, max_connections_per_host=16, max_connections=100, timeout=10.0, cache=None):
+        self.timeout = timeout
+        self.cache = cache
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.headers = {"Accept-Encoding": _accept_encoding()}
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=max_hosts, pool_maxsize=max_connections_per_host)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # One aiohttp session per event loop; sessions cannot be shared across loops
+        self._async_sessions = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def from_config(cls, settings: dict) -> "HttpClient":
+        return cls(**{k: v for k, v in settings.items()
+                      if k in ("max_hosts", "max_connections_per_host", "max_connections", "timeout")})
+
+    def _cache_ttl(self, request: Request) -> Optional[float]:
+        if self.cache is None or request.method.upper() != "GET":
+            return None
+        return cache_ttl_for(request.url)
+
+    def _cached(self, request: Request, ttl: Optional[float]) -> Optional[Response]:
+        entry = self.cache.get(request.cache_key()) if ttl else None
+        return Response.from_cache(entry) if entry is not None else None
+
+    def _store(self, request: Request, response: Response, ttl: Optional[float]):
+        # Only successes are worth keeping; errors and throttling should be retried next time
+        cancelled = _cancel_event.get()
+        if cancelled is not None and cancelled.is_set():
+            return
+        if ttl and 200 <= response.status_code < 300 and not _error_payload(request, response):
+            self.cache.set(request.cache_key(), response.to_cache(), ttl)
+
+    def send(self, request: Request) -> Response:
+        """Perform ``request`` with a blocking call; identical GETs share one call."""
+        if request.method.upper() != "GET":
+            return self._send_limited(request)
+        key = request.cache_key()
+        group = run_group()
+        if group is None:
+            return process_group().do(key, lambda: self._send_cached(request))
+        return group.do(key, lambda: process_group().do(key, lambda: self._send_cached(request)),
+                        keep=lambda response: response.ok)
+
+    def _send_cached(self, request: Request) -> Response:
+        ttl = self._cache_ttl(request)
+        response = self._cached(request, ttl)
+        if response is None:
+            response = self._send_limited(request)
+            self._store(request, response, ttl)
+        return response
+
+    def _send_limited(self, request: Request) -> Response:
+        """
+        Waits for the provider's rate-limit token first and retries when the provider
+        answers 429/503 with a Retry-After we are willing to wait for.
+        """
+        bucket = get_rate_limiter().bucket_for(request.url)
+        max_retries, max_wait = retry_policy()
+        for attempt in range(max_retries + 1):
+            if bucket:
+                bucket.acquire()
+            response = self._send_once(request)
+            delay = retry_after(response.status_code, response.headers)
+            if delay is None:
+                return response
+            if bucket:
+                # Never hold the whole host for longer than we would wait ourselves
+                bucket.pause(min(delay, max_wait))
+            if attempt == max_retries or delay > max_wait:
+                return response
+            if not bucket:
+                time.sleep(delay)
+        return response
+
+    def _send_once(self, request: Request) -> Response:
+        resp = self.session.request(
+            request.method,
+            request.url,
+            params=request.query_params(),
+            headers=request.headers,
+            json=request.json,
+            timeout=request.timeout or self.timeout,
+        )
+        return Response(resp.status_code, CaseInsensitiveDict(resp.headers), resp.content, resp.url)
+
+    async def asend(self, request: Request) -> Response:
+        """Perform ``request`` on the running event loop, with the same caching and coalescing as ``send``."""
+        if request.method.upper() != "GET":
+            return await self._asend_limited(request)
+        key = request.cache_key()
+        group = run_group()
+        if group is None:
+            return await process_group().ado(key, lambda: self._asend_cached(request))
+        return await group.ado(key, lambda: process_group().ado(key, lambda: self._asend_cached(request)),
+                               keep=lambda response: response.ok)
+
+    async def _asend_cached(self, request: Request) -> Response:
+        ttl = self._cache_ttl(request)
+        # The disk tier is SQLite; keep its reads and writes off the event loop
+        response = await asyncio.to_thread(self._cached, request, ttl) if ttl else None
+        if response is None:
+            response = await self._asend_limited(request)
+            if ttl:
+                await asyncio.to_thread(self._store, request, response, ttl)
+        return response
+
+    async def _asend_limited(self, request: Request) -> Response:
+        """Same rate limiting and Retry-After handling as ``_send_limited``."""
+        bucket = get_rate_limiter().bucket_for(request.url)
+        max_retries, max_wait = retry_policy()
+        for attempt in range(max_retries + 1):
+            if bucket:
+                await bucket.acquire_async()
+            response = await self._asend_once(request)
+            delay = retry_after(response.status_code, response.headers)
+            if delay is None:
+                return response
+            if bucket:
+                # Never hold the whole host for longer than we would wait ourselves
+                bucket.pause(min(delay, max_wait))
+            if attempt == max_retries or delay > max_wait:
+                return response
+            if not bucket:
+                await asyncio.sleep(delay)
+        return response
+
+    def _async_session(self):
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        session = self._async_sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections,
+                                             limit_per_host=self.max_connections_per_host,
+                                             ttl_dns_cache=300)
+            session = aiohttp.ClientSession(connector=connector, headers=self.headers)
+            self._async_sessions[loop] = session
+        return session
+
+    async def _asend_once(self, request: Request) -> Response:
+        import aiohttp
+
+        timeout = aiohttp.ClientTimeout(total=request.timeout or self.timeout)
+        async with self._async_session().request(
+            request.method,
+            request.url,
+            params=request.query_params(),
+            headers=request.headers,
+            json=request.json,
+            timeout=timeout,
+        ) as resp:
+            content = await resp.read()
+            return Response(resp.status, CaseInsensitiveDict(resp.headers), content, str(resp.url))
+
+    async def aclose(self):
+        """Close the session bound to the running loop (call before the loop shuts down)."""
+        session = self._async_sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+    def _try_send(self, request: Request) -> Union[Response, Exception]:
+        try:
+            return self.send(request)
+        except Exception as e:
+            return e
+
+    def send_all(self, requests: List[Request], max_concurrency: Optional[int] = None) -> List[Union[Response, Exception]]:
+        """Send ``requests`` from up to ``max_concurrency`` threads; outcomes come back in input order."""
+        workers = min(max_concurrency or len(requests), len(requests))
+        if workers <= 1:
+            return [self._try_send(request) for request in requests]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # Each worker runs in the caller's context so it shares the run's single-flight group
+            futures = [pool.submit(contextvars.copy_context().run, self._try_send, request) for request in requests]
+            return [future.result() for future in futures]
+
+    async def asend_all(self, requests: List[Request], max_concurrency: Optional[int] = None) -> List[Union[Response, Exception]]:
+        """Event-loop version of ``send_all``."""
+        semaphore = asyncio.Semaphore(max_concurrency or max(len(requests), 1))
+
+        async def bounded(request):
+            async with semaphore:
+                return await self.asend(request)
+
+        return await asyncio.gather(*(bounded(request) for request in requests), return_exceptions=True)
+
+    def drive(self, gen: Generator, max_concurrency: Optional[int] = None) -> Any:
+        """Run a fetch generator to completion with blocking requests."""
+        try:
+            request = next(gen)
+            while True:
+                _check_cancelled()
+                try:
+                    if isinstance(request, (list, FanOut)):
+                        fan_out = _as_fan_out(request, max_concurrency)
+                        response = self.send_all(fan_out.requests, fan_out.max_concurrency)
+                    else:
+                        response = self.send(request)
+                except Exception as e:
+                    request = gen.throw(e)
+                else:
+                    request = gen.send(response)
+        except StopIteration as stop:
+            return stop.value
+
+    async def adrive(self, gen: Generator, max_concurrency: Optional[int] = None) -> Any:
+        """Run a fetch generator to completion on the running event loop."""
+        try:
+            request = next(gen)
+            while True:
+                _check_cancelled()
+                try:
+                    if isinstance(request, (list, FanOut)):
+                        fan_out = _as_fan_out(request, max_concurrency)
+                        response = await self.asend_all(fan_out.requests, fan_out.max_concurrency)
+                    else:
+                        response = await self.asend(request)
+                except Exception as e:
+                    request = gen.throw(e)
+                else:
+                    request = gen.send(response)
+        except StopIteration as stop:
+            return stop.value
+
+
+def _as_fan_out(yielded, max_concurrency: Optional[int]) -> FanOut:
+    if isinstance(yielded, FanOut):
+        return FanOut(yielded.requests, yielded.max_concurrency or max_concurrency)
+    return FanOut(list(yielded), max_concurrency)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """The process-wide client, built from the "http" config section on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient.from_config(get_section("http"))
+            _client.cache = get_response_cache()
+    return _client
+
+
+def send(request: Request) -> Response:
+    return get_http_client().send(request)
+
+
+async def asend(request: Request) -> Response:
+    return await get_http_client().asend(request)
+
+
+async def aclose():
+    await get_http_client().aclose()
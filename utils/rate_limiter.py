@@ -1,10 +1,133 @@
-from ratelimit import limits, sleep_and_retry
+"""Provider-scoped rate limiting.
+
+Each provider host (api.openweathermap.org, newsdata.io, ...) gets one token bucket,
+shared by every agent that calls it. Buckets are configured from configs/agents.json:
+the "providers" section maps hosts to {"rate_limit": {"calls", "period", "burst"?}},
+and agent entries with an "endpoint" and "rate_limit" (weather, spacex_next) cover
+their own host. Buckets are safe to use from threads and from event loops: the lock
+is only held to reserve a token, never while waiting for it.
+"""
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from functools import wraps
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from utils.config import get_section, load_config
+
+
+class TokenBucket:
+    """Allows ``rate`` calls per second on average with bursts of up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_quota(cls, calls: int, period: float, burst: Optional[int] = None) -> "TokenBucket":
+        return cls(rate=calls / period, capacity=burst or calls)
+
+    def _reserve(self) -> float:
+        """Take a token (possibly borrowing from the future) and return the seconds to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            if now > self.updated:
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+            self.tokens -= 1
+            ready_at = self.updated + max(0.0, -self.tokens) / self.rate
+            return max(0.0, ready_at - now)
+
+    def acquire(self):
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float):
+        """Hand out no tokens for ``seconds`` (e.g. after a 429 with Retry-After)."""
+        with self._lock:
+            until = time.monotonic() + seconds
+            if until > self.updated:
+                self.updated = until
+                self.tokens = min(self.tokens, 0.0)
+
+
+class RateLimiter:
+    """Token buckets keyed by provider host."""
+
+    def __init__(self, quotas: Dict[str, dict]):
+        self.buckets = {host: TokenBucket.for_quota(**quota) for host, quota in quotas.items()}
+
+    @classmethod
+    def from_config(cls, config: dict) -> "RateLimiter":
+        quotas = {}
+        for entry in config.values():
+            if isinstance(entry, dict) and entry.get("endpoint") and entry.get("rate_limit"):
+                quotas[urlsplit(entry["endpoint"]).hostname] = entry["rate_limit"]
+        # The providers section wins over per-agent declarations
+        for host, provider in (config.get("providers") or {}).items():
+            if provider.get("rate_limit"):
+                quotas[host] = provider["rate_limit"]
+        return cls(quotas)
+
+    def bucket_for(self, url: str) -> Optional[TokenBucket]:
+        return self.buckets.get(urlsplit(url).hostname)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter built from configs/agents.json on first use."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter.from_config(load_config())
+    return _limiter
+
+
+def retry_after(status_code: int, headers) -> Optional[float]:
+    """Seconds the provider asked us to wait (429/503 + Retry-After), or None."""
+    if status_code not in (429, 503):
+        return None
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_policy():
+    """(max_retries, longest Retry-After worth waiting for) from the "rate_limiting" config section."""
+    settings = get_section("rate_limiting")
+    return settings.get("max_retries", 2), settings.get("max_retry_after", 30)
+
 
 def limit_api(calls, period):
+    """Decorator limiting a single function to ``calls`` per ``period`` seconds."""
     def decorator(func):
-        @sleep_and_retry
-        @limits(calls=calls, period=period)
+        bucket = TokenBucket.for_quota(calls, period)
+
+        @wraps(func)
         def wrapper(*args, **kwargs):
+            bucket.acquire()
             return func(*args, **kwargs)
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
@@ -0,0 +1,264 @@
+"""Research report model and renderers.
+
+A ``Report`` is built once per run (see ``main.build_report``): the analysis
+sections, the header facts and the performance metrics. Its text layout -
+section banners, wrapped paragraphs, bullets - is also computed once, as lines
+of styled spans, and every sink renders from it:
+
+* ``ansi``      the terminal report, with color codes
+* ``text``      the same layout without color codes, for report files
+* ``markdown``  headings and the sections' own line breaks
+* ``json``      the model itself
+
+``write_report`` renders each requested format once and writes it to any
+number of streams or paths, so nothing ever has to redirect ``sys.stdout``.
+"""
+import datetime
+import json
+from dataclasses import asdict, dataclass, field
+from functools import cached_property
+from textwrap import fill
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Terminal color codes
+BOLD = "\033[1m"
+CYAN = "\033[96m"
+GREEN = "\033[92m"
+YELLOW = "\033[93m"
+RED = "\033[91m"
+BLUE = "\033[94m"
+MAGENTA = "\033[95m"
+RESET = "\033[0m"
+
+# Text width for wrapping
+TEXT_WIDTH = 80
+
+GENERATED_BY = "ADK Research Platform v3.0"
+CONFIDENTIALITY = "This report contains privileged analysis for authorized use only"
+TOTAL_SUMMARY_INTRO = ("This section provides a concise synthesis of all key findings, insights, and "
+                       "recommendations from the analysis above. Use this as a quick reference for decision-making.")
+
+# Sections restated in the total summary, with their labels there
+TOTAL_SUMMARY_PARTS = (
+    ("EXECUTIVE OVERVIEW", "Executive Overview"),
+    ("THEMATIC ANALYSIS", "Key Environmental & Thematic Insights"),
+    ("CRITICAL INSIGHTS", "Critical Insights"),
+    ("CONCLUSIONS & RECOMMENDATIONS", "Conclusions & Recommendations"),
+)
+
+# A line is a list of (style, text) spans; style is a prefix of color codes or ""
+Line = List[Tuple[str, str]]
+
+
+def wrap_text(text, indent=0, width=TEXT_WIDTH):
+    """Wrap text with proper indentation and line breaks"""
+    return fill(text, width=width, initial_indent=' '*indent, subsequent_indent=' '*indent)
+
+
+@dataclass
+class Section:
+    title: str
+    content: str
+
+
+@dataclass
+class Metrics:
+    processing_time: float = 0.0
+    errors: List[str] = field(default_factory=list)
+    summary_words: Optional[int] = None  # None when no summary was produced
+    entities: int = 0
+
+    @property
+    def analysis_depth(self):
+        if self.summary_words is None:
+            return "Insufficient"
+        return "Comprehensive" if self.summary_words > 200 else "Detailed" if self.summary_words > 100 else "Basic"
+
+    @property
+    def coverage_score(self):
+        return min(100, self.entities * 15 + (40 if self.summary_words is not None else 0))
+
+    @cached_property
+    def lines(self) -> List[Line]:
+        """The performance metrics block, laid out once for the ansi and text sinks."""
+        lines = _banner("SYSTEM PERFORMANCE METRICS", MAGENTA)
+        lines.append([(BOLD, "Total Processing Time:"), ("", f" {self.processing_time:.2f} seconds")])
+        if self.errors:
+            lines.append([(BOLD + RED, "Operational Issues:"), ("", f" {len(self.errors)} errors encountered")])
+            lines += [[("", f"  - {error}")] for error in self.errors[:3]]
+        else:
+            lines.append([(BOLD + GREEN, "Operational Status:"), ("", " All agents executed successfully")])
+
+        lines += [[], [(BOLD, "Data Quality Assessment:")]]
+        if self.summary_words is None:
+            lines.append([("", "  • Analysis Depth: "), (RED, "Insufficient")])
+        else:
+            lines.append([("", f"  • Analysis Depth: {self.analysis_depth} ({self.summary_words} words)")])
+        lines.append([("", f"  • Entity Coverage: {self.entities} key entities analyzed")])
+        lines.append([("", f"  • Comprehensive Coverage Index: {self.coverage_score}/100")])
+        lines.append([])
+        return lines
+
+
+@dataclass
+class Report:
+    goal: str
+    sections: List[Section]
+    metrics: Metrics
+    agent_chain: List[str] = field(default_factory=list)
+    generated_at: datetime.datetime = field(default_factory=datetime.datetime.now)
+
+    def section(self, title) -> Optional[Section]:
+        return next((s for s in self.sections if s.title == title), None)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["generated_at"] = self.generated_at.isoformat(timespec="seconds")
+        data["metrics"].update(analysis_depth=self.metrics.analysis_depth,
+                               coverage_score=self.metrics.coverage_score)
+        return data
+
+    @cached_property
+    def body_lines(self) -> List[Line]:
+        """The detailed report, laid out once for the ansi and text sinks."""
+        lines = _banner("AI RESEARCH REPORT", BLUE)
+        lines += [
+            [(BOLD, "Research Goal:"), ("", f" {self.goal}")],
+            [(BOLD, "Date of Analysis:"), ("", f" {self.generated_at:%Y-%m-%d %H:%M:%S}")],
+            [(BOLD, "Processing Metrics:"), ("", f" Completed in {self.metrics.processing_time:.2f} seconds")],
+            [(BOLD, "Agent Workflow:"), ("", f" {', '.join(self.agent_chain)}")],
+            [],
+        ]
+        for section in self.sections:
+            lines += _banner(section.title, CYAN)
+            lines += _paragraph(section.content, indent=2)
+
+        lines += _banner("TOTAL SUMMARY", GREEN)
+        lines += _paragraph(TOTAL_SUMMARY_INTRO, indent=2)
+        for title, label in TOTAL_SUMMARY_PARTS:
+            section = self.section(title)
+            if section is None:
+                continue
+            lines.append([(BOLD, f"{label}:")])
+            if title == "CRITICAL INSIGHTS":
+                # Present each insight as a bullet point
+                lines += [[("", "    • " + line.strip().lstrip('-').strip())]
+                          for line in section.content.split('\n') if line.strip()]
+                lines.append([])
+            else:
+                lines += _paragraph(section.content, indent=4)
+            if title == "EXECUTIVE OVERVIEW":
+                lines += [[(BOLD, "Executive Overview Word Count:"), ("", f" {len(section.content.split())}")], []]
+
+        lines += _banner("END OF REPORT", BLUE)
+        lines += [
+            [(BOLD, "Report Generated By:"), ("", f" {GENERATED_BY}")],
+            [(BOLD, "Confidentiality:"), ("", f" {CONFIDENTIALITY}")],
+            [],
+        ]
+        return lines
+
+
+def _banner(title, color) -> List[Line]:
+    title = f" {title} "
+    return [[], [(color + BOLD, title.center(TEXT_WIDTH, '='))]]
+
+
+def _paragraph(text, indent) -> List[Line]:
+    return [[("", line)] for line in wrap_text(text, indent).split("\n")] + [[]]
+
+
+def render_lines(lines: Iterable[Line], ansi: bool = True) -> str:
+    """Text of laid-out lines, with or without color codes."""
+    out = []
+    for line in lines:
+        out.append("".join(f"{style}{text}{RESET}" if ansi and style else text for style, text in line))
+    return "\n".join(out) + "\n"
+
+
+def render_ansi(report: Report, metrics: bool = True) -> str:
+    return render_lines(report.body_lines + (report.metrics.lines if metrics else []), ansi=True)
+
+
+def render_text(report: Report, metrics: bool = True) -> str:
+    return render_lines(report.body_lines + (report.metrics.lines if metrics else []), ansi=False)
+
+
+def render_markdown(report: Report, metrics: bool = True) -> str:
+    out = [
+        "# AI Research Report",
+        "",
+        f"- **Research Goal:** {report.goal}",
+        f"- **Date of Analysis:** {report.generated_at:%Y-%m-%d %H:%M:%S}",
+        f"- **Processing Metrics:** Completed in {report.metrics.processing_time:.2f} seconds",
+        f"- **Agent Workflow:** {', '.join(report.agent_chain)}",
+        "",
+    ]
+    for section in report.sections:
+        # Sections keep their own line breaks ("- " bullets stay a list)
+        out += [f"## {section.title.title()}", "", section.content.strip(), ""]
+    if metrics:
+        m = report.metrics
+        out += ["## System Performance Metrics", "",
+                f"- **Total Processing Time:** {m.processing_time:.2f} seconds"]
+        if m.errors:
+            out.append(f"- **Operational Issues:** {len(m.errors)} errors encountered")
+            out += [f"  - {error}" for error in m.errors[:3]]
+        else:
+            out.append("- **Operational Status:** All agents executed successfully")
+        depth = m.analysis_depth if m.summary_words is None else f"{m.analysis_depth} ({m.summary_words} words)"
+        out += [f"- **Analysis Depth:** {depth}",
+                f"- **Entity Coverage:** {m.entities} key entities analyzed",
+                f"- **Comprehensive Coverage Index:** {m.coverage_score}/100", ""]
+    out += [f"*Report generated by {GENERATED_BY}. {CONFIDENTIALITY}.*", ""]
+    return "\n".join(out)
+
+
+def render_json(report: Report, metrics: bool = True) -> str:
+    data = report.to_dict()
+    if not metrics:
+        data.pop("metrics")
+    return json.dumps(data, indent=2, default=str) + "\n"
+
+
+RENDERERS = {
+    "ansi": render_ansi,
+    "text": render_text,
+    "markdown": render_markdown,
+    "json": render_json,
+}
+
+EXTENSIONS = {"ansi": "ans", "text": "txt", "markdown": "md", "json": "json"}
+
+
+def render(report: Report, fmt: str, metrics: bool = True) -> str:
+    try:
+        renderer = RENDERERS[fmt]
+    except KeyError:
+        raise ValueError(f"Unknown report format {fmt!r} (expected one of: {', '.join(RENDERERS)})") from None
+    return renderer(report, metrics=metrics)
+
+
+def write_report(report: Report, sinks: Iterable[Tuple[str, object]], metrics: bool = True) -> Dict[str, str]:
+    """
+    Write ``report`` to each ``(format, target)`` sink, where a target is a writable
+    stream or a file path. Each format is rendered once however many sinks use it.
+    Returns the rendered text per format.
+    """
+    rendered: Dict[str, str] = {}
+    for fmt, target in sinks:
+        if fmt not in rendered:
+            rendered[fmt] = render(report, fmt, metrics=metrics)
+        if isinstance(target, str):
+            with open(target, "w", encoding="utf-8") as f:
+                f.write(rendered[fmt])
+        else:
+            target.write(rendered[fmt])
+            target.flush()
+    return rendered
+
+
+def report_basename(goal: str, when: Optional[datetime.datetime] = None) -> str:
+    """File name stem for a saved report, e.g. ``Weather_in_London_20240101_120000``."""
+    when = when or datetime.datetime.now()
+    return f"{goal[:20].replace(' ', '_').replace('/', '_')}_{when:%Y%m%d_%H%M%S}"
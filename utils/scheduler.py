@@ -0,0 +1,245 @@
+"""Dependency-aware scheduling for agent chains.
+
+Agents declare the context keys they ``consumes`` and ``produces`` (see
+``BaseAgent``). ``AgentGraph`` turns a chain into a DAG over those keys and
+``run_graph`` (threads) or ``arun_graph`` (asyncio) dispatches each agent as
+soon as everything it depends on has finished, so independent fetchers run side
+by side while consumers such as ``sentiment`` or ``summarizer`` wait for their
+inputs.
+"""
+import asyncio
+import contextvars
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Set
+
+WILDCARD = "*"
+
+
+def dedupe_chain(chain: List[str]) -> List[str]:
+    """Drop repeated agent names while keeping the first occurrence's position."""
+    seen = set()
+    return [name for name in chain if not (name in seen or seen.add(name))]
+
+
+def input_fingerprint(agent: Any, data: Mapping[str, Any]) -> Optional[str]:
+    """
+    Hash of the context values ``agent`` reads, or None for wildcard consumers.
+    Keys the agent also produces are left out, since the agent rewrites them itself.
+    """
+    consumes = getattr(agent, "consumes", []) or []
+    if WILDCARD in consumes:
+        return None
+    produces = set(getattr(agent, "produces", []) or [])
+    inputs = {key: data.get(key) for key in consumes if key not in produces}
+    payload = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class AgentGraph:
+    """Tracks dependencies and progress for a single pass over a chain."""
+
+    def __init__(self, chain: List[str], agents: Mapping[str, Any]):
+        self.chain = dedupe_chain(chain)
+        self.deps: Dict[str, Set[str]] = {}
+        self.pending: List[str] = list(self.chain)
+        self.running: Set[str] = set()
+        self.done: Set[str] = set()
+
+        consumes = {name: list(getattr(agents[name], "consumes", []) or []) for name in self.chain}
+        producers: Dict[str, List[str]] = {}
+        for name in self.chain:
+            for key in getattr(agents[name], "produces", []) or []:
+                producers.setdefault(key, []).append(name)
+
+        for name in self.chain:
+            if WILDCARD in consumes[name]:
+                # Wildcard consumers (the summarizer) wait for every regular agent
+                deps = {other for other in self.chain if other != name and WILDCARD not in consumes[other]}
+            else:
+                deps = {p for key in consumes[name] for p in producers.get(key, []) if p != name}
+            self.deps[name] = deps
+
+    def ready(self) -> List[str]:
+        """Agents whose dependencies are satisfied and that have not started yet."""
+        ready = [name for name in self.pending if self.deps[name] <= self.done]
+        if not ready and not self.running and self.pending:
+            # Dependency cycle: fall back to chain order for the first stuck agent
+            ready = [self.pending[0]]
+        return ready
+
+    def skip(self, names):
+        """Treat ``names`` as already finished (their earlier results are reused)."""
+        for name in names:
+            if name in self.pending:
+                self.pending.remove(name)
+                self.done.add(name)
+
+    def start(self, name: str):
+        self.pending.remove(name)
+        self.running.add(name)
+
+    def finish(self, name: str):
+        self.running.discard(name)
+        self.done.add(name)
+
+    @property
+    def finished(self) -> bool:
+        return not self.pending and not self.running
+
+    def dependents(self, names) -> Set[str]:
+        """All agents that transitively depend on any of ``names``."""
+        result: Set[str] = set()
+        frontier = set(names)
+        while frontier:
+            frontier = {n for n in self.chain if self.deps[n] & frontier and n not in result}
+            result |= frontier
+        return result
+
+
+class AgentTimeoutError(TimeoutError):
+    """An agent did not finish within its deadline and its result was discarded."""
+
+    def __init__(self, name: str, deadline: float):
+        if deadline <= 0:
+            message = f"{name} skipped: latency budget exhausted"
+        else:
+            message = f"{name} missed its {deadline:.1f}s deadline"
+        super().__init__(message)
+        self.agent = name
+        self.deadline = deadline
+
+
+def run_graph(
+    graph: AgentGraph,
+    run_agent: Callable[[str], Any],
+    on_result: Callable[[str, Any, Optional[Exception]], None],
+    max_workers: Optional[int] = None,
+    on_start: Optional[Callable[[str], None]] = None,
+    deadline_for: Optional[Callable[[str], Optional[float]]] = None,
+):
+    """
+    Execute ``graph`` on a thread pool.
+    ``run_agent(name)`` does the work in a worker thread; ``on_start(name)`` and
+    ``on_result(name, result, error)`` are called on the calling thread, so reading and
+    merging the shared context is never concurrent and always happens before any
+    dependent agent is dispatched.
+    ``deadline_for(name)`` returns the seconds an agent may take (None for no limit).
+    Agents that overrun are reported with an ``AgentTimeoutError`` and their dependents
+    proceed without them; a worker thread cannot be interrupted, so it finishes in the
+    background and its result is dropped.
+    """
+    if graph.finished:
+        return
+    executor = ThreadPoolExecutor(max_workers=max_workers or len(graph.chain))
+    futures = {}
+    expiries = {}  # future -> (monotonic expiry, deadline)
+
+    def dispatch():
+        ready = graph.ready()
+        while ready:
+            for name in ready:
+                graph.start(name)
+                if on_start:
+                    on_start(name)
+                deadline = deadline_for(name) if deadline_for else None
+                if deadline is not None and deadline <= 0:
+                    on_result(name, None, AgentTimeoutError(name, deadline))
+                    graph.finish(name)
+                    continue
+                # Run in a copy of the caller's context so run-scoped state (utils/singleflight) is visible
+                future = executor.submit(contextvars.copy_context().run, run_agent, name)
+                futures[future] = name
+                if deadline is not None:
+                    expiries[future] = (time.monotonic() + deadline, deadline)
+            ready = graph.ready()
+
+    try:
+        dispatch()
+        while futures:
+            timeout = None
+            if expiries:
+                timeout = max(0, min(expiry for expiry, _ in expiries.values()) - time.monotonic())
+            done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = futures.pop(future)
+                expiries.pop(future, None)
+                try:
+                    result, error = future.result(), None
+                except Exception as e:
+                    result, error = None, e
+                on_result(name, result, error)
+                graph.finish(name)
+            now = time.monotonic()
+            for future, (expiry, deadline) in list(expiries.items()):
+                if expiry <= now:
+                    future.cancel()
+                    name = futures.pop(future)
+                    del expiries[future]
+                    on_result(name, None, AgentTimeoutError(name, deadline))
+                    graph.finish(name)
+            dispatch()
+    finally:
+        # Never block on agents that overran their deadline
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def arun_graph(
+    graph: AgentGraph,
+    run_agent: Callable[[str], Awaitable[Any]],
+    on_result: Callable[[str, Any, Optional[Exception]], None],
+    on_start: Optional[Callable[[str], None]] = None,
+    deadline_for: Optional[Callable[[str], Optional[float]]] = None,
+):
+    """
+    Event-loop version of ``run_graph``; ``run_agent(name)`` returns an awaitable.
+    Tasks that overrun their deadline are cancelled.
+    """
+    tasks = {}
+    expiries = {}  # task -> (loop time expiry, deadline)
+    loop = asyncio.get_running_loop()
+
+    def dispatch():
+        ready = graph.ready()
+        while ready:
+            for name in ready:
+                graph.start(name)
+                if on_start:
+                    on_start(name)
+                deadline = deadline_for(name) if deadline_for else None
+                if deadline is not None and deadline <= 0:
+                    on_result(name, None, AgentTimeoutError(name, deadline))
+                    graph.finish(name)
+                    continue
+                task = asyncio.ensure_future(run_agent(name))
+                tasks[task] = name
+                if deadline is not None:
+                    expiries[task] = (loop.time() + deadline, deadline)
+            ready = graph.ready()
+
+    dispatch()
+    while tasks:
+        timeout = None
+        if expiries:
+            timeout = max(0, min(expiry for expiry, _ in expiries.values()) - loop.time())
+        done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            name = tasks.pop(task)
+            expiries.pop(task, None)
+            try:
+                result, error = task.result(), None
+            except Exception as e:
+                result, error = None, e
+            on_result(name, result, error)
+            graph.finish(name)
+        now = loop.time()
+        for task, (expiry, deadline) in list(expiries.items()):
+            if expiry <= now:
+                task.cancel()
+                name = tasks.pop(task)
+                del expiries[task]
+                on_result(name, None, AgentTimeoutError(name, deadline))
+                graph.finish(name)
+        dispatch()
@@ -0,0 +1,193 @@
+"""Batch lexicon sentiment for headlines.
+
+Scores every headline of every entity in one vectorized pass instead of one
+``TextBlob`` per text. All headlines are tokenized into a single flat token
+stream; each token's lexicon row (polarity, intensity, modifier/negation flags)
+is gathered with one fancy-index, TextBlob's rules are applied with shifted
+arrays, and per-headline, per-entity and overall scores are segment sums
+(``np.bincount``) over the stream - a sparse headline x term matrix times the
+lexicon's polarity vector, without materializing the matrix.
+
+The lexicon and rules are TextBlob's (pattern's ``en-sentiment.xml``):
+
+* a score is the mean polarity of the known words ("assessments") in the text,
+* a known adverb modifies the next known word ("very good" = 1.3 * good) and is
+  not assessed on its own,
+* a negation up to two tokens back ("not good", "not a good") gives -0.5 * polarity,
+* each "!" boosts the last assessment before it by 1.25.
+
+The XML is read directly, so neither TextBlob nor NLTK is imported. Agreement and
+throughput against TextBlob: ``python evals/bench_sentiment.py``.
+"""
+import importlib.util
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Sequence
+from xml.etree import ElementTree
+
+import numpy as np
+
+NEGATIONS = ("no", "not", "n't", "never")
+# "don't" -> "do", "n't" as TextBlob tokenizes it
+_TOKEN = re.compile(r"[a-z]+(?=n't)|n't|[a-z][a-z'\-]*|!")
+
+
+def default_lexicon_path() -> Optional[str]:
+    spec = importlib.util.find_spec("textblob")
+    if spec is None or not spec.origin:
+        return None
+    return os.path.join(os.path.dirname(spec.origin), "en", "en-sentiment.xml")
+
+
+def label_for(score: float) -> str:
+    if score > 0.1:
+        return "Positive"
+    if score < -0.1:
+        return "Negative"
+    return "Neutral"
+
+
+class SentimentLexicon:
+    """Vocabulary plus per-term arrays; term 0 is the unknown word."""
+
+    def __init__(self, path: Optional[str] = None):
+        path = path or default_lexicon_path()
+        if not path or not os.path.exists(path):
+            raise FileNotFoundError("sentiment lexicon not found (pip install textblob, or pass its en-sentiment.xml)")
+        senses: Dict[str, List[tuple]] = {}
+        adverbs = set()
+        for w in ElementTree.parse(path).getroot().findall("word"):
+            form = w.attrib.get("form")
+            if not form:
+                continue
+            senses.setdefault(form, []).append((float(w.attrib.get("polarity", 0.0)),
+                                                float(w.attrib.get("intensity", 1.0))))
+            if w.attrib.get("pos") == "RB":
+                adverbs.add(form)
+        self.vocab = {word: i for i, word in enumerate(senses, start=1)}
+        size = len(self.vocab) + 1
+        # Scores averaged over all senses of a word, as TextBlob does for untagged text
+        self.polarity = np.zeros(size)
+        self.intensity = np.ones(size)
+        self.known = np.zeros(size, dtype=bool)
+        self.modifier = np.zeros(size, dtype=bool)
+        for word, i in self.vocab.items():
+            values = np.array(senses[word])
+            self.polarity[i], self.intensity[i] = values.mean(axis=0)
+            self.known[i] = True
+            self.modifier[i] = word in adverbs
+        # Negations (mostly) and "!" are not in the lexicon; they get their own ids
+        for word in (*NEGATIONS, "!"):
+            if word not in self.vocab:
+                self.vocab[word] = len(self.vocab) + 1
+        self.negation = np.zeros(len(self.vocab) + 1, dtype=bool)
+        for word in NEGATIONS:
+            self.negation[self.vocab[word]] = True
+        pad = len(self.negation) - size
+        self.polarity = np.concatenate([self.polarity, np.zeros(pad)])
+        self.intensity = np.concatenate([self.intensity, np.ones(pad)])
+        self.known = np.concatenate([self.known, np.zeros(pad, dtype=bool)])
+        self.modifier = np.concatenate([self.modifier, np.zeros(pad, dtype=bool)])
+
+
+def _shift(values: np.ndarray, by: int, fill) -> np.ndarray:
+    out = np.empty_like(values)
+    out[:by] = fill
+    out[by:] = values[:-by]
+    return out
+
+
+class SentimentEngine:
+    def __init__(self, lexicon: Optional[SentimentLexicon] = None):
+        self.lexicon = lexicon or SentimentLexicon()
+
+    def assess(self, texts: Sequence[str]):
+        """(polarity sums, assessment counts) per text, from one pass over all their tokens."""
+        vocab = self.lexicon.vocab
+        term_ids, doc_ids, lengths = [], [], []
+        for doc, text in enumerate(texts):
+            tokens = _TOKEN.findall(text.lower())
+            term_ids.extend(vocab.get(token, 0) for token in tokens)
+            lengths.extend(len(token) for token in tokens)
+            doc_ids.extend([doc] * len(tokens))
+        n = len(texts)
+        if not term_ids:
+            return np.zeros(n), np.zeros(n)
+        terms = np.asarray(term_ids)
+        docs = np.asarray(doc_ids)
+        lex = self.lexicon
+
+        known = lex.known[terms]
+        polarity = lex.polarity[terms]
+        # Rules only look back within the same headline
+        same1 = docs == _shift(docs, 1, -1)
+        same2 = docs == _shift(docs, 2, -1)
+        prev = _shift(terms, 1, 0)
+        prev2 = _shift(terms, 2, 0)
+
+        # "very good": the adverb scales the next known word and is not assessed itself
+        modified = known & same1 & lex.known[prev] & lex.modifier[prev]
+        polarity = np.where(modified, np.clip(polarity * lex.intensity[prev], -1.0, 1.0), polarity)
+        assessed = known & ~np.concatenate([modified[1:], [False]])
+        # "not good", "not a good": negation one token back, or two across a one-letter word
+        short_prev = _shift(np.asarray(lengths), 1, 0) <= 1
+        negated = (same1 & lex.negation[prev]) | (same2 & lex.negation[prev2] & ~lex.known[prev] & short_prev)
+        polarity = np.where(negated, polarity * -0.5, polarity)
+        # "great news!": boost the latest assessment of the same headline
+        index = np.arange(len(terms))
+        last = np.maximum.accumulate(np.where(assessed, index, -1))
+        bangs = index[(terms == lex.vocab["!"])]
+        targets = last[bangs]
+        targets = targets[(targets >= 0) & (docs[np.maximum(targets, 0)] == docs[bangs])]
+        boost = np.ones(len(terms))
+        np.multiply.at(boost, targets, 1.25)
+        polarity = np.clip(polarity * boost, -1.0, 1.0)
+
+        sums = np.bincount(docs, weights=np.where(assessed, polarity, 0.0), minlength=n)
+        counts = np.bincount(docs, weights=assessed.astype(float), minlength=n)
+        return sums, counts
+
+    def score(self, texts: Sequence[str]) -> np.ndarray:
+        sums, counts = self.assess(texts)
+        return np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+
+    def score_batches(self, batches: Sequence[dict], text_key: str = "news") -> dict:
+        """
+        Scores for ``[{"entity": ..., "news": [headline, ...]}, ...]`` (the news agent's output):
+        every headline, each entity (pooled over its headlines) and everything overall.
+        """
+        headlines, owners = [], []
+        for i, batch in enumerate(batches):
+            for headline in batch.get(text_key) or []:
+                headlines.append(str(headline))
+                owners.append(i)
+        sums, counts = self.assess(headlines)
+        scores = np.divide(sums, counts, out=np.zeros(len(sums)), where=counts > 0)
+        owners = np.asarray(owners, dtype=int)
+        entity_sums = np.bincount(owners, weights=sums, minlength=len(batches))
+        entity_counts = np.bincount(owners, weights=counts, minlength=len(batches))
+        entity_scores = np.divide(entity_sums, entity_counts, out=np.zeros(len(batches)), where=entity_counts > 0)
+        overall = float(sums.sum() / counts.sum()) if counts.sum() else 0.0
+        return {
+            "headlines": [{"entity": batches[o].get("entity"), "headline": h, "score": round(float(s), 3),
+                           "sentiment": label_for(s)} for h, o, s in zip(headlines, owners, scores)],
+            "entities": [{"entity": batch.get("entity"), "score": round(float(s), 3), "sentiment": label_for(s),
+                          "headlines": int(np.sum(owners == i))}
+                         for i, (batch, s) in enumerate(zip(batches, entity_scores))],
+            "score": round(overall, 3),
+            "label": label_for(overall),
+        }
+
+
+_engine: Optional[SentimentEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_sentiment_engine() -> SentimentEngine:
+    """Process-wide engine; the lexicon is compiled once."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = SentimentEngine()
+    return _engine
@@ -0,0 +1,115 @@
+"""Single-flight coalescing of identical work.
+
+``SingleFlight.do(key, fn)`` runs ``fn`` once for any number of concurrent callers
+with the same key; the others wait for and share its result (or exception).
+Works for worker threads (``do``) and event-loop tasks (``ado``) alike.
+
+``HttpClient`` coalesces GETs at two levels:
+
+* the current run's group (``run_scope``), which also remembers successful
+  responses, so each distinct URL is fetched at most once per chain run;
+* a process-wide group, which only merges requests that are in flight at the
+  same moment (e.g. concurrent goals in batch or service mode).
+"""
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class SingleFlight:
+    """Coalesces calls by key. With ``remember`` set, kept results are reused for the group's lifetime."""
+
+    def __init__(self, remember: bool = False):
+        self.remember = remember
+        self.calls = 0
+        self.shared = 0
+        self._lock = threading.Lock()
+        self._flights: Dict[str, Future] = {}
+
+    def _claim(self, key: str):
+        """Return (future, is_leader) for ``key``."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None and not flight.cancelled():
+                self.shared += 1
+                return flight, False
+            flight = self._flights[key] = Future()
+            self.calls += 1
+            return flight, True
+
+    def _settle(self, key: str, flight: Future, keep: bool):
+        if not keep:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+    def do(self, key: str, fn: Callable[[], Any], keep: Callable[[Any], bool] = lambda result: True) -> Any:
+        flight, leader = self._claim(key)
+        if not leader:
+            return flight.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            flight.set_exception(e)
+            self._settle(key, flight, keep=False)
+            raise
+        flight.set_result(result)
+        self._settle(key, flight, keep=self.remember and keep(result))
+        return result
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]], keep: Callable[[Any], bool] = lambda result: True) -> Any:
+        while True:
+            flight, leader = self._claim(key)
+            if leader:
+                break
+            try:
+                # shield: a waiter's own cancellation must not cancel the shared call
+                return await asyncio.shield(asyncio.wrap_future(flight))
+            except asyncio.CancelledError:
+                if not flight.cancelled():
+                    raise
+                # The leader was cancelled (e.g. its agent hit a deadline): take over
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            flight.cancel()
+            self._settle(key, flight, keep=False)
+            raise
+        except BaseException as e:
+            flight.set_exception(e)
+            self._settle(key, flight, keep=False)
+            raise
+        flight.set_result(result)
+        self._settle(key, flight, keep=self.remember and keep(result))
+        return result
+
+
+_process_group = SingleFlight()
+_run_group: contextvars.ContextVar[Optional[SingleFlight]] = contextvars.ContextVar("single_flight_run", default=None)
+
+
+def process_group() -> SingleFlight:
+    return _process_group
+
+
+def run_group() -> Optional[SingleFlight]:
+    """The group of the chain run executing in this context, if any."""
+    return _run_group.get()
+
+
+@contextmanager
+def run_scope():
+    """
+    Coalesce and remember requests for the duration of one chain run.
+    Threads only see the scope if started with the caller's context
+    (``contextvars.copy_context().run``); asyncio tasks inherit it.
+    """
+    group = SingleFlight(remember=True)
+    token = _run_group.set(group)
+    try:
+        yield group
+    finally:
+        _run_group.reset(token)
@@ -0,0 +1,65 @@
+"""Progressive report events.
+
+Code anywhere in a run calls ``emit(type, **fields)``; the events reach whatever
+sink the caller installed with ``stream_to``, or are dropped when nobody listens.
+The sink lives in a ContextVar, so it follows the run into scheduler worker
+threads and asyncio tasks without being passed around.
+
+``stream_events(fn, ...)`` runs ``fn`` in a background thread and yields its events
+as they are emitted; the generator's return value is ``fn``'s result.
+"""
+import contextvars
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Generator, Optional
+
+_sink: contextvars.ContextVar[Optional[Callable[[dict], None]]] = contextvars.ContextVar("report_sink", default=None)
+
+
+def active() -> bool:
+    """Whether anyone is listening (lets callers skip building expensive events)."""
+    return _sink.get() is not None
+
+
+def emit(event_type: str, **fields):
+    sink = _sink.get()
+    if sink is not None:
+        sink({"type": event_type, **fields})
+
+
+@contextmanager
+def stream_to(sink: Callable[[dict], None]):
+    token = _sink.set(sink)
+    try:
+        yield
+    finally:
+        _sink.reset(token)
+
+
+class _Finished:
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+
+
+def stream_events(fn: Callable[..., Any], *args, **kwargs) -> Generator[Dict[str, Any], None, Any]:
+    """Run ``fn(*args, **kwargs)`` in a thread and yield the events it emits until it returns."""
+    events = queue.Queue()
+
+    def target():
+        with stream_to(events.put):
+            try:
+                events.put(_Finished(result=fn(*args, **kwargs)))
+            except BaseException as e:
+                events.put(_Finished(error=e))
+
+    # Daemon: a consumer that stops iterating must not keep the process alive
+    threading.Thread(target=contextvars.copy_context().run, args=(target,), daemon=True).start()
+    while True:
+        event = events.get()
+        if isinstance(event, _Finished):
+            if event.error is not None:
+                raise event.error
+            return event.result
+        yield event
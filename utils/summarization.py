@@ -0,0 +1,76 @@
+"""Local summarization model backends for SummarizerAgent.
+
+Every backend returns a transformers summarization pipeline (same call signature
+and output), differing only in how the underlying model runs on CPU:
+
+* "pipeline"  - the stock full-precision PyTorch model (default)
+* "quantized" - PyTorch with dynamic int8 quantization of the Linear layers
+* "onnx"      - the model exported to ONNX and run by ONNX Runtime via ``optimum``
+                (``pip install optimum[onnxruntime]``); the export is cached on disk
+
+Selected by the "summarizer" section of configs/agents.json. A backend whose
+dependencies are missing falls back to "pipeline" with a warning.
+Compare backends with ``python evals/bench_summarizer.py``.
+"""
+import logging
+import os
+
+from utils.config import CONFIG_PATH
+
+DEFAULT_MODEL = "facebook/bart-large-cnn"
+BACKENDS = ("pipeline", "quantized", "onnx")
+
+ROOT = os.path.dirname(os.path.dirname(CONFIG_PATH))
+
+
+def _pipeline(model_name, **kwargs):
+    from transformers import pipeline
+    return pipeline("summarization", model=model_name, **kwargs)
+
+
+def _quantized(model_name):
+    import torch
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, pipeline
+
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+    model.eval()
+    # Weights of every Linear layer become int8; activations are quantized on the fly
+    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return pipeline("summarization", model=model, tokenizer=AutoTokenizer.from_pretrained(model_name))
+
+
+def _onnx(model_name, onnx_dir):
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from transformers import AutoTokenizer, pipeline
+
+    export_dir = os.path.join(onnx_dir, model_name.replace("/", "--"))
+    if os.path.isdir(export_dir) and any(name.endswith(".onnx") for name in os.listdir(export_dir)):
+        model = ORTModelForSeq2SeqLM.from_pretrained(export_dir)
+        tokenizer = AutoTokenizer.from_pretrained(export_dir)
+    else:
+        # First use exports the PyTorch checkpoint (slow, once per machine)
+        model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model.save_pretrained(export_dir)
+        tokenizer.save_pretrained(export_dir)
+    return pipeline("summarization", model=model, tokenizer=tokenizer)
+
+
+def load_summarizer(backend="pipeline", model=DEFAULT_MODEL, num_threads=None, onnx_dir=".cache/onnx", **_):
+    """Build the summarization pipeline for ``backend``; extra config keys are ignored."""
+    if num_threads:
+        import torch
+        torch.set_num_threads(num_threads)
+    if backend not in BACKENDS:
+        logging.warning(f"[Summarizer] Unknown backend {backend!r}, using 'pipeline'")
+        backend = "pipeline"
+    try:
+        if backend == "quantized":
+            return _quantized(model)
+        if backend == "onnx":
+            if not os.path.isabs(onnx_dir):
+                onnx_dir = os.path.join(ROOT, onnx_dir)
+            return _onnx(model, onnx_dir)
+    except ImportError as e:
+        logging.warning(f"[Summarizer] {backend} backend unavailable ({e}), using 'pipeline'")
+    return _pipeline(model)